@@ -1,8 +1,16 @@
-from fastapi import FastAPI, HTTPException, Query, APIRouter, Response
-from typing import List
+from fastapi import FastAPI, HTTPException, Query, APIRouter, Response, Header, Depends, Request
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
 from datetime import datetime
+import hmac
+import json
+import os
+import threading
 import time
+from contextlib import asynccontextmanager
 from loguru import logger
+from pydantic import TypeAdapter, ValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_client import (
     Counter,
@@ -12,17 +20,68 @@ from prometheus_client import (
     CONTENT_TYPE_LATEST,
 )
 
-from src.guardrails.input_validation import validate_pair
+from dotenv import load_dotenv
+
+# Apply .env before importing src.*: their settings (TRACE_DIR, RATE_LIMITS, ADMISSION_*, ...) are read at import
+load_dotenv()
+
+from src.guardrails.input_validation import validate_pair, validate_pairs
 from src.guardrails.pipeline_safety import safe_run_pipeline_once
-from src.schemas import Recommendation
+from src.guardrails.admission import ADMISSION, Overloaded
+from src import schemas
+from src.schemas import JobRequest, Recommendation
+from src.cache import build_recommendation_cache
+from src.http_cache import EncodedPayloadCache
+from src.jobs import build_job_manager
+from src.observability.stats import ApiStats
+from src.observability.cardinality import GuardedMetric, method_label, pair_label, route_label
+from src.observability.profiling import (
+    ProfilerBusy,
+    profile_run,
+    start_profile_window,
+    list_profiles,
+    profile_path,
+    profile_text,
+)
 
 # ====================================================
 # 🚀 FastAPI App Configuration
 # ====================================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Optional warm-up: WARMUP_ON_STARTUP = false (default) | background | blocking.
+    Optional streaming: STREAM_SOURCE (see src/streaming.py).
+    Queued jobs are resumed unless JOBS_RESUME_ON_STARTUP=false (see src/jobs.py).
+    """
+    mode = os.getenv("WARMUP_ON_STARTUP", "false").lower()
+    if mode in ("background", "blocking"):
+        from src.warmup import warm_up
+        if mode == "blocking":
+            warm_up()
+        else:
+            threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+
+    # Optional streaming mode: bars/ticks from STREAM_SOURCE update the cache in place
+    stream = None
+    if os.getenv("STREAM_SOURCE"):
+        from src.streaming import start_streaming
+        stream, _ = start_streaming(LATEST_RECOMMENDATIONS, os.getenv("STREAM_SOURCE"))
+
+    # Pick up jobs interrupted by the last restart
+    if os.getenv("JOBS_RESUME_ON_STARTUP", "True").lower() == "true":
+        JOBS.resume()
+    yield
+    if stream is not None:
+        stream.stop()
+    JOBS.shutdown()
+
+
 app = FastAPI(
     title="Agentic Forex AI API",
     description="Run multi-agent forex strategy pipelines and fetch results safely.",
     version="1.1.0",
+    lifespan=lifespan,
 )
 
 # Enable CORS for frontend
@@ -46,37 +105,79 @@ logger.add(
 # ====================================================
 # 📈 Prometheus Metrics
 # ====================================================
-REQUEST_COUNT = Counter(
+# Labels come from request input: normalize them (route templates, allowed pairs) and cap
+# the series per metric so scanners can't create unbounded time series (METRIC_MAX_SERIES)
+REQUEST_COUNT = GuardedMetric(Counter(
     "api_request_total",
     "Total API requests received",
     ["method", "path", "status"],
-)
-REQUEST_LATENCY = Histogram(
+))
+REQUEST_LATENCY = GuardedMetric(Histogram(
     "api_request_latency_seconds", "API request latency (seconds)", ["path"]
-)
+))
 HEALTH_STATUS = Gauge("api_health_status", "1 if healthy, 0 otherwise")
 
 # Forex-specific metrics
-FOREX_RUN_COUNT = Counter(
+FOREX_RUN_COUNT = GuardedMetric(Counter(
     "forex_run_total",
     "Total number of forex strategy runs",
     ["pair", "status"],
-)
-FOREX_RUN_LATENCY = Histogram(
+))
+FOREX_RUN_LATENCY = GuardedMetric(Histogram(
     "forex_run_latency_seconds",
     "Execution time of forex strategy runs",
     ["pair"],
-)
-LAST_RUN_TIMESTAMP = Gauge(
+))
+LAST_RUN_TIMESTAMP = GuardedMetric(Gauge(
     "forex_last_run_timestamp",
     "Timestamp of last successful strategy run (epoch)",
     ["pair"],
-)
+))
+
+# Precomputed JSON aggregates served by /api/stats
+API_STATS = ApiStats()
 
 # ====================================================
-# 🧠 In-memory cache
+# 🧠 Recommendation cache (memory, or SQLite/WAL shared across uvicorn workers)
 # ====================================================
-LATEST_RECOMMENDATIONS = {}
+LATEST_RECOMMENDATIONS = build_recommendation_cache()
+RUN_LEASE_TTL = float(os.getenv("RUN_LEASE_TTL", 120))
+
+# Asynchronous multi-pair jobs (SQLite-backed, worker pool)
+JOBS = build_job_manager(cache=LATEST_RECOMMENDATIONS)
+
+# Serialized + compressed read payloads, rebuilt only when the cache version changes
+READ_PAYLOADS = EncodedPayloadCache()
+_RECOMMENDATION_LIST = TypeAdapter(List[Recommendation])
+_RECOMMENDATION = TypeAdapter(Recommendation)
+
+
+def _all_recommendations_payload():
+    version, items = LATEST_RECOMMENDATIONS.snapshot()
+    return version, _RECOMMENDATION_LIST.dump_json(list(items.values()))
+
+
+def _recommendation_response(rec: Recommendation, headers: dict = None) -> Response:
+    """
+    JSON body for an internally built Recommendation. Skips FastAPI's
+    response_model dump + re-validate round trip (kept for the OpenAPI schema)
+    unless STRICT_VALIDATION is on. A model that fails that re-validation is
+    a server bug, so it is a 500 (ValidationError is a ValueError, which the
+    endpoints would otherwise report as a 400).
+    """
+    if schemas.STRICT_VALIDATION:
+        try:
+            rec = Recommendation.model_validate(rec.model_dump())
+        except ValidationError as e:
+            logger.error(f"Recommendation for {getattr(rec, 'pair', '?')} failed strict validation: {e}")
+            raise HTTPException(status_code=500, detail=f"Invalid recommendation ({e.error_count()} validation errors)")
+    return Response(content=_RECOMMENDATION.dump_json(rec), media_type="application/json", headers=headers)
+
+
+def _cached_read(request: Request, key: str, version: int, build) -> Response:
+    """ETag/304 + compressed response for a read endpoint."""
+    payload = READ_PAYLOADS.get(key, version, build)
+    return payload.to_response(request.headers.get("if-none-match"), request.headers.get("accept-encoding"))
 
 # ====================================================
 # 🧩 Router with prefix /api
@@ -98,56 +199,154 @@ async def access_log_and_metrics(request, call_next):
         return response
     finally:
         duration = time.time() - start
-        REQUEST_LATENCY.labels(path).observe(duration)
-        REQUEST_COUNT.labels(method, path, str(status)).inc()
+        route = route_label(request.scope)
+        REQUEST_LATENCY.labels(route).observe(duration)
+        REQUEST_COUNT.labels(method_label(method), route, str(status)).inc()
+        API_STATS.record_request(route, status, duration)
         logger.info(f"{method} {path} status={status} duration={duration:.3f}s")
 
+# ====================================================
+# 🔐 Admin access (ADMIN_TOKEN via X-Admin-Token header)
+# ====================================================
+def is_admin(token: Optional[str]) -> bool:
+    expected = os.getenv("ADMIN_TOKEN")
+    return bool(expected and token and hmac.compare_digest(token, expected))
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Dependency guarding admin-only endpoints."""
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
 # ====================================================
 # 🔁 Endpoints
 # ====================================================
 @router.get("/run", response_model=Recommendation)
-def run_pipeline(pair: str = Query(..., description="Currency pair e.g. EURUSD")):
+def run_pipeline(
+    pair: str = Query(..., description="Currency pair e.g. EURUSD"),
+    profile: bool = Query(False, description="Capture a CPU profile of this run (admin only)"),
+    x_admin_token: Optional[str] = Header(None),
+):
     """Trigger the strategy pipeline for a single currency pair."""
+    if profile and not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Profiling requires an admin token")
+
     start = time.time()
+    valid_pair = None
+    headers = {}
     try:
         valid_pair = validate_pair(pair)
-        rec = safe_run_pipeline_once(valid_pair)
+        while True:
+            since = LATEST_RECOMMENDATIONS.version(valid_pair)
+            with LATEST_RECOMMENDATIONS.run_lease(valid_pair, ttl=RUN_LEASE_TTL) as owner:
+                if owner:
+                    # Bounded admission: at most ADMISSION_MAX_CONCURRENT pipelines, the rest queue or are shed
+                    with ADMISSION.admit(), profile_run(f"api_run_{valid_pair}", force=profile) as prof:
+                        rec = safe_run_pipeline_once(valid_pair)
+                    if prof:
+                        headers["X-Profile-Id"] = prof["profile_id"]
+
+                    # cache latest result
+                    LATEST_RECOMMENDATIONS[valid_pair] = rec
+                    break
 
-        # cache latest result
-        LATEST_RECOMMENDATIONS[valid_pair] = rec
+            # Same pair already running (possibly in another worker): share its result
+            rec = LATEST_RECOMMENDATIONS.wait_for_update(valid_pair, since, timeout=RUN_LEASE_TTL,
+                                                         follow_lease=True)
+            if rec is not None:
+                FOREX_RUN_COUNT.labels(pair=valid_pair, status="deduplicated").inc()
+                return _recommendation_response(rec)
+            # The owner gave up or its lease ran out: compete for the lease again instead of running unguarded
 
         # metrics
         FOREX_RUN_COUNT.labels(pair=valid_pair, status="success").inc()
         FOREX_RUN_LATENCY.labels(pair=valid_pair).observe(time.time() - start)
         LAST_RUN_TIMESTAMP.labels(pair=valid_pair).set_to_current_time()
+        API_STATS.record_run(valid_pair, time.time() - start)
 
-        return rec
+        return _recommendation_response(rec, headers)
+    except HTTPException:
+        FOREX_RUN_COUNT.labels(pair=pair_label(pair), status="error").inc()
+        raise
+    except ProfilerBusy as pb:
+        raise HTTPException(status_code=409, detail=str(pb))
     except ValueError as ve:
-        FOREX_RUN_COUNT.labels(pair=pair, status="validation_error").inc()
+        FOREX_RUN_COUNT.labels(pair=pair_label(pair), status="validation_error").inc()
         raise HTTPException(status_code=400, detail=str(ve))
+    except Overloaded as ov:
+        # The lease is already released here, so followers stop waiting and retry
+        FOREX_RUN_COUNT.labels(pair=valid_pair, status="shed").inc()
+        API_STATS.record_shed(valid_pair)
+        logger.warning(f"Shedding run for {valid_pair}: {ov}")
+        raise HTTPException(status_code=429, detail=str(ov), headers={"Retry-After": str(ov.retry_after)})
     except Exception as e:
-        FOREX_RUN_COUNT.labels(pair=pair, status="error").inc()
+        FOREX_RUN_COUNT.labels(pair=pair_label(pair), status="error").inc()
+        if valid_pair:
+            API_STATS.record_run(valid_pair, time.time() - start, success=False)
         logger.exception(f"Pipeline error for {pair}: {e}")
         raise HTTPException(status_code=500, detail=f"Pipeline error: {e}")
 
+@router.post("/jobs", status_code=202)
+def submit_job(request: JobRequest):
+    """Queue a multi-pair run; returns the job id immediately."""
+    pairs = request.pairs or os.getenv("PAIRS", "EURUSD,GBPUSD,USDJPY,AUDUSD,AUDCAD,GBPCAD").split(",")
+    try:
+        valid_pairs = list(dict.fromkeys(validate_pairs(pairs)))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    job_id = JOBS.submit(valid_pairs)
+    return JOBS.store.get(job_id)
+
+@router.get("/jobs")
+def list_jobs(limit: int = Query(20, ge=1, le=200)):
+    """Most recent jobs (without per-pair results)."""
+    return JOBS.store.list(limit)
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Job status and per-pair results so far."""
+    job = JOBS.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Server-sent events: one `pair` event per finished pair, then `done`."""
+    if await run_in_threadpool(JOBS.store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+
+    # Async generator: an open stream waits on the event loop, not on a threadpool worker
+    async def events():
+        async for event in JOBS.aevents(job_id):
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @router.get("/history")
-def history(pair: str = Query(None, description="Optional currency pair to filter")):
+def history(request: Request, pair: str = Query(None, description="Optional currency pair to filter")):
     """Fetch past traces for one or all pairs."""
     if pair:
         try:
             valid_pair = validate_pair(pair)
-            rec = LATEST_RECOMMENDATIONS.get(valid_pair)
-            if rec:
-                return rec
-            return {"message": f"No data for {valid_pair}"}
         except ValueError as ve:
             raise HTTPException(status_code=400, detail=str(ve))
-    return list(LATEST_RECOMMENDATIONS.values())
+        version = LATEST_RECOMMENDATIONS.version(valid_pair)
+        if not version:
+            return {"message": f"No data for {valid_pair}"}
+
+        def build():
+            # version first: the body may be newer than its tag, never older
+            built_version = LATEST_RECOMMENDATIONS.version(valid_pair)
+            return built_version, LATEST_RECOMMENDATIONS.get(valid_pair).model_dump_json().encode("utf-8")
+
+        return _cached_read(request, f"history-{valid_pair}", version, build)
+    return _cached_read(request, "recommendations", LATEST_RECOMMENDATIONS.version(), _all_recommendations_payload)
 
 @router.get("/recommendations", response_model=List[Recommendation])
-def recommendations():
-    """Return the latest recommendations for all cached pairs."""
-    return list(LATEST_RECOMMENDATIONS.values())
+def recommendations(request: Request):
+    """Return the latest recommendations for all cached pairs (ETag + compression aware)."""
+    return _cached_read(request, "recommendations", LATEST_RECOMMENDATIONS.version(), _all_recommendations_payload)
 
 @router.get("/health")
 def health_check():
@@ -159,11 +358,61 @@ def health_check():
         "message": "Agentic Forex AI API is running smoothly ✅",
     }
 
+@router.get("/stats")
+def stats():
+    """Request / run aggregates as JSON (counts, error rates, p50/p95 latency, last run age, admission queue)."""
+    return {**API_STATS.snapshot(), "admission": ADMISSION.snapshot()}
+
+@router.get("/overview")
+def overview():
+    """Health + request stats in one small JSON call (used by the dashboard)."""
+    HEALTH_STATUS.set(1.0)
+    return {
+        "health": {
+            "status": "ok",
+            "timestamp": datetime.utcnow().isoformat(),
+            "gauge": 1,
+        },
+        "stats": API_STATS.snapshot(),
+        "cached_pairs": LATEST_RECOMMENDATIONS.count(),
+    }
+
 @router.get("/metrics")
 def metrics():
     """Expose Prometheus metrics."""
     data = generate_latest()
     return Response(content=data, media_type=CONTENT_TYPE_LATEST)
 
+# ====================================================
+# 🧪 Admin: CPU profiles
+# ====================================================
+@router.post("/admin/profile/window", dependencies=[Depends(require_admin)])
+def admin_profile_window(seconds: float = Query(60.0, gt=0, le=3600, description="Window length in seconds")):
+    """Profile every pipeline run for the next `seconds`."""
+    until = start_profile_window(seconds)
+    return {"profiling_until": datetime.utcfromtimestamp(until).isoformat()}
+
+@router.get("/admin/profiles", dependencies=[Depends(require_admin)])
+def admin_list_profiles():
+    """List recently captured CPU profiles (most recent first)."""
+    return list_profiles()
+
+@router.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def admin_get_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$", description="text report or raw pstats file"),
+    sort: str = Query("cumulative", description="pstats sort key for text reports"),
+):
+    """Fetch a stored profile as a pstats text report or the raw `.prof` file."""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile {profile_id}")
+    if format == "pstats":
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+    try:
+        return PlainTextResponse(profile_text(profile_id, sort=sort))
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Invalid sort key: {sort}")
+
 # Mount the router
 app.include_router(router)
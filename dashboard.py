@@ -1,8 +1,8 @@
 import os
 import requests
 import streamlit as st
-import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 
 # ==================================
@@ -10,6 +10,9 @@ from loguru import logger
 # ==================================
 API_URL = os.getenv("API_URL", "http://localhost:8000/api")
 
+# Status panels are cached across all sessions/tabs for this many seconds
+STATUS_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", 15))
+
 # Logging setup (send logs to stdout for Railway)
 logger.remove()
 logger.add(sink=lambda msg: print(msg, end=""), level="INFO")
@@ -64,24 +67,95 @@ if st.button("🚀 Run Strategy"):
         st.error(f"❌ Request failed: {e}")
         st.info(f"Hint: Is your API_URL set correctly?\n\n**Current API_URL:** `{API_URL}`")
 
+# ==================================
+# Run all pairs (async job: submit, then poll per-pair progress)
+# ==================================
+JOB_POLL_SECONDS = float(os.getenv("DASHBOARD_JOB_POLL", 2))
+JOB_WAIT_SECONDS = float(os.getenv("DASHBOARD_JOB_TIMEOUT", 900))
+
+if st.button("🧾 Run All Pairs"):
+    logger.info("Run All Pairs clicked")
+    try:
+        job = requests.post(f"{API_URL}/jobs", json={"pairs": []}, timeout=10)
+        job.raise_for_status()
+        job = job.json()
+        progress = st.progress(0.0, text=f"Job {job['job_id'][:8]} queued")
+        deadline = time.monotonic() + JOB_WAIT_SECONDS
+        while job["status"] != "completed":
+            if time.monotonic() >= deadline:
+                st.warning(f"⏳ Job {job['job_id'][:8]} still running after {JOB_WAIT_SECONDS:.0f}s; "
+                           f"showing results so far (GET /api/jobs/{job['job_id']} for the rest)")
+                break
+            time.sleep(JOB_POLL_SECONDS)
+            job = requests.get(f"{API_URL}/jobs/{job['job_id']}", timeout=10).json()
+            done = job["counts"]["succeeded"] + job["counts"]["failed"]
+            progress.progress(done / max(len(job["results"]), 1), text=f"{done}/{len(job['results'])} pairs done")
+
+        for result in job["results"]:
+            rec = result.get("recommendation")
+            if result["status"] in ("queued", "running"):
+                st.write(f"• **{result['pair']}**: ⏳ {result['status']}")
+            elif rec:
+                st.write(f"• **{result['pair']}**: {rec['stance']} ({rec['confidence'] * 100:.1f}%)")
+            else:
+                st.write(f"• **{result['pair']}**: ❌ {result.get('error') or 'failed'}")
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Job request failed: {e}")
+        st.error(f"❌ Job request failed: {e}")
+
+# ==================================
+# 📡 Cached status fetch (shared across sessions)
+# ==================================
+@st.cache_resource
+def _http_session() -> requests.Session:
+    """One keep-alive session for all dashboard sessions."""
+    return requests.Session()
+
+
+def _fetch_split_status(session: requests.Session) -> dict:
+    """Fallback for APIs without /overview: fetch /health and /stats in parallel."""
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        health_f = pool.submit(session.get, f"{API_URL}/health", timeout=10)
+        stats_f = pool.submit(session.get, f"{API_URL}/stats", timeout=10)
+        health, stats_response = health_f.result(), stats_f.result()
+
+    return {
+        "health": {"status": "ok" if health.status_code == 200 else f"http {health.status_code}",
+                   "gauge": 1 if health.status_code == 200 else 0},
+        "stats": stats_response.json() if stats_response.status_code == 200 else None,
+    }
+
+
+@st.cache_data(ttl=STATUS_CACHE_TTL, show_spinner=False)
+def fetch_status() -> dict:
+    """Health + stats in one consolidated call; errors are cached too so a down API isn't hammered."""
+    session = _http_session()
+    try:
+        logger.info("Fetching API status")
+        resp = session.get(f"{API_URL}/overview", timeout=10)
+        if resp.status_code == 404:
+            return _fetch_split_status(session)
+        resp.raise_for_status()
+        return resp.json()
+    except Exception as e:
+        logger.error(f"Status fetch failed: {e}")
+        return {"error": str(e)}
+
+
+status = fetch_status()
+
 # ==================================
 # Health Check Section
 # ==================================
 st.divider()
 st.subheader("🩺 System Health")
 
-health_status = "❌ API not reachable"
-try:
-    logger.info("Performing health check")
-    health = requests.get(f"{API_URL}/health", timeout=10)
-    if health.status_code == 200:
-        health_status = "✅ API Healthy"
-        st.success("API is healthy ✅")
-    else:
-        st.warning(f"Health check failed ({health.status_code})")
-except Exception as e:
-    logger.error(f"Health check failed: {e}")
+if "error" in status:
     st.warning("⚠️ API not reachable")
+elif status["health"]["status"] == "ok":
+    st.success("API is healthy ✅")
+else:
+    st.warning(f"Health check failed ({status['health']['status']})")
 
 # ==================================
 # 📈 Observability & Metrics
@@ -89,39 +163,29 @@ except Exception as e:
 st.divider()
 st.subheader("📊 Observability Dashboard")
 
-try:
-    metrics_response = requests.get(f"{API_URL}/metrics", timeout=10)
-    if metrics_response.status_code == 200:
-        metrics_text = metrics_response.text
-
-        # Extract latency histogram buckets
-        latencies = re.findall(
-            r'api_request_latency_seconds_bucket{path=".*?"[^}]*} (\d+)', metrics_text
-        )
-        total_requests = re.findall(
-            r'api_request_total{method="GET",path=".*?",status="200"} (\d+)', metrics_text
-        )
-        health_gauge = re.search(r'api_health_status (\d+)', metrics_text)
-
-        latency_value = int(latencies[-1]) if latencies else 0
-        total_reqs = sum(map(int, total_requests)) if total_requests else 0
-        health_value = int(health_gauge.group(1)) if health_gauge else 0
-
-        st.metric("API Health", "✅" if health_value else "⚠️", help="Gauge 1 = Healthy, 0 = Unhealthy")
-        st.metric("Total API Requests", total_reqs)
-        st.metric("Recent Latency (observed count)", latency_value)
-
-        # ---- Removed tiny sparkline chart that caused the '0 0' at bottom ----
-        # If you ever want a chart back, you can gate it like:
-        # if len(latencies) > 1 and any(int(v) > 0 for v in latencies):
-        #     latency_chart = [int(v) for v in latencies[-20:]]
-        #     st.line_chart(latency_chart, height=100)
-
-    else:
-        st.warning("⚠️ Unable to fetch metrics from /api/metrics")
-except Exception as e:
-    logger.error(f"Metrics fetch failed: {e}")
+if "error" in status:
     st.warning("⚠️ Observability metrics not available")
+elif not status.get("stats"):
+    st.warning("⚠️ Unable to fetch stats from /api/stats")
+else:
+    stats = status["stats"]
+    health_value = status["health"].get("gauge", 0)
+    st.metric("API Health", "✅" if health_value else "⚠️", help="Gauge 1 = Healthy, 0 = Unhealthy")
+    st.metric("Total API Requests", stats["requests"])
+    st.metric("Error Rate (5xx)", f"{stats['error_rate'] * 100:.1f}%")
+    run_stats = stats["endpoints"].get("/api/run")
+    if run_stats:
+        st.metric("Pipeline Run Latency (p95)", f"{run_stats['p95_ms']:.0f} ms")
+    if stats["pairs"]:
+        st.dataframe(
+            [
+                {"Pair": pair, "Runs": p["runs"], "Failures": p["failures"], "Shed": p.get("shed", 0),
+                 "p95 (ms)": p["p95_ms"], "Last run (s ago)": p["last_run_age_s"]}
+                for pair, p in sorted(stats["pairs"].items())
+            ],
+            use_container_width=True,
+        )
+    st.caption(f"Refreshed at most every {STATUS_CACHE_TTL}s (shared across all open dashboards).")
 
 # ==================================
 # Footer
@@ -1,25 +1,79 @@
 # src/agents/strategy_agent.py
-from typing import List, Union
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
 from ..schemas import Recommendation, Candle, NewsItem
-from textblob import TextBlob
+from ..tools import news_dedup
 
+# Bump whenever the decision logic below changes: it invalidates cached
+# results keyed by input fingerprint (see graph.run_pipeline_once)
+STRATEGY_VERSION = "1.3"
 
+# Strategy rule parameters (shared with the vectorized backtest, src/evaluation/backtest.py)
+MOVE_THRESHOLD = 0.0005        # |daily move| below this → AVOID
+NEWS_WINDOW = 10               # news items (newest first) considered for sentiment
+AVOID_CONFIDENCE = 0.45
+TREND_CONFIDENCE = 0.7
+SENTIMENT_THRESHOLD = 0.2      # |avg sentiment| above this counts as a signal
+SENTIMENT_BONUS = 0.1          # sentiment agrees with the stance
+SENTIMENT_PENALTY = 0.15       # sentiment contradicts the stance
+
+# TextBlob (and its sentiment lexicon) is loaded on first use, see src/warmup.py
+_TextBlob = None
+
+
+def _textblob():
+    global _TextBlob
+    if _TextBlob is None:
+        from textblob import TextBlob
+        _TextBlob = TextBlob
+    return _TextBlob
+
+
+# Headlines repeat across pairs and runs: score each distinct title once per process
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", 4096))
+
+
+@lru_cache(maxsize=SENTIMENT_CACHE_SIZE)
 def _headline_sentiment(text: str) -> float:
     """Return sentiment polarity between -1.0 (negative) and +1.0 (positive)."""
     try:
         if not text.strip():
             return 0.0
-        return TextBlob(text).sentiment.polarity
+        return _textblob()(text).sentiment.polarity
     except Exception:
         return 0.0
 
 
-def simple_strategy(pair: str, candles: List[Union[Candle, dict]], news: List[Union[NewsItem, dict]]) -> Recommendation:
+def _format_indicators(indicators: Dict[str, Optional[float]]) -> str:
+    parts = []
+    for name, value in indicators.items():
+        if value is None:
+            continue
+        label = name.replace("_", "").upper()
+        if name.startswith("rsi"):
+            parts.append(f"{label}={value:.1f}")
+        elif name.startswith("volatility"):
+            parts.append(f"{label}={value * 100:.3f}%")
+        else:
+            parts.append(f"{label}={value:.5f}")
+    return " | ".join(parts)
+
+
+def simple_strategy(
+    pair: str,
+    candles: List[Union[Candle, dict]],
+    news: List[Union[NewsItem, dict]],
+    indicators: Optional[Dict[str, Optional[float]]] = None,
+) -> Recommendation:
     """
     Hybrid sentiment-aware strategy:
     - Uses candle trend direction as quantitative signal.
-    - Uses average news sentiment as qualitative signal.
+    - Uses average news sentiment as qualitative signal, one score per
+      near-duplicate story cluster among the first NEWS_WINDOW items
+      (src/tools/news_dedup.py).
     - Adjusts confidence if both signals align or contradict.
+    - Reports technical indicators (src/indicators.py) when provided.
     """
 
     # --- Normalize candles ---
@@ -59,43 +113,61 @@ def simple_strategy(pair: str, candles: List[Union[Candle, dict]], news: List[Un
     today = cleaned_candles[-1]
     daily_move = today.close - yesterday.close
     rationale = [f"Daily move {daily_move:.4f}"]
-
-    # --- Sentiment analysis on news ---
+    if today.synthetic:
+        rationale.append("🔀 Cross rate derived from USD legs (high/low estimated)")
+    if indicators:
+        indicators = {k: (round(v, 6) if v is not None else None) for k, v in indicators.items()}
+        summary = _format_indicators(indicators)
+        if summary:
+            rationale.append(f"📐 Indicators: {summary}")
+
+    # --- Sentiment analysis on news: one score per story ---
     relevant_news = []
     sentiment_scores = []
-    seen_titles = set()
 
-    for item in cleaned_news[:10]:
-        title = (item.title or "").strip()
-        if not title or title in seen_titles:
-            continue
-        seen_titles.add(title)
+    # Only the first NEWS_WINDOW items are considered (as before clustering);
+    # clustering merges duplicates inside that window, it never reaches further down the feed
+    titled = [n for n in cleaned_news[:NEWS_WINDOW] if (n.title or "").strip()]
+    titles = [n.title.strip() for n in titled]
+    if news_dedup.NEWS_DEDUP:
+        # Same story under slightly different titles across feeds → one cluster
+        clusters = news_dedup.cluster_titles(titles)
+    else:
+        exact: Dict[str, List[int]] = {}
+        for i, title in enumerate(titles):
+            exact.setdefault(title, []).append(i)
+        clusters = list(exact.values())
 
+    for members in clusters:
+        item, title = titled[members[0]], titles[members[0]]
         sentiment = _headline_sentiment(title)
         sentiment_scores.append(sentiment)
         relevant_news.append(item)
-        rationale.append(f"{title} ({item.source or 'Unknown'}) [Sentiment={sentiment:+.2f}]")
+        similar = f" +{len(members) - 1} similar" if len(members) > 1 else ""
+        rationale.append(f"{title} ({item.source or 'Unknown'}{similar}) [Sentiment={sentiment:+.2f}]")
 
     avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0.0
     rationale.append(f"🧠 Average news sentiment = {avg_sentiment:+.2f}")
 
     # --- Base stance from price movement ---
-    if abs(daily_move) < 0.0005:
+    if abs(daily_move) < MOVE_THRESHOLD:
         stance = "AVOID"
-        confidence = 0.45
+        confidence = AVOID_CONFIDENCE
     else:
         stance = "BUY" if daily_move > 0 else "SELL"
-        confidence = 0.7
+        confidence = TREND_CONFIDENCE
 
     # --- Adjust confidence based on sentiment alignment ---
-    if avg_sentiment > 0.2 and stance == "BUY":
-        confidence += 0.1
+    positive = avg_sentiment > SENTIMENT_THRESHOLD
+    negative = avg_sentiment < -SENTIMENT_THRESHOLD
+    if positive and stance == "BUY":
+        confidence += SENTIMENT_BONUS
         rationale.append("✅ Positive sentiment reinforces BUY stance.")
-    elif avg_sentiment < -0.2 and stance == "SELL":
-        confidence += 0.1
+    elif negative and stance == "SELL":
+        confidence += SENTIMENT_BONUS
         rationale.append("✅ Negative sentiment reinforces SELL stance.")
-    elif (avg_sentiment > 0.2 and stance == "SELL") or (avg_sentiment < -0.2 and stance == "BUY"):
-        confidence -= 0.15
+    elif (positive and stance == "SELL") or (negative and stance == "BUY"):
+        confidence -= SENTIMENT_PENALTY
         rationale.append("⚠️ Sentiment contradicts price action — confidence reduced.")
     else:
         rationale.append("😐 Neutral or mixed sentiment; no strong news influence.")
@@ -110,7 +182,8 @@ def simple_strategy(pair: str, candles: List[Union[Candle, dict]], news: List[Un
         confidence=round(confidence, 2),
         horizon_hours=24,
         rationale=rationale,
-        news=relevant_news
+        news=relevant_news,
+        indicators=indicators or None,
     )
 
 
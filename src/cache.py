@@ -0,0 +1,313 @@
+# src/cache.py
+"""
+Recommendation cache shared by the API, job runners and streaming mode.
+
+Backends (RECOMMENDATION_CACHE_BACKEND):
+- memory (default): per-process dict — fine for a single uvicorn worker.
+- sqlite: one SQLite file in WAL mode (RECOMMENDATION_CACHE_PATH) shared by
+  every worker process. Rows are stored as key/value/version records, the
+  same shape an external KV store would have, so a networked backend can be
+  dropped in later without touching callers.
+
+Both backends keep a global version counter (bumped atomically on every
+update) and offer per-pair run leases so a pipeline for a pair only runs
+once at a time across all workers.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from src.schemas import Recommendation
+from src.tools.news_store import NEWS_STORE
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # project root
+DEFAULT_CACHE_PATH = os.path.join(BASE_DIR, "data", "cache", "recommendations.sqlite")
+
+# SQLite connections inherited through fork() must never be used or closed in
+# the child (closing one can checkpoint/truncate the WAL under other writers),
+# so they are parked here for the life of the process.
+_INHERITED_CONNECTIONS = []
+
+
+class RecommendationCache(ABC):
+    """Dict-like interface shared by all backends (subclasses implement the abstract primitives)."""
+
+    @abstractmethod
+    def get(self, pair: str, default=None) -> Optional[Recommendation]:
+        """Latest recommendation for `pair`, or `default`."""
+
+    @abstractmethod
+    def set(self, pair: str, rec: Recommendation) -> int:
+        """Store `rec` and return the new global version."""
+
+    @abstractmethod
+    def snapshot(self) -> Tuple[int, Dict[str, Recommendation]]:
+        """Consistent (version, {pair: rec}) view of the whole cache."""
+
+    @abstractmethod
+    def version(self, pair: str = None) -> int:
+        """Global version, or the version at which `pair` was last updated (0 if never)."""
+
+    @abstractmethod
+    def try_acquire_lease(self, pair: str, ttl: float) -> Optional[str]:
+        """Token if the run lease for `pair` was free (or expired), else None."""
+
+    @abstractmethod
+    def release_lease(self, pair: str, token: str):
+        """Drop the lease if `token` still holds it."""
+
+    @abstractmethod
+    def lease_held(self, pair: str) -> bool:
+        """Whether an unexpired run lease exists for `pair`."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of cached pairs, without decoding any of them."""
+
+    # --- helpers built on the primitives above ---
+    def values(self) -> List[Recommendation]:
+        return list(self.snapshot()[1].values())
+
+    def items(self):
+        return self.snapshot()[1].items()
+
+    def __getitem__(self, pair: str) -> Recommendation:
+        rec = self.get(pair)
+        if rec is None:
+            raise KeyError(pair)
+        return rec
+
+    def __setitem__(self, pair: str, rec: Recommendation):
+        self.set(pair, rec)
+
+    def __contains__(self, pair: str) -> bool:
+        return self.get(pair) is not None
+
+    def __len__(self) -> int:
+        return self.count()
+
+    @contextmanager
+    def run_lease(self, pair: str, ttl: float = 120.0):
+        """
+        Yield True if this caller owns the run for `pair`, False if another
+        worker is already running it (use wait_for_update to share its result).
+        """
+        token = self.try_acquire_lease(pair, ttl)
+        try:
+            yield token is not None
+        finally:
+            if token is not None:
+                self.release_lease(pair, token)
+
+    def wait_for_update(self, pair: str, since_version: int, timeout: float = 60.0,
+                        poll: float = 0.05, follow_lease: bool = False) -> Optional[Recommendation]:
+        """
+        Block until `pair` is updated past `since_version` (None on timeout).
+        With follow_lease, also return None as soon as the run lease is
+        released without an update (the owner failed or was shed), so
+        followers do not wait out the TTL.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.version(pair) > since_version:
+                return self.get(pair)
+            if follow_lease and not self.lease_held(pair):
+                # the owner may have stored its result just before releasing
+                return self.get(pair) if self.version(pair) > since_version else None
+            time.sleep(poll)
+        return None
+
+
+class MemoryRecommendationCache(RecommendationCache):
+    """Per-process cache (single worker)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: Dict[str, Tuple[int, Recommendation]] = {}
+        self._version = 0
+        self._leases: Dict[str, Tuple[str, float]] = {}
+
+    def get(self, pair: str, default=None) -> Optional[Recommendation]:
+        entry = self._items.get(pair)
+        return entry[1] if entry else default
+
+    def set(self, pair: str, rec: Recommendation) -> int:
+        with self._lock:
+            self._version += 1
+            self._items[pair] = (self._version, rec)
+            return self._version
+
+    def snapshot(self) -> Tuple[int, Dict[str, Recommendation]]:
+        with self._lock:
+            return self._version, {pair: rec for pair, (_, rec) in self._items.items()}
+
+    def version(self, pair: str = None) -> int:
+        if pair is None:
+            return self._version
+        entry = self._items.get(pair)
+        return entry[0] if entry else 0
+
+    def try_acquire_lease(self, pair: str, ttl: float) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            held = self._leases.get(pair)
+            if held and held[1] > now:
+                return None
+            token = uuid.uuid4().hex
+            self._leases[pair] = (token, now + ttl)
+            return token
+
+    def release_lease(self, pair: str, token: str):
+        with self._lock:
+            if self._leases.get(pair, (None,))[0] == token:
+                del self._leases[pair]
+
+    def lease_held(self, pair: str) -> bool:
+        held = self._leases.get(pair)
+        return bool(held and held[1] > time.monotonic())
+
+    def count(self) -> int:
+        return len(self._items)
+
+
+class SQLiteRecommendationCache(RecommendationCache):
+    """Cross-worker cache backed by a SQLite file in WAL mode."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        # Decoded models per pair, reused while the row version is unchanged
+        self._decoded: Dict[str, Tuple[int, Recommendation]] = {}
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS kv (
+                    key TEXT PRIMARY KEY, value TEXT NOT NULL, version INTEGER NOT NULL, updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL);
+                INSERT OR IGNORE INTO counters (name, value) VALUES ('version', 0);
+                """
+            )
+        self.close()  # connections are opened lazily per thread (and per process)
+
+    @contextmanager
+    def _conn(self):
+        held = getattr(self._local, "conn", None)
+        if held is not None and held[0] != os.getpid():
+            _INHERITED_CONNECTIONS.append(held[1])
+            held = None
+        if held is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            held = self._local.conn = (os.getpid(), conn)
+        yield held[1]
+
+    def close(self):
+        """Close this thread's connection (call before forking worker processes)."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            if held[0] == os.getpid():
+                held[1].close()
+            self._local.conn = None
+
+    @contextmanager
+    def _write_txn(self):
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _decode(self, pair: str, version: int, payload: str) -> Recommendation:
+        cached = self._decoded.get(pair)
+        if cached and cached[0] == version:
+            return cached[1]
+        rec = Recommendation.model_validate_json(payload)
+        if rec.news:
+            # Share headline objects with the other pairs instead of one copy per row
+            rec.news = [NEWS_STORE.intern(item) for item in rec.news]
+        self._decoded[pair] = (version, rec)
+        return rec
+
+    def get(self, pair: str, default=None) -> Optional[Recommendation]:
+        with self._conn() as conn:
+            row = conn.execute("SELECT version, value FROM kv WHERE key = ?", (pair,)).fetchone()
+        return self._decode(pair, row[0], row[1]) if row else default
+
+    def set(self, pair: str, rec: Recommendation) -> int:
+        payload = rec.model_dump_json()
+        with self._write_txn() as conn:
+            conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'version'")
+            version = conn.execute("SELECT value FROM counters WHERE name = 'version'").fetchone()[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, version, updated_at) VALUES (?, ?, ?, ?)",
+                (pair, payload, version, time.time()),
+            )
+        self._decoded[pair] = (version, rec)
+        return version
+
+    def snapshot(self) -> Tuple[int, Dict[str, Recommendation]]:
+        with self._conn() as conn:
+            conn.execute("BEGIN")  # one read snapshot for counter + rows
+            try:
+                version = conn.execute("SELECT value FROM counters WHERE name = 'version'").fetchone()[0]
+                rows = conn.execute("SELECT key, version, value FROM kv ORDER BY key").fetchall()
+            finally:
+                conn.execute("COMMIT")
+        return version, {key: self._decode(key, ver, value) for key, ver, value in rows}
+
+    def version(self, pair: str = None) -> int:
+        with self._conn() as conn:
+            if pair is None:
+                row = conn.execute("SELECT value FROM counters WHERE name = 'version'").fetchone()
+            else:
+                row = conn.execute("SELECT version FROM kv WHERE key = ?", (pair,)).fetchone()
+        return row[0] if row else 0
+
+    def try_acquire_lease(self, pair: str, ttl: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        now = time.time()
+        with self._write_txn() as conn:
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires_at < ?", (pair, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO leases (key, token, expires_at) VALUES (?, ?, ?)", (pair, token, now + ttl)
+            )
+            acquired = cur.rowcount == 1
+        return token if acquired else None
+
+    def release_lease(self, pair: str, token: str):
+        with self._write_txn() as conn:
+            conn.execute("DELETE FROM leases WHERE key = ? AND token = ?", (pair, token))
+
+    def lease_held(self, pair: str) -> bool:
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM leases WHERE key = ? AND expires_at >= ?", (pair, time.time())
+            ).fetchone()
+        return row is not None
+
+    def count(self) -> int:
+        with self._conn() as conn:
+            return conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0]
+
+
+def build_recommendation_cache(backend: str = None, path: str = None) -> RecommendationCache:
+    """Create the cache configured by RECOMMENDATION_CACHE_BACKEND / RECOMMENDATION_CACHE_PATH."""
+    backend = (backend or os.getenv("RECOMMENDATION_CACHE_BACKEND", "memory")).strip().lower()
+    if backend == "memory":
+        return MemoryRecommendationCache()
+    if backend == "sqlite":
+        return SQLiteRecommendationCache(path or os.getenv("RECOMMENDATION_CACHE_PATH", DEFAULT_CACHE_PATH))
+    raise ValueError(f"Unknown RECOMMENDATION_CACHE_BACKEND '{backend}' (expected 'memory' or 'sqlite')")
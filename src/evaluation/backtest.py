@@ -0,0 +1,269 @@
+"""
+Vectorized historical backtest for strategy_agent.simple_strategy.
+
+simple_strategy only ever looks at the last two candles. This module applies
+the same rule (move threshold → stance, sentiment adjustment, confidence
+clamp) to every bar of a historical close series at once with NumPy, and
+scores each signal against the move over the following `horizon` bars:
+
+✅ Hit rate of BUY/SELL signals
+✅ PnL curve (cumulative sum of per-signal returns)
+✅ Max drawdown of the PnL curve
+✅ Stance distribution and average confidence
+
+Usage:
+    # offline: deterministic synthetic hourly data, one year for every allowed pair
+    python -m src.evaluation.backtest --source synthetic --bars 8760
+
+    # raw local candle files (LOCAL_CANDLE_DIR/<PAIR>_1h.csv)
+    python -m src.evaluation.backtest --source local --pairs EURUSD,GBPUSD
+
+    # the configured market data provider (yfinance keeps ~730 days of hourly bars)
+    python -m src.evaluation.backtest --source provider --days 700 --bars 0
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.agents.strategy_agent import (
+    MOVE_THRESHOLD,
+    AVOID_CONFIDENCE,
+    TREND_CONFIDENCE,
+    SENTIMENT_THRESHOLD,
+    SENTIMENT_BONUS,
+    SENTIMENT_PENALTY,
+)
+
+EXPORT_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "backtest_summary.json")
+
+# Stance codes used in the signal arrays
+BUY, AVOID, SELL = 1, 0, -1
+STANCE_NAMES = {BUY: "BUY", AVOID: "AVOID", SELL: "SELL"}
+
+# PnL curves in the exported summary are downsampled to this many points
+CURVE_POINTS = 200
+
+
+# ----------------------------
+# Vectorized strategy rule
+# ----------------------------
+def strategy_signals(closes, sentiment=None):
+    """
+    Evaluate the simple_strategy rule at every bar.
+
+    Args:
+        closes: 1-D array of close prices.
+        sentiment: optional average news sentiment per bar (scalar or array
+            aligned with `closes`); 0 means "no news influence".
+
+    Returns:
+        (stance, confidence) arrays of len(closes). Bar 0 has no previous
+        close and is AVOID with confidence 0, like simple_strategy with
+        fewer than two candles.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    move = np.zeros_like(closes)
+    move[1:] = np.diff(closes)
+
+    stance = np.where(np.abs(move) < MOVE_THRESHOLD, AVOID, np.where(move > 0, BUY, SELL)).astype(np.int8)
+    confidence = np.where(stance == AVOID, AVOID_CONFIDENCE, TREND_CONFIDENCE)
+
+    if sentiment is not None:
+        sent = np.broadcast_to(np.asarray(sentiment, dtype=np.float64), closes.shape)
+        positive = sent > SENTIMENT_THRESHOLD
+        negative = sent < -SENTIMENT_THRESHOLD
+        agrees = (positive & (stance == BUY)) | (negative & (stance == SELL))
+        contradicts = (positive & (stance == SELL)) | (negative & (stance == BUY))
+        confidence = confidence + SENTIMENT_BONUS * agrees - SENTIMENT_PENALTY * contradicts
+
+    confidence = np.round(np.clip(confidence, 0.0, 1.0), 2)
+    if len(closes):
+        stance[0], confidence[0] = AVOID, 0.0
+    return stance, confidence
+
+
+def backtest_series(closes, sentiment=None, horizon: int = 1) -> Dict:
+    """
+    Backtest the rule over one close series.
+
+    Each BUY/SELL signal at bar i is scored on the relative move from close[i]
+    to close[i + horizon]; AVOID signals are flat. Bars without a full
+    horizon ahead are not scored. With horizon > 1, positions overlap and
+    the PnL curve sums them.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    stance, confidence = strategy_signals(closes, sentiment)
+    n = len(closes) - horizon
+    if n <= 0:
+        return _empty_result(len(closes))
+
+    stance, confidence = stance[:n], confidence[:n]
+    forward = (closes[horizon:horizon + n] - closes[:n]) / closes[:n]
+    pnl = stance * forward
+    curve = np.cumsum(pnl)
+
+    trades = stance != AVOID
+    n_trades = int(trades.sum())
+    hits = int((pnl[trades] > 0).sum())
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], curve)))[1:] - curve
+    counts = {name: int((stance == code).sum()) for code, name in STANCE_NAMES.items()}
+
+    return {
+        "bars": int(len(closes)),
+        "signals": int(n),
+        "trades": n_trades,
+        "hit_rate": round(hits / n_trades, 4) if n_trades else 0.0,
+        "total_return": round(float(curve[-1]), 6),
+        "avg_trade_return": round(float(pnl[trades].mean()), 8) if n_trades else 0.0,
+        "max_drawdown": round(float(drawdown.max()), 6),
+        "avg_confidence": round(float(confidence[trades].mean()), 3) if n_trades else 0.0,
+        "stances": counts,
+        "pnl_curve": curve,
+    }
+
+
+def _empty_result(bars: int) -> Dict:
+    return {
+        "bars": bars, "signals": 0, "trades": 0, "hit_rate": 0.0, "total_return": 0.0,
+        "avg_trade_return": 0.0, "max_drawdown": 0.0, "avg_confidence": 0.0,
+        "stances": {name: 0 for name in STANCE_NAMES.values()}, "pnl_curve": np.zeros(0),
+    }
+
+
+def _closes(data) -> np.ndarray:
+    """Close prices from an array, a list of Candle objects/dicts or an OHLC DataFrame."""
+    if hasattr(data, "columns"):
+        return data["Close"].to_numpy(dtype=np.float64).ravel()
+    if len(data) and not isinstance(data[0], (int, float, np.floating)):
+        first = data[0]
+        if isinstance(first, dict):
+            return np.fromiter((c["close"] for c in data), dtype=np.float64, count=len(data))
+        return np.fromiter((c.close for c in data), dtype=np.float64, count=len(data))
+    return np.asarray(data, dtype=np.float64)
+
+
+def backtest(candles_by_pair: Dict, sentiment_by_pair: Optional[Dict] = None, horizon: int = 1) -> Dict[str, Dict]:
+    """Backtest every pair in {pair: closes | Candle list | DataFrame}."""
+    sentiment_by_pair = sentiment_by_pair or {}
+    return {
+        pair: backtest_series(_closes(data), sentiment_by_pair.get(pair), horizon=horizon)
+        for pair, data in candles_by_pair.items()
+    }
+
+
+def _downsample(curve: np.ndarray, points: int = CURVE_POINTS):
+    if len(curve) <= points:
+        return [round(float(v), 6) for v in curve]
+    idx = np.linspace(0, len(curve) - 1, points).astype(int)
+    return [round(float(v), 6) for v in curve[idx]]
+
+
+# ----------------------------
+# Data loading
+# ----------------------------
+def load_history(pairs, source: str, bars: int, days: int, interval: str = "1h") -> Dict:
+    """
+    Historical OHLC frames per pair: synthetic random walks, raw local candle
+    files, or the configured market data provider (MARKET_DATA_PROVIDER).
+    """
+    from src.tools import providers
+
+    frames = {}
+    for pair in pairs:
+        try:
+            if source == "synthetic":
+                frames[pair] = providers.synthetic_candles(pair, bars)
+                continue
+            if source == "local":
+                frame = providers._read_local_file(pair, interval)
+                if frame is None:
+                    print(f"⚠️ No local candle file for {pair}")
+                    continue
+            else:
+                end = datetime.now(timezone.utc)
+                frame = providers.download_candles(f"{pair}=X", end - timedelta(days=days), end, interval)
+            frames[pair] = frame.iloc[-bars:] if bars else frame
+        except Exception as e:
+            print(f"⚠️ Failed to load history for {pair}: {e}")
+    return frames
+
+
+def archived_sentiment(frames: Dict, interval: str = "1h") -> Dict[str, np.ndarray]:
+    """
+    Per-bar news sentiment from the local news archive (src/tools/news_archive.py),
+    aligned to each frame's timestamps. Frames without a DatetimeIndex
+    (synthetic data) are skipped.
+    """
+    import pandas as pd
+    from src.tools.news_archive import sentiment_series
+    from src.tools.providers import INTERVAL_FREQ
+
+    freq = INTERVAL_FREQ.get(interval, "1h")
+    sentiment = {}
+    for pair, frame in frames.items():
+        index = frame.index
+        if not isinstance(index, pd.DatetimeIndex) or not len(index):
+            continue
+        index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+        series = sentiment_series(pair, index[0].to_pydatetime(), (index[-1] + pd.Timedelta(freq)).to_pydatetime(), freq)
+        sentiment[pair] = series.reindex(index.floor(freq)).fillna(0.0).to_numpy()
+    return sentiment
+
+
+# ----------------------------
+# Runner / CLI
+# ----------------------------
+def main(argv=None):
+    from src.guardrails.input_validation import ALLOWED_PAIRS, validate_pairs
+
+    parser = argparse.ArgumentParser(description="Vectorized backtest of simple_strategy.")
+    parser.add_argument("--pairs", default="all", help="Comma-separated pairs, or 'all' (ALLOWED_PAIRS)")
+    parser.add_argument("--source", choices=["synthetic", "local", "provider"], default="synthetic")
+    parser.add_argument("--bars", type=int, default=8760, help="Bars per pair (0 = everything loaded)")
+    parser.add_argument("--days", type=int, default=700, help="provider: days of history to request")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--horizon", type=int, default=1, help="Bars ahead each signal is scored on")
+    parser.add_argument("--news-sentiment", action="store_true",
+                        help="Adjust confidence with archived news sentiment (timestamped sources only)")
+    parser.add_argument("--output", default=EXPORT_PATH)
+    args = parser.parse_args(argv)
+
+    pairs = ALLOWED_PAIRS if args.pairs == "all" else validate_pairs(args.pairs.split(","))
+    frames = load_history(pairs, args.source, args.bars, args.days, args.interval)
+
+    sentiment = archived_sentiment(frames, args.interval) if args.news_sentiment else None
+
+    start = time.perf_counter()
+    results = backtest(frames, sentiment, horizon=args.horizon)
+    elapsed = time.perf_counter() - start
+    total_bars = sum(r["bars"] for r in results.values())
+
+    print(f"\n📊 Backtested {len(results)} pairs / {total_bars:,} bars in {elapsed * 1000:.1f} ms")
+    print(f"\n{'Pair':<8} {'Bars':>7} {'Trades':>7} {'Hit rate':>9} {'Return':>9} {'Max DD':>8}  Stances")
+    for pair, r in results.items():
+        print(f"{pair:<8} {r['bars']:>7} {r['trades']:>7} {r['hit_rate'] * 100:>8.1f}% "
+              f"{r['total_return'] * 100:>8.2f}% {r['max_drawdown'] * 100:>7.2f}%  {r['stances']}")
+
+    export_data = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "source": args.source,
+        "interval": args.interval,
+        "horizon": args.horizon,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "pairs": {pair: {**r, "pnl_curve": _downsample(r["pnl_curve"])} for pair, r in results.items()},
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(export_data, f, indent=2)
+    print(f"\n📁 Results exported to: {args.output}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
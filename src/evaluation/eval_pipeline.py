@@ -5,7 +5,7 @@ Analyzes trace logs generated by graph.py to measure:
 ✅ Success/failure rates
 ✅ Average confidence per pair
 ✅ Action distribution (BUY/SELL/AVOID)
-✅ Step timing performance (avg/min/max)
+✅ Step timing performance (avg/min/max; nested span durations when traces have them)
 ✅ Common failure causes
 ✅ Category-level metrics (Major / Minor / Exotic)
 ✅ Invalid/skipped pair tracking
@@ -20,30 +20,65 @@ import statistics
 from datetime import datetime, timezone
 from collections import defaultdict
 
-# Location of trace logs
-TRACE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "traces")
+# Location of trace logs (TRACE_DIR, with the same default graph.py writes to).
+# Computed here rather than imported: importing src.graph would load the
+# strategy/email tools and create PIPELINE_STATE just to read a path.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # project root
+DEFAULT_TRACE_DIR = os.path.join(BASE_DIR, "data", "traces")
+TRACE_DIR = os.getenv("TRACE_DIR", DEFAULT_TRACE_DIR)
 EXPORT_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "evaluation_summary.json")
 
 
 # ----------------------------
 # Helpers
 # ----------------------------
-def load_traces():
-    """Load all saved JSON trace files from data/traces directory."""
+def load_traces(trace_dir=None, since=None, pairs=None):
+    """
+    Load saved traces: loose JSON files plus compacted segments
+    (src/trace_compaction.py). `since` (datetime) and `pairs` narrow the
+    result; for segments they skip whole day/pair partitions.
+    """
+    from src.trace_compaction import iter_segment_traces
+
+    trace_dir = trace_dir or TRACE_DIR
     traces = []
-    if not os.path.exists(TRACE_DIR):
-        print("⚠️ No trace directory found:", TRACE_DIR)
+    if not os.path.exists(trace_dir):
+        print("⚠️ No trace directory found:", trace_dir)
         return traces
 
-    for file in os.listdir(TRACE_DIR):
+    wanted = {p.upper() for p in pairs} if pairs else None
+    since = since.replace(tzinfo=since.tzinfo or timezone.utc) if since else None
+
+    def keep(trace):
+        if wanted is not None and str(trace.get("pair", "")).upper() not in wanted:
+            return False
+        started = _to_dt(trace.get("started_at"))
+        return since is None or started is None or started >= since
+
+    for file in os.listdir(trace_dir):
         if not file.endswith(".json"):
             continue
-        path = os.path.join(TRACE_DIR, file)
+        path = os.path.join(trace_dir, file)
         try:
             with open(path, "r", encoding="utf-8") as f:
-                traces.append(json.load(f))
+                trace = json.load(f)
         except Exception as e:
             print(f"⚠️ Failed to load {file}: {e}")
+            continue
+        if keep(trace):
+            traces.append(trace)
+
+    # A run can be in both places if compaction was interrupted before deleting the file
+    seen = {t.get("run_id") for t in traces if t.get("run_id")}
+    try:
+        for trace in iter_segment_traces(trace_dir, since=since, pairs=pairs):
+            run_id = trace.get("run_id")
+            if (run_id and run_id in seen) or not keep(trace):
+                continue
+            seen.add(run_id)
+            traces.append(trace)
+    except Exception as e:
+        print(f"⚠️ Failed to read compacted segments: {e}")
     return traces
 
 
@@ -64,7 +99,21 @@ def _to_dt(ts):
 
 
 def compute_step_durations(trace):
-    """Compute durations (seconds) between consecutive steps in a trace."""
+    """
+    Stage durations (seconds) for a trace. Uses the recorded spans when
+    present: exact, keyed by nested path ("strategy/indicators"), with repeated
+    spans summed. Older traces fall back to the gaps between step timestamps.
+    """
+    spans = trace.get("spans")
+    if spans:
+        durations = defaultdict(float)
+        for s in spans:
+            try:
+                durations[s.get("path") or s["name"]] += float(s["duration_ms"]) / 1000
+            except (KeyError, TypeError, ValueError):
+                continue
+        return dict(durations)
+
     durations = {}
     steps = trace.get("steps", []) or []
     for i in range(len(steps) - 1):
@@ -152,9 +201,9 @@ def summarize_traces(traces):
         for step_key, values in data["timings"].items():
             if values:
                 step_times[step_key] = {
-                    "avg": round(statistics.mean(values), 2),
-                    "min": round(min(values), 2),
-                    "max": round(max(values), 2),
+                    "avg": round(statistics.mean(values), 4),
+                    "min": round(min(values), 4),
+                    "max": round(max(values), 4),
                     "samples": len(values),
                 }
 
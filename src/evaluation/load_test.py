@@ -0,0 +1,283 @@
+"""
+Load-test harness for the FastAPI service (api:app).
+
+Replays a weighted mix of endpoints and pairs with an open-loop arrival
+process (requests are fired on schedule regardless of how many are still
+in flight) and reports throughput, p50/p95/p99 latency and error rate.
+Latency is measured from the *scheduled* send time, so queueing inside the
+client is not hidden (no coordinated omission).
+
+Usage:
+    # in-process (ASGI transport, no server needed), fully offline providers
+    python -m src.evaluation.load_test --offline --rate 20 --duration 30
+
+    # against a running server
+    python -m src.evaluation.load_test --url http://127.0.0.1:8000 --mix run=1,recommendations=4
+
+    # sweep arrival rates to find the saturation point
+    python -m src.evaluation.load_test --offline --sweep 5,10,20,40,80 --duration 15
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+# Endpoint name → (path, takes a pair)
+ENDPOINTS = {
+    "run": ("/api/run", True),
+    "recommendations": ("/api/recommendations", False),
+    "history": ("/api/history", True),
+    "health": ("/api/health", False),
+    "metrics": ("/api/metrics", False),
+}
+
+DEFAULT_MIX = "run=1,recommendations=4,history=2,health=1"
+DEFAULT_PAIRS = "EURUSD,GBPUSD,USDJPY,AUDUSD,AUDCAD,GBPCAD"
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'run=1,recommendations=4' into endpoint weights."""
+    weights = {}
+    for part in mix.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}'. Known: {sorted(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError("Endpoint mix must contain at least one positive weight")
+    return weights
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(samples: List[Dict], elapsed: float, offered_rate: float, window: float = None) -> Dict:
+    """
+    Aggregate raw request samples into overall and per-endpoint stats.
+
+    `elapsed` includes draining in-flight requests; `window` is the arrival
+    window, used to report the rate that was actually issued.
+    """
+    def _stats(rows):
+        latencies = sorted(r["latency_ms"] for r in rows)
+        errors = sum(1 for r in rows if not r["ok"])
+        return {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "throughput_rps": round(len(rows) / elapsed, 2) if elapsed > 0 else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        }
+
+    by_endpoint = defaultdict(list)
+    statuses = defaultdict(int)
+    for r in samples:
+        by_endpoint[r["endpoint"]].append(r)
+        statuses[str(r["status"])] += 1
+
+    report = _stats(samples)
+    report.update({
+        "offered_rate_rps": offered_rate,
+        "issued_rate_rps": round(len(samples) / (window or elapsed), 2) if (window or elapsed) > 0 else 0.0,
+        "duration_s": round(elapsed, 2),
+        "status_codes": dict(statuses),
+        "endpoints": {name: _stats(rows) for name, rows in by_endpoint.items()},
+    })
+    return report
+
+
+def is_saturated(report: Dict, max_p99_ms: float, max_error_rate: float) -> bool:
+    """A rate is saturated if p99 or error rate exceed limits, or throughput falls behind the issued load."""
+    return (
+        report["p99_ms"] > max_p99_ms
+        or report["error_rate"] > max_error_rate
+        or report["throughput_rps"] < 0.9 * report["issued_rate_rps"]
+    )
+
+
+# ----------------------------
+# Open-loop generator
+# ----------------------------
+async def run_load(
+    client: httpx.AsyncClient,
+    rate: float,
+    duration: float,
+    mix: Dict[str, float],
+    pairs: List[str],
+    arrival: str = "poisson",
+    timeout: float = 30.0,
+    max_inflight: int = 1000,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Fire requests at `rate` per second for `duration` seconds and summarize the results."""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    samples: List[Dict] = []
+    inflight = set()
+
+    async def _send(endpoint: str, pair: str, scheduled: float):
+        path, takes_pair = ENDPOINTS[endpoint]
+        params = {"pair": pair} if takes_pair else None
+        status, ok = "timeout", False
+        try:
+            resp = await client.get(path, params=params, timeout=timeout)
+            status, ok = resp.status_code, resp.status_code < 400
+        except httpx.TimeoutException:
+            pass
+        except Exception as e:
+            status = type(e).__name__
+        samples.append({
+            "endpoint": endpoint,
+            "status": status,
+            "ok": ok,
+            "latency_ms": (time.perf_counter() - scheduled) * 1000.0,
+        })
+
+    start = time.perf_counter()
+    next_at = start
+    while True:
+        next_at += rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+        if next_at - start >= duration:
+            break
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        endpoint = rng.choices(names, weights)[0]
+        if len(inflight) >= max_inflight:
+            samples.append({"endpoint": endpoint, "status": "client_overload", "ok": False, "latency_ms": 0.0})
+            continue
+        task = asyncio.create_task(_send(endpoint, rng.choice(pairs), next_at))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+
+    if inflight:
+        await asyncio.wait(list(inflight))
+    return summarize(samples, time.perf_counter() - start, rate, window=duration)
+
+
+def make_client(url: Optional[str] = None, app=None) -> httpx.AsyncClient:
+    """HTTP client against a URL, or an in-process ASGI client for `app`."""
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    if url:
+        return httpx.AsyncClient(base_url=url.rstrip("/"), limits=limits)
+    if app is None:
+        from api import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", limits=limits)
+
+
+async def sweep(client_factory, rates: List[float], max_p99_ms: float, max_error_rate: float, **kwargs) -> Dict:
+    """Run increasing arrival rates until the service saturates."""
+    steps = []
+    sustained = None
+    for rate in rates:
+        async with client_factory() as client:
+            report = await run_load(client, rate=rate, **kwargs)
+        saturated = is_saturated(report, max_p99_ms, max_error_rate)
+        report["saturated"] = saturated
+        steps.append(report)
+        print(
+            f"  rate={rate:>7.1f} rps → thrpt={report['throughput_rps']:>7.1f} "
+            f"p50={report['p50_ms']:.0f}ms p95={report['p95_ms']:.0f}ms p99={report['p99_ms']:.0f}ms "
+            f"err={report['error_rate'] * 100:.1f}%{'  ⚠️ saturated' if saturated else ''}"
+        )
+        if saturated:
+            break
+        sustained = rate
+    return {"max_sustained_rate_rps": sustained, "steps": steps}
+
+
+def _enable_offline_providers():
+    """Point the in-process app at local candle files, the RSS stub and dry-run email."""
+    from src.tools import news_tool
+    from src.tools.stub_servers import RSSStubServer, start_in_thread
+
+    os.environ.setdefault("MARKET_DATA_PROVIDER", "local")
+    os.environ["EMAIL_DRYRUN"] = "True"
+    feeds_dir = os.path.join(os.path.dirname(__file__), "..", "..", "tests", "performance", "fixtures")
+    server = RSSStubServer(("127.0.0.1", 0), feeds_dir, entries=int(os.getenv("LOADTEST_RSS_ENTRIES", 40)))
+    start_in_thread(server)
+    news_tool.RSS_SOURCES = [f"http://127.0.0.1:{server.server_address[1]}/forex_news.xml"]
+    return server
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop load generator for the Forex API.")
+    parser.add_argument("--url", default=None, help="Target base URL (default: in-process api:app)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. run=1,recommendations=4")
+    parser.add_argument("--pairs", default=DEFAULT_PAIRS, help="Comma-separated pairs to replay")
+    parser.add_argument("--rate", type=float, default=10.0, help="Arrival rate (requests/second)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per run / sweep step")
+    parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--max-inflight", type=int, default=1000)
+    parser.add_argument("--sweep", default=None, help="Comma-separated rates to sweep, e.g. 5,10,20,40")
+    parser.add_argument("--max-p99-ms", type=float, default=2000.0, help="Sweep: p99 limit")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Sweep: error-rate limit")
+    parser.add_argument("--offline", action="store_true", help="In-process only: use local stand-in providers")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    if args.offline and not args.url:
+        _enable_offline_providers()
+
+    mix = parse_mix(args.mix)
+    pairs = [p.strip().upper() for p in args.pairs.split(",") if p.strip()]
+    target = args.url or "in-process api:app"
+    common = dict(duration=args.duration, mix=mix, pairs=pairs, arrival=args.arrival,
+                  timeout=args.timeout, max_inflight=args.max_inflight, seed=args.seed)
+
+    print(f"\n🏋️ Load test → {target} | mix={args.mix} | pairs={','.join(pairs)}")
+    if args.sweep:
+        rates = [float(r) for r in args.sweep.split(",") if r.strip()]
+        result = asyncio.run(sweep(lambda: make_client(args.url), rates, args.max_p99_ms, args.max_error_rate, **common))
+        print(f"\n📈 Saturation point: max sustained rate = {result['max_sustained_rate_rps']} rps")
+    else:
+        async def _single():
+            async with make_client(args.url) as client:
+                return await run_load(client, rate=args.rate, **common)
+        result = asyncio.run(_single())
+        print(json.dumps({k: v for k, v in result.items() if k != "endpoints"}, indent=2))
+        for name, stats in result["endpoints"].items():
+            print(f"  {name:<16} n={stats['requests']:<6} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms "
+                  f"p99={stats['p99_ms']}ms err={stats['error_rate'] * 100:.1f}%")
+
+    result.update({"generated_at": datetime.now(timezone.utc).isoformat(), "target": target, "mix": mix})
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n📁 Report written to {args.output}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -3,38 +3,71 @@
 End-to-end multi-agent orchestration for the Forex strategy system.
 
 Flow:
-1️⃣ Market + News (via run_strategy_for_pair)
-2️⃣ Strategy Agent
-3️⃣ Email Agent
-4️⃣ Tracing for evaluation and audit
+1️⃣ Market + News (via gather_strategy_inputs)
+2️⃣ Input fingerprint: unchanged inputs → previous Recommendation, no trace/email
+   (remembered only after the email step succeeds, so failed live sends are retried)
+3️⃣ Strategy Agent
+4️⃣ Email Agent (optionally only on stance change)
+5️⃣ Tracing for evaluation and audit (steps + nested timing spans, see src/observability/tracing.py)
 """
 
 import os
 import json
 import uuid
 from datetime import datetime, timezone
-from src.tools.strategy_tools import run_strategy_for_pair
+from src.tools.strategy_tools import gather_strategy_inputs, input_fingerprint, run_strategy_on_inputs
 from src.tools.email_tool import send_strategy_email
+from src.observability.profiling import profile_run
+from src.observability.tracing import span, start_trace
+from src.pipeline_state import build_pipeline_state
 
 # Local trace storage (env override with sensible default)
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # project root
 DEFAULT_TRACE_DIR = os.path.join(BASE_DIR, "data", "traces")
 TRACE_DIR = os.getenv("TRACE_DIR", DEFAULT_TRACE_DIR)
-os.makedirs(TRACE_DIR, exist_ok=True)
+
+# Skip strategy/trace/email when the inputs match the previous run
+SKIP_UNCHANGED = os.getenv("SKIP_UNCHANGED", "True").lower() == "true"
+# Only email when the stance differs from the last emailed one
+EMAIL_ON_STANCE_CHANGE_ONLY = os.getenv("EMAIL_ON_STANCE_CHANGE_ONLY", "False").lower() == "true"
+
+PIPELINE_STATE = build_pipeline_state()
 
 
 def save_trace(run_id: str, trace: dict):
     """Persist trace log for evaluation/fallback checks."""
+    os.makedirs(TRACE_DIR, exist_ok=True)
     path = os.path.join(TRACE_DIR, f"{run_id}.json")
     with open(path, "w", encoding="utf-8") as f:
         json.dump(trace, f, indent=2, default=str)
 
 
+def _email_result(response: dict) -> dict:
+    """
+    Inner result of the @mcp_tool-wrapped send_strategy_email
+    ({"status": "success", "data": {"status": "sent", ...}} → {"status": "sent", ...}).
+    A failed tool call becomes {"status": "error", "error": ...}.
+    """
+    data = response.get("data")
+    if isinstance(data, dict):
+        return data
+    if response.get("status") in ("failed", "failed_with_fallback_error"):
+        return {"status": "error", "recipient": None, "error": response.get("error")}
+    return response
+
+
 def run_pipeline_once(pair: str, dry_run_email: bool = True):
     """
     Executes the full pipeline for one forex pair.
     Handles market, news, strategy, and email stages.
+    Profiled with cProfile when PROFILE_PIPELINE / a profile window is active.
     """
+    with profile_run(f"pipeline_{pair}") as profile, start_trace() as recorder:
+        return _run_pipeline_steps(pair, dry_run_email, profile_id=profile["profile_id"] if profile else None,
+                                   recorder=recorder)
+
+
+def _run_pipeline_steps(pair: str, dry_run_email: bool, profile_id: str = None, recorder=None):
     run_id = uuid.uuid4().hex
     trace = {
         "run_id": run_id,
@@ -42,18 +75,39 @@ def run_pipeline_once(pair: str, dry_run_email: bool = True):
         "started_at": datetime.now(timezone.utc).isoformat(),
         "steps": [],
     }
+    if profile_id:
+        trace["profile_id"] = profile_id
 
     rec = None  # ensure defined even if strategy fails
+    save = True
 
     try:
         print(f"\n🔹 Starting pipeline for {pair}")
 
-        # 1️⃣ Strategy Tool (includes market + news)
+        # 1️⃣ Strategy Tool (market + news, then the decision)
         trace["steps"].append({
             "step": "strategy_tool_start",
             "ts": datetime.now(timezone.utc).isoformat(),
         })
-        rec = run_strategy_for_pair(pair)
+        with span("gather_inputs", pair=pair):
+            candles, news_items = gather_strategy_inputs(pair)
+        with span("fingerprint"):
+            fingerprint = input_fingerprint(pair, candles, news_items)
+        trace["fingerprint"] = fingerprint
+
+        previous = PIPELINE_STATE.previous(pair, fingerprint) if SKIP_UNCHANGED else None
+        if previous is not None:
+            # Same last bar, same headlines, same strategy version → same result
+            rec = previous
+            save = False
+            trace.update({"status": "success", "skipped": "unchanged_inputs",
+                          "finished_at": datetime.now(timezone.utc).isoformat()})
+            print(f"⏭️ Inputs unchanged for {pair}; reusing previous recommendation")
+            return trace
+
+        with span("strategy", candles=len(candles), news=len(news_items)) as strategy_span:
+            rec = run_strategy_on_inputs(pair, candles, news_items)
+            strategy_span.set_attribute("stance", rec.stance)
 
         # Validate Recommendation fields
         rec.stance = getattr(rec, "stance", "AVOID")
@@ -93,7 +147,19 @@ def run_pipeline_once(pair: str, dry_run_email: bool = True):
                 url_suffix = f" ({url})" if url else ""
                 body += f"• {title} — {source}{url_suffix}\n"
 
-        email_resp = send_strategy_email(subject, body, dry_run=dry_run_email)
+        with span("email", dry_run=dry_run_email) as email_span:
+            if EMAIL_ON_STANCE_CHANGE_ONLY and PIPELINE_STATE.emailed_stance(pair) == rec.stance:
+                email_resp = {"status": "skipped_no_change", "recipient": None}
+            else:
+                email_resp = _email_result(send_strategy_email(subject, body, dry_run=dry_run_email))
+                if email_resp.get("status") == "sent":
+                    PIPELINE_STATE.mark_emailed(pair, rec.stance)
+            email_span.set_attribute("status", email_resp.get("status"))
+
+        # Remember the fingerprint only once this run's email is settled, so a
+        # failed live send is retried on the next (unchanged-input) run
+        if dry_run_email or email_resp.get("status") in ("sent", "skipped_no_change"):
+            PIPELINE_STATE.remember(pair, fingerprint, rec)
 
         trace["steps"].append({
             "step": "email_agent_end",
@@ -107,6 +173,8 @@ def run_pipeline_once(pair: str, dry_run_email: bool = True):
 
         if email_resp.get("status") == "sent":
             print(f"📧 Email successfully sent to {email_resp.get('recipient')}")
+        elif email_resp.get("status") == "skipped_no_change":
+            print(f"✉️ Email skipped (stance still {rec.stance})")
         else:
             print("✉️ Email simulated (dry-run mode)")
 
@@ -114,13 +182,17 @@ def run_pipeline_once(pair: str, dry_run_email: bool = True):
 
     except Exception as e:
         trace["error"] = str(e)
+        trace["error_type"] = type(e).__name__
         trace["status"] = "error"
         print(f"❌ Error processing {pair}: {e}")
 
     finally:
         if rec is not None:
             trace["recommendation"] = rec
-        save_trace(run_id, trace)
+        if recorder is not None:
+            trace["spans"] = recorder.export()
+        if save:
+            save_trace(run_id, trace)
         return trace
 
 
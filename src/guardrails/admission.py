@@ -0,0 +1,151 @@
+"""
+admission.py
+------------
+Bounded admission queue in front of pipeline execution (/api/run).
+
+A burst of /api/run calls used to start as many pipelines as there were
+threadpool workers. Each run then competed for CPU and for the upstream rate
+limits, all of them slowed down, and eventually every request timed out. Now
+at most ADMISSION_MAX_CONCURRENT pipelines run at once. Up to
+ADMISSION_QUEUE_SIZE further requests wait in FIFO order (each takes a ticket;
+only the oldest ticket may claim a freed slot), for at most
+ADMISSION_QUEUE_TIMEOUT seconds. Anything beyond that is shed with
+Overloaded, which the API turns into 429 + Retry-After. Overload therefore
+costs some requests instead of all of them.
+
+Queued requests still hold a threadpool worker (the endpoint is sync), so keep
+max_concurrent + queue_size below the server's threadpool size (40 by default).
+Limits are per API process. ADMISSION_MAX_CONCURRENT=0 disables admission control.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from src.observability.stats import RollingLatency
+
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", 4))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", 16))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 30))
+
+QUEUE_DEPTH = Gauge("admission_queue_depth", "Pipeline runs waiting for an admission slot")
+IN_FLIGHT = Gauge("admission_in_flight", "Pipeline runs currently admitted")
+WAIT_SECONDS = Histogram(
+    "admission_wait_seconds", "Time spent queued before a pipeline run was admitted",
+    buckets=(0.005, 0.05, 0.25, 1, 2.5, 5, 10, 30, 60),
+)
+REJECTED = Counter("admission_rejected_total", "Pipeline runs shed by admission control", ["reason"])
+
+
+class Overloaded(Exception):
+    """Admission queue is full (or the wait timed out); retry after `retry_after` seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server overloaded ({reason}); retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit + bounded FIFO wait queue."""
+
+    def __init__(self, max_concurrent: int = ADMISSION_MAX_CONCURRENT, queue_size: int = ADMISSION_QUEUE_SIZE,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._queue = deque()  # tickets of queued requests, oldest first
+        self.active = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+        self._wait = RollingLatency()
+        self._run = RollingLatency()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: median run time × queue 'rounds' ahead."""
+        run_s = self._run.percentiles()["p50_ms"] / 1000 or 1.0
+        rounds = self.waiting // max(self.max_concurrent, 1) + 1
+        return min(max(math.ceil(run_s * rounds), 1), 300)
+
+    def _reject(self, reason: str):
+        # caller holds self._cond
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        REJECTED.labels(reason=reason).inc()
+        raise Overloaded(reason, self.retry_after())
+
+    @contextmanager
+    def admit(self, timeout: float = None):
+        """Hold an execution slot for the duration of the block; yields the seconds spent queued."""
+        if not self.enabled:
+            yield 0.0
+            return
+
+        timeout = self.queue_timeout if timeout is None else timeout
+        start = time.monotonic()
+        with self._cond:
+            # Queue behind existing waiters even if a slot just opened: only the
+            # oldest ticket may take a freed slot, so newcomers cannot barge in
+            if self.active >= self.max_concurrent or self._queue:
+                if self.waiting >= self.queue_size:
+                    self._reject("queue_full")
+                ticket = object()
+                self._queue.append(ticket)
+                QUEUE_DEPTH.set(self.waiting)
+                try:
+                    deadline = start + timeout
+                    while self._queue[0] is not ticket or self.active >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._reject("timeout")
+                        self._cond.wait(remaining)
+                finally:
+                    self._queue.remove(ticket)
+                    QUEUE_DEPTH.set(self.waiting)
+                    # The next ticket is now at the head (admitted or timed out, either way)
+                    self._cond.notify_all()
+            self.active += 1
+            self.admitted += 1
+            IN_FLIGHT.set(self.active)
+            waited = time.monotonic() - start
+            self._wait.add(waited)
+        WAIT_SECONDS.observe(waited)
+
+        began = time.monotonic()
+        try:
+            yield waited
+        finally:
+            with self._cond:
+                self.active -= 1
+                IN_FLIGHT.set(self.active)
+                self._run.add(time.monotonic() - began)
+                self._cond.notify_all()  # only the head ticket proceeds, the rest wait again
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "queue_size": self.queue_size,
+                "in_flight": self.active,
+                "queue_depth": self.waiting,
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "wait": dict(self._wait.percentiles()),
+            }
+
+
+ADMISSION = AdmissionController()
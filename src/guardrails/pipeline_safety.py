@@ -20,6 +20,11 @@ def safe_run_pipeline_once(pair: str, retries: int = 3, delay: float = 1.0) -> R
                     # Coerce dict to Recommendation
                     return Recommendation(**rec)
 
+            if trace.get("error_type") == "RateLimitTimeout":
+                # Upstream queue is already full: retrying would only add to the burst
+                print(f"⏳ Rate limited upstream for {pair}; not retrying")
+                break
+
         except Exception as e:
             print(f"⚠️ Attempt {attempt} failed for {pair}: {e}")
             last_exception = e
@@ -0,0 +1,124 @@
+# src/http_cache.py
+"""
+Conditional, pre-compressed JSON responses for read endpoints.
+
+Response bodies are serialized once per cache version and kept together
+with their gzip / brotli encodings, so polling clients cost a version
+lookup and a header comparison:
+
+- ETag is a hash of the serialized body. Version counters restart at 0 and
+  are per worker in memory mode, so tags built from them could match a
+  different body after a restart or on another worker. The version only
+  decides when to rebuild.
+- If-None-Match → 304 Not Modified
+- Accept-Encoding → br (if the optional `brotli` package is installed) or gzip
+  for bodies of at least COMPRESS_MIN_BYTES
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Response
+
+try:  # optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+
+
+def make_etag(key: str, body: bytes) -> str:
+    # Weak: the same body may be sent with different content encodings
+    return f'W/"{key}-{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 7232 weak comparison against an If-None-Match header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header (q-values only matter when 0)."""
+    if not accept_encoding:
+        return None
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q > 0
+    if brotli is not None and offered.get("br"):
+        return "br"
+    if offered.get("gzip"):
+        return "gzip"
+    return None
+
+
+class EncodedPayload:
+    """A serialized JSON body plus lazily computed compressed variants."""
+
+    def __init__(self, key: str, version: int, body: bytes):
+        self.version = version
+        self.etag = make_etag(key, body)
+        self.body = body
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        if encoding is None or len(self.body) < COMPRESS_MIN_BYTES:
+            return self.body, None
+        with self._lock:
+            data = self._encoded.get(encoding)
+            if data is None:
+                data = brotli.compress(self.body, quality=5) if encoding == "br" else gzip.compress(self.body, 6)
+                self._encoded[encoding] = data
+        return data, encoding
+
+    def to_response(self, if_none_match: Optional[str], accept_encoding: Optional[str]) -> Response:
+        headers = {"ETag": self.etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=headers)
+        data, encoding = self.encoded(choose_encoding(accept_encoding))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=data, media_type="application/json", headers=headers)
+
+
+class EncodedPayloadCache:
+    """Latest EncodedPayload per endpoint key; rebuilt only when the version changes."""
+
+    def __init__(self):
+        self._payloads: Dict[str, EncodedPayload] = {}
+
+    def get(self, key: str, version: int, build: Callable[[], Tuple[int, bytes]]) -> EncodedPayload:
+        """
+        Return the payload for `key` at `version`, calling `build()` → (version, body)
+        on a miss. The built version is used as-is, so the ETag never claims a
+        newer version than the body it was serialized from.
+        """
+        payload = self._payloads.get(key)
+        if payload is None or payload.version != version:
+            built_version, body = build()
+            payload = EncodedPayload(key, built_version, body)
+            self._payloads[key] = payload
+        return payload
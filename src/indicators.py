@@ -0,0 +1,246 @@
+# src/indicators.py
+"""
+Incremental technical indicators per pair: SMA, EMA, ATR, RSI and rolling
+volatility of log returns.
+
+Each pair keeps streaming state, so a new bar costs O(1) no matter how long
+the history is. The first time a pair is seen, its state is built from the
+fetched history in one vectorized NumPy pass. After that, only bars newer
+than the last one seen are applied. The strategy reads the values from
+`INDICATORS.update(pair, candles)` and adds them to its rationale.
+
+Warm-up follows the usual definitions: SMA/EMA need `period` closes (EMA is
+seeded with the SMA), ATR/RSI use Wilder smoothing seeded with the mean of
+the first `period` values, and volatility needs `window` returns. Values are
+None until then.
+"""
+
+import bisect
+import copy
+import math
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+SMA_PERIOD = int(os.getenv("INDICATOR_SMA_PERIOD", 20))
+EMA_PERIOD = int(os.getenv("INDICATOR_EMA_PERIOD", 20))
+ATR_PERIOD = int(os.getenv("INDICATOR_ATR_PERIOD", 14))
+RSI_PERIOD = int(os.getenv("INDICATOR_RSI_PERIOD", 14))
+VOL_WINDOW = int(os.getenv("INDICATOR_VOL_WINDOW", 24))
+
+
+def _ewm_final(seed: float, values: "np.ndarray", alpha: float) -> float:
+    """Last value of x_t = (1 - alpha) * x_{t-1} + alpha * v_t started at `seed`, without a Python loop."""
+    import numpy as np
+
+    k = len(values)
+    if k == 0:
+        return float(seed)
+    decay = (1.0 - alpha) ** np.arange(k - 1, -1, -1, dtype=np.float64)
+    return float(seed * (1.0 - alpha) ** k + alpha * np.dot(decay, values))
+
+
+class _Wilder:
+    """Average of the first `period` values, then Wilder smoothing."""
+
+    __slots__ = ("period", "value", "_sum", "_count")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.value: Optional[float] = None
+        self._sum = 0.0
+        self._count = 0
+
+    def update(self, x: float):
+        if self.value is None:
+            self._sum += x
+            self._count += 1
+            if self._count == self.period:
+                self.value = self._sum / self.period
+        else:
+            self.value += (x - self.value) / self.period
+
+    def initialize(self, values: "np.ndarray"):
+        if len(values) < self.period:
+            self._sum, self._count = float(values.sum()), len(values)
+            return
+        self._count = self.period
+        self.value = _ewm_final(values[:self.period].mean(), values[self.period:], 1.0 / self.period)
+
+
+class IndicatorState:
+    """Streaming indicator state for one pair."""
+
+    def __init__(self, sma_period: int = SMA_PERIOD, ema_period: int = EMA_PERIOD, atr_period: int = ATR_PERIOD,
+                 rsi_period: int = RSI_PERIOD, vol_window: int = VOL_WINDOW):
+        self.sma_period, self.ema_period, self.vol_window = sma_period, ema_period, vol_window
+        self.bars = 0
+        self.last_ts: Optional[datetime] = None
+        self.prev_close: Optional[float] = None
+
+        self._sma_window = deque(maxlen=sma_period)
+        self._sma_sum = 0.0
+        self._ema: Optional[float] = None
+        self._ema_seed_sum = 0.0
+        self._atr = _Wilder(atr_period)
+        self._gain = _Wilder(rsi_period)
+        self._loss = _Wilder(rsi_period)
+        self._returns = deque(maxlen=vol_window)
+        self._ret_sum = 0.0
+        self._ret_sq = 0.0
+
+    # --- O(1) per bar ---
+    def update(self, high: float, low: float, close: float, ts: datetime = None):
+        if len(self._sma_window) == self.sma_period:
+            self._sma_sum -= self._sma_window[0]
+        self._sma_window.append(close)
+        self._sma_sum += close
+
+        if self._ema is None:
+            self._ema_seed_sum += close
+            if self.bars + 1 == self.ema_period:
+                self._ema = self._ema_seed_sum / self.ema_period
+        else:
+            self._ema += (close - self._ema) * 2.0 / (self.ema_period + 1)
+
+        if self.prev_close is not None:
+            prev = self.prev_close
+            self._atr.update(max(high - low, abs(high - prev), abs(low - prev)))
+            change = close - prev
+            self._gain.update(max(change, 0.0))
+            self._loss.update(max(-change, 0.0))
+            if prev > 0 and close > 0:
+                r = math.log(close / prev)
+                if len(self._returns) == self.vol_window:
+                    old = self._returns[0]
+                    self._ret_sum -= old
+                    self._ret_sq -= old * old
+                self._returns.append(r)
+                self._ret_sum += r
+                self._ret_sq += r * r
+
+        self.prev_close = close
+        self.last_ts = ts
+        self.bars += 1
+
+    # --- vectorized warm start ---
+    def initialize(self, highs, lows, closes, last_ts: datetime = None):
+        """Build the state from full history in one pass (replaces any existing state)."""
+        import numpy as np  # only needed for warm starts; keeps API import light
+
+        self.__init__(self.sma_period, self.ema_period, self._atr.period, self._gain.period, self.vol_window)
+        h = np.asarray(highs, dtype=np.float64)
+        l = np.asarray(lows, dtype=np.float64)
+        c = np.asarray(closes, dtype=np.float64)
+        n = len(c)
+        if n == 0:
+            return
+
+        tail = c[-self.sma_period:]
+        self._sma_window.extend(tail.tolist())
+        self._sma_sum = float(tail.sum())
+
+        if n >= self.ema_period:
+            self._ema = _ewm_final(c[:self.ema_period].mean(), c[self.ema_period:], 2.0 / (self.ema_period + 1))
+        else:
+            self._ema_seed_sum = float(c.sum())
+
+        if n > 1:
+            prev = c[:-1]
+            tr = np.maximum(h[1:] - l[1:], np.maximum(np.abs(h[1:] - prev), np.abs(l[1:] - prev)))
+            change = np.diff(c)
+            self._atr.initialize(tr)
+            self._gain.initialize(np.clip(change, 0.0, None))
+            self._loss.initialize(np.clip(-change, 0.0, None))
+            valid = (prev > 0) & (c[1:] > 0)
+            returns = np.log(c[1:][valid] / prev[valid])[-self.vol_window:]
+            self._returns.extend(returns.tolist())
+            self._ret_sum = float(returns.sum())
+            self._ret_sq = float(np.dot(returns, returns))
+
+        self.prev_close = float(c[-1])
+        self.last_ts = last_ts
+        self.bars = n
+
+    def peek(self, high: float, low: float, close: float) -> Dict[str, Optional[float]]:
+        """Values as if the bar were applied, without committing it (for a still-forming bar)."""
+        preview = copy.deepcopy(self)  # bounded by the window sizes, not the history length
+        preview.update(high, low, close)
+        return preview.values()
+
+    def values(self) -> Dict[str, Optional[float]]:
+        sma = self._sma_sum / self.sma_period if len(self._sma_window) == self.sma_period else None
+        rsi = None
+        if self._gain.value is not None:
+            gain, loss = self._gain.value, self._loss.value
+            rsi = 100.0 if loss == 0 and gain > 0 else 50.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+        vol = None
+        k = len(self._returns)
+        if k == self.vol_window and k > 1:
+            var = (self._ret_sq - self._ret_sum * self._ret_sum / k) / (k - 1)
+            vol = math.sqrt(max(var, 0.0))
+        return {
+            f"sma_{self.sma_period}": sma,
+            f"ema_{self.ema_period}": self._ema,
+            f"atr_{self._atr.period}": self._atr.value,
+            f"rsi_{self._gain.period}": rsi,
+            f"volatility_{self.vol_window}": vol,
+        }
+
+
+def _ts(candle):
+    return candle.ts
+
+
+class IndicatorEngine:
+    """Indicator state for every pair, fed with the candles each run fetches."""
+
+    def __init__(self):
+        self._states: Dict[str, IndicatorState] = {}
+        self._lock = threading.Lock()
+
+    def update(self, pair: str, candles: List) -> Dict[str, Optional[float]]:
+        """
+        Apply `candles` (oldest first, Candle objects) to the pair's state and
+        return the current values.
+
+        The newest candle may still be forming, so it is only previewed; older
+        candles are committed if they are newer than the last committed bar.
+        If the window no longer overlaps the state (first run, or a gap), the
+        state is rebuilt from the whole window in one vectorized pass.
+        """
+        if not candles:
+            return {}
+        closed, current = candles[:-1], candles[-1]
+        with self._lock:
+            state = self._states.get(pair)
+            if state is None:
+                state = self._states[pair] = IndicatorState()
+
+            if closed and (state.last_ts is None or closed[0].ts > state.last_ts):
+                state.initialize([c.high for c in closed], [c.low for c in closed], [c.close for c in closed],
+                                 last_ts=closed[-1].ts)
+            else:
+                # Candles are sorted: binary-search the first uncommitted bar instead of scanning the window
+                start = 0 if state.last_ts is None else bisect.bisect_right(closed, state.last_ts, key=_ts)
+                for c in closed[start:]:
+                    state.update(c.high, c.low, c.close, ts=c.ts)
+            if state.last_ts is not None and current.ts <= state.last_ts:
+                return state.values()
+            return state.peek(current.high, current.low, current.close)
+
+    def get(self, pair: str) -> Dict[str, Optional[float]]:
+        state = self._states.get(pair)
+        return state.values() if state else {}
+
+    def reset(self, pair: str = None):
+        with self._lock:
+            if pair is None:
+                self._states.clear()
+            else:
+                self._states.pop(pair, None)
+
+
+INDICATORS = IndicatorEngine()
@@ -0,0 +1,389 @@
+# src/jobs.py
+"""
+Asynchronous pipeline jobs for multi-pair runs.
+
+A full-board run takes minutes, which is too long for one HTTP request (and
+the dashboard's 60s timeout). POST /api/jobs returns a job id at once. The
+pairs then run on a small worker pool (JOB_WORKERS, default 2), and clients
+poll GET /api/jobs/{id} or follow GET /api/jobs/{id}/stream (server-sent
+events) as per-pair results arrive.
+
+Job state lives in a SQLite file (JOBS_DB_PATH, default data/state/jobs.sqlite):
+one row per job, one per (job, pair). A claimed pair carries a lease
+(`owner`, `lease_until`) that its manager renews every JOB_LEASE_SECONDS / 3
+while the pair runs. On startup, and from the heartbeat thread, pairs whose
+lease has expired are re-queued and scheduled again, so a job survives an API
+restart by supervisord or a worker that died mid-run. Liveness is never
+inferred from hostname:pid (PIDs repeat after `docker restart`). Pairs are
+claimed with an atomic UPDATE, so several uvicorn workers can resume the same
+file without running a pair twice, and a runner whose lease was taken over
+cannot overwrite the new owner's result.
+
+Successful results are also written to the recommendation cache, exactly
+like /api/run. Jobs run with dry-run email.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from src.schemas import Recommendation
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # project root
+DEFAULT_JOBS_DB_PATH = os.path.join(BASE_DIR, "data", "state", "jobs.sqlite")
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_STREAM_POLL = float(os.getenv("JOB_STREAM_POLL", 0.5))
+JOB_STREAM_TIMEOUT = float(os.getenv("JOB_STREAM_TIMEOUT", 3600))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 60))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY, status TEXT NOT NULL,
+    created_at REAL NOT NULL, started_at REAL, finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_pairs (
+    job_id TEXT NOT NULL, pair TEXT NOT NULL, position INTEGER NOT NULL,
+    status TEXT NOT NULL, owner TEXT, lease_until REAL, run_id TEXT, recommendation TEXT, error TEXT,
+    started_at REAL, finished_at REAL,
+    PRIMARY KEY (job_id, pair)
+);
+CREATE INDEX IF NOT EXISTS job_pairs_status ON job_pairs (status);
+"""
+
+PAIR_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+def _owner() -> str:
+    """Unique per manager instance, so a recycled PID never inherits another run's claims."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobStore:
+    """Job + per-pair state in one SQLite file (WAL), created on first use."""
+
+    def __init__(self, path: str = DEFAULT_JOBS_DB_PATH):
+        self.path = path
+        self._ready = False
+        self._init_lock = threading.Lock()
+
+    @contextmanager
+    def _txn(self, write: bool = True):
+        """Write transactions take the lock up front (BEGIN IMMEDIATE); reads use a plain WAL snapshot."""
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.executescript(_SCHEMA)
+                        columns = {row[1] for row in conn.execute("PRAGMA table_info(job_pairs)")}
+                        if "lease_until" not in columns:  # files created before leases
+                            conn.execute("ALTER TABLE job_pairs ADD COLUMN lease_until REAL")
+                    self._ready = True
+        with closing(sqlite3.connect(self.path, timeout=30, isolation_level=None)) as conn:
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def create(self, pairs: List[str]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._txn() as conn:
+            conn.execute("INSERT INTO jobs (id, status, created_at) VALUES (?, 'queued', ?)", (job_id, now))
+            conn.executemany(
+                "INSERT INTO job_pairs (job_id, pair, position, status) VALUES (?, ?, ?, 'queued')",
+                [(job_id, pair, i) for i, pair in enumerate(pairs)],
+            )
+        return job_id
+
+    def claim(self, job_id: str, pair: str, owner: str, lease: float = JOB_LEASE_SECONDS) -> bool:
+        """Atomically move a queued pair to running under a lease; False if someone else has it."""
+        now = time.time()
+        with self._txn() as conn:
+            claimed = conn.execute(
+                "UPDATE job_pairs SET status = 'running', owner = ?, lease_until = ?, started_at = ? "
+                "WHERE job_id = ? AND pair = ? AND status = 'queued'",
+                (owner, now + lease, now, job_id, pair),
+            ).rowcount
+            if claimed:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, ?) WHERE id = ?",
+                    (now, job_id),
+                )
+        return bool(claimed)
+
+    def renew(self, owner: str, claims: List[Tuple[str, str]], lease: float = JOB_LEASE_SECONDS) -> int:
+        """Extend the lease on pairs `owner` is still running; returns how many were renewed."""
+        with self._txn() as conn:
+            return sum(
+                conn.execute(
+                    "UPDATE job_pairs SET lease_until = ? "
+                    "WHERE job_id = ? AND pair = ? AND owner = ? AND status = 'running'",
+                    (time.time() + lease, job_id, pair, owner),
+                ).rowcount
+                for job_id, pair in claims
+            )
+
+    def finish(self, job_id: str, pair: str, status: str, recommendation: Optional[str] = None,
+               error: Optional[str] = None, run_id: Optional[str] = None, owner: Optional[str] = None) -> bool:
+        """Record a pair's result; with `owner`, only while that owner still holds the claim."""
+        now = time.time()
+        with self._txn() as conn:
+            query = ("UPDATE job_pairs SET status = ?, recommendation = ?, error = ?, run_id = ?, finished_at = ?, "
+                     "lease_until = NULL WHERE job_id = ? AND pair = ?")
+            params = [status, recommendation, error, run_id, now, job_id, pair]
+            if owner is not None:
+                query += " AND owner = ? AND status = 'running'"
+                params.append(owner)
+            if not conn.execute(query, params).rowcount:
+                return False  # lease expired and the pair was re-queued or taken over
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM job_pairs WHERE job_id = ? AND status IN ('queued', 'running')", (job_id,)
+            ).fetchone()[0]
+            if not pending:
+                conn.execute("UPDATE jobs SET status = 'completed', finished_at = ? WHERE id = ?", (now, job_id))
+        return True
+
+    def requeue_expired(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """Put running pairs whose lease ran out (their runner stopped renewing) back in the queue."""
+        now = time.time() if now is None else now
+        with self._txn() as conn:
+            expired = conn.execute(
+                "SELECT job_id, pair FROM job_pairs "
+                "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+                (now,),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE job_pairs SET status = 'queued', owner = NULL, lease_until = NULL, started_at = NULL "
+                "WHERE job_id = ? AND pair = ? AND status = 'running'",
+                expired,
+            )
+        return expired
+
+    def pending(self) -> List[tuple]:
+        """Queued (job_id, pair) in submission order."""
+        with self._txn(write=False) as conn:
+            return conn.execute(
+                "SELECT p.job_id, p.pair FROM job_pairs p JOIN jobs j ON j.id = p.job_id "
+                "WHERE p.status = 'queued' ORDER BY j.created_at, p.position"
+            ).fetchall()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._txn(write=False) as conn:
+            job = conn.execute(
+                "SELECT id, status, created_at, started_at, finished_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            rows = conn.execute(
+                "SELECT pair, status, run_id, recommendation, error, started_at, finished_at "
+                "FROM job_pairs WHERE job_id = ? ORDER BY position",
+                (job_id,),
+            ).fetchall()
+        results = [
+            {
+                "pair": pair,
+                "status": status,
+                "run_id": run_id,
+                "recommendation": json.loads(rec) if rec else None,
+                "error": error,
+                "started_at": _iso(started),
+                "finished_at": _iso(finished),
+            }
+            for pair, status, run_id, rec, error, started, finished in rows
+        ]
+        counts = {s: 0 for s in PAIR_STATUSES}
+        for r in results:
+            counts[r["status"]] += 1
+        return {
+            "job_id": job[0],
+            "status": job[1],
+            "created_at": _iso(job[2]),
+            "started_at": _iso(job[3]),
+            "finished_at": _iso(job[4]),
+            "counts": counts,
+            "results": results,
+        }
+
+    def list(self, limit: int = 20) -> List[Dict]:
+        with self._txn(write=False) as conn:
+            ids = [row[0] for row in conn.execute(
+                "SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()]
+        jobs = [self.get(job_id) for job_id in ids]
+        return [{k: v for k, v in job.items() if k != "results"} for job in jobs if job]
+
+
+def _run_pipeline(pair: str) -> dict:
+    from src.graph import run_pipeline_once
+    return run_pipeline_once(pair, dry_run_email=True)
+
+
+class JobManager:
+    """Submits job pairs to a worker pool and records their results."""
+
+    def __init__(self, store: JobStore, cache=None, workers: int = JOB_WORKERS,
+                 run_fn: Callable[[str], dict] = None, lease: float = JOB_LEASE_SECONDS):
+        self.store = store
+        self.cache = cache
+        self.workers = workers
+        self.run_fn = run_fn or _run_pipeline
+        self.lease = lease
+        self.owner = _owner()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._running: Set[Tuple[str, str]] = set()
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+                self._stop.clear()
+                self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+                self._heartbeat.start()
+            return self._executor
+
+    def _heartbeat_loop(self):
+        """Renew our leases and pick up pairs whose runner stopped renewing theirs."""
+        while not self._stop.wait(self.lease / 3):
+            try:
+                with self._lock:
+                    claims = list(self._running)
+                if claims:
+                    self.store.renew(self.owner, claims, self.lease)
+                expired = self.store.requeue_expired()
+                for job_id, pair in expired:
+                    self._pool().submit(self._run_pair, job_id, pair)
+                if expired:
+                    print(f"🧾 Re-queued {len(expired)} job pair(s) with an expired lease")
+            except Exception as e:
+                print(f"⚠️ Job heartbeat failed: {e}")
+
+    def submit(self, pairs: List[str]) -> str:
+        job_id = self.store.create(pairs)
+        for pair in pairs:
+            self._pool().submit(self._run_pair, job_id, pair)
+        print(f"🧾 Job {job_id} queued: {', '.join(pairs)}")
+        return job_id
+
+    def resume(self) -> int:
+        """Re-queue pairs with an expired lease and schedule everything still queued; returns the number scheduled."""
+        expired = self.store.requeue_expired()
+        pending = self.store.pending()
+        for job_id, pair in pending:
+            self._pool().submit(self._run_pair, job_id, pair)
+        if pending:
+            print(f"🧾 Resumed {len(pending)} queued job pair(s) ({len(expired)} from interrupted runs)")
+        return len(pending)
+
+    def _run_pair(self, job_id: str, pair: str):
+        if not self.store.claim(job_id, pair, self.owner, self.lease):
+            return  # another worker (or an earlier resume) already took it
+        with self._lock:
+            self._running.add((job_id, pair))
+        try:
+            self._execute(job_id, pair)
+        finally:
+            with self._lock:
+                self._running.discard((job_id, pair))
+
+    def _execute(self, job_id: str, pair: str):
+        finish = lambda status, **fields: self.store.finish(job_id, pair, status, owner=self.owner, **fields)
+        try:
+            trace = self.run_fn(pair)
+            rec = trace.get("recommendation")
+            if trace.get("status") != "success" or rec is None:
+                finish("failed", error=trace.get("error") or "No recommendation", run_id=trace.get("run_id"))
+                return
+            if not isinstance(rec, Recommendation):
+                rec = Recommendation.model_validate(rec)
+            if self.cache is not None:
+                self.cache.set(pair, rec)
+            if not finish("succeeded", recommendation=rec.model_dump_json(), run_id=trace.get("run_id")):
+                print(f"⚠️ Job {job_id}: lease on {pair} expired before it finished; result not recorded")
+        except Exception as e:
+            print(f"❌ Job {job_id} failed for {pair}: {e}")
+            finish("failed", error=str(e))
+
+    @staticmethod
+    def _new_events(job: Dict, seen: Set[str], timed_out: bool) -> Tuple[List[Dict], bool]:
+        events = []
+        for result in job["results"]:
+            if result["status"] in ("succeeded", "failed") and result["pair"] not in seen:
+                seen.add(result["pair"])
+                events.append({"event": "pair", "data": result})
+        done = job["status"] == "completed" or timed_out
+        if done:
+            events.append({"event": "done", "data": {k: v for k, v in job.items() if k != "results"}})
+        return events, done
+
+    def events(self, job_id: str, poll: float = JOB_STREAM_POLL,
+               timeout: float = JOB_STREAM_TIMEOUT) -> Iterator[Dict]:
+        """
+        Yield {"event": "pair", "data": result} for each pair as it finishes,
+        then {"event": "done", "data": job}. Polls the store, so it works from
+        any worker process.
+        """
+        seen: Set[str] = set()
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None:
+                return
+            events, done = self._new_events(job, seen, time.monotonic() >= deadline)
+            yield from events
+            if done:
+                return
+            time.sleep(poll)
+
+    async def aevents(self, job_id: str, poll: float = JOB_STREAM_POLL,
+                      timeout: float = JOB_STREAM_TIMEOUT) -> AsyncIterator[Dict]:
+        """
+        Async events() for the SSE endpoint: waits with asyncio.sleep, so a
+        long-lived stream holds no threadpool worker between polls.
+        """
+        seen: Set[str] = set()
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await asyncio.to_thread(self.store.get, job_id)
+            if job is None:
+                return
+            events, done = self._new_events(job, seen, time.monotonic() >= deadline)
+            for event in events:
+                yield event
+            if done:
+                return
+            await asyncio.sleep(poll)
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work; queued pairs stay in the store and are resumed on next start."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        self._stop.set()
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def build_job_manager(cache=None) -> JobManager:
+    """Manager configured by JOBS_DB_PATH / JOB_WORKERS."""
+    return JobManager(JobStore(os.getenv("JOBS_DB_PATH", DEFAULT_JOBS_DB_PATH)), cache=cache)
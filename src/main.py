@@ -1,12 +1,20 @@
 # src/main.py
+import argparse
 import os
 from datetime import datetime, timezone
 from dotenv import load_dotenv
+
+# Apply .env before importing src.*: module-level settings are read at import
+load_dotenv()
+
 from src.graph import run_pipeline_for_pairs
 
 
-def main():
-    load_dotenv()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the forex strategy pipeline for PAIRS.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay running and execute pairs on their cron schedules (src/scheduler.py)")
+    args = parser.parse_args(argv)
 
     pairs = os.getenv("PAIRS", "EURUSD,GBPUSD,USDJPY,AUDUSD,AUDCAD,GBPCAD").split(",")
     pairs = [p.strip().upper() for p in pairs]
@@ -14,6 +22,13 @@ def main():
     # 👇 Control dry-run via .env
     dry_run_flag = os.getenv("EMAIL_DRYRUN", "True").lower() == "true"
 
+    if args.daemon:
+        from src.scheduler import run_daemon
+        print(f"\n🗓 Starting scheduler daemon ({datetime.now(timezone.utc).isoformat()})")
+        print(f"📧 Email mode: {'DRY-RUN (no email sent)' if dry_run_flag else 'LIVE (emails will be sent)'}\n")
+        run_daemon(pairs, dry_run_email=dry_run_flag)
+        return
+
     print(f"\n🚀 Starting daily forex strategy run ({datetime.now(timezone.utc).isoformat()})")
     print(f"📊 Pairs: {', '.join(pairs)}")
     print(f"📧 Email mode: {'DRY-RUN (no email sent)' if dry_run_flag else 'LIVE (emails will be sent)'}\n")
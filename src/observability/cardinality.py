@@ -0,0 +1,88 @@
+"""
+cardinality.py
+--------------
+Label guards that keep the number of Prometheus time series bounded.
+
+Every distinct label combination is a new series that lives for the life of
+the process. If labels come from request input (a raw URL path, an
+unvalidated ?pair=), a scanner can create unlimited series. That grows API
+memory and makes each /api/metrics scrape slower. Two layers prevent this:
+
+- normalizers map input onto a known set before it becomes a label:
+  route_label() → the matched route template ("/api/jobs/{job_id}"),
+  pair_label() → an allowed pair, method_label() → a standard HTTP method.
+  Anything else becomes OTHER.
+- GuardedMetric wraps a labelled metric and caps its series at
+  METRIC_MAX_SERIES (default 1000). Once the cap is reached, new label
+  combinations are folded into an all-"other" series.
+
+Active series per guarded metric are exported as metric_label_series{metric}.
+Folded observations are counted in metric_label_overflow_total{metric}.
+"""
+
+import os
+import threading
+from typing import Optional, Set, Tuple
+
+from prometheus_client import Counter, Gauge
+
+from src.guardrails.input_validation import ALLOWED_PAIRS
+
+METRIC_MAX_SERIES = int(os.getenv("METRIC_MAX_SERIES", 1000))
+OTHER = "other"
+
+_PAIRS = frozenset(ALLOWED_PAIRS)
+_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+ACTIVE_SERIES = Gauge("metric_label_series", "Label combinations in use per guarded metric", ["metric"])
+OVERFLOW = Counter(
+    "metric_label_overflow", "Observations folded into the 'other' series after the cap was reached", ["metric"]
+)
+
+
+def pair_label(pair: Optional[str]) -> str:
+    """Allowed pair (upper-cased) or OTHER."""
+    pair = (pair or "").strip().upper() if isinstance(pair, str) else ""
+    return pair if pair in _PAIRS else OTHER
+
+
+def route_label(scope: dict) -> str:
+    """Route template of the matched endpoint (from the ASGI scope), or OTHER for unmatched paths."""
+    return getattr(scope.get("route"), "path", None) or OTHER
+
+
+def method_label(method: str) -> str:
+    method = (method or "").upper()
+    return method if method in _METHODS else OTHER
+
+
+class GuardedMetric:
+    """Drop-in wrapper for a labelled metric: .labels() caps distinct series at max_series."""
+
+    def __init__(self, metric, max_series: int = METRIC_MAX_SERIES):
+        self._metric = metric
+        self.name = metric._name
+        self.max_series = max_series
+        self._labelnames: Tuple[str, ...] = tuple(metric._labelnames)
+        self._seen: Set[Tuple[str, ...]] = set()
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **labelkwargs):
+        if labelkwargs:
+            values = tuple(labelkwargs[name] for name in self._labelnames)
+        values = tuple(str(v) for v in values)
+        with self._lock:
+            if values not in self._seen:
+                if len(self._seen) >= self.max_series:
+                    OVERFLOW.labels(self.name).inc()
+                    values = (OTHER,) * len(self._labelnames)
+                self._seen.add(values)  # the overflow series itself may exceed the cap by one
+                ACTIVE_SERIES.labels(self.name).set(len(self._seen))
+        return self._metric.labels(*values)
+
+    def series(self) -> int:
+        with self._lock:
+            return len(self._seen)
+
+    def __getattr__(self, attr):
+        return getattr(self._metric, attr)
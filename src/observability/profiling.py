@@ -0,0 +1,169 @@
+"""
+profiling.py
+------------
+Opt-in CPU profiling for pipeline runs.
+
+Profiles are captured with cProfile and written as standard `.prof` (pstats)
+files, so they can be opened with `python -m pstats` or snakeviz.
+
+Profiling is enabled by one of:
+- PROFILE_PIPELINE=true        → every pipeline run is profiled
+- start_profile_window(seconds) → every run inside the window is profiled
+- profile_run(..., force=True)  → a single run (e.g. /api/run?profile=1)
+
+Only one capture runs at a time. Unforced runs are left unprofiled while
+another capture is in progress; a forced run raises ProfilerBusy instead
+(409 in the API), so an explicit request never silently loses its profile.
+A profile_run nested inside an active capture (the API's forced profile
+around graph.run_pipeline_once) reuses it, so the trace records that
+profile_id.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Profile storage (env override with sensible default)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # project root
+DEFAULT_PROFILE_DIR = os.path.join(BASE_DIR, "data", "profiles")
+PROFILE_DIR = os.getenv("PROFILE_DIR", DEFAULT_PROFILE_DIR)
+MAX_PROFILES = int(os.getenv("PROFILE_KEEP", 20))
+
+# Only one cProfile profiler may be active at a time (Python 3.12+ enforces it),
+# so concurrent runs are simply left unprofiled while one capture is in progress.
+_capture_lock = threading.Lock()
+_window_until = 0.0
+_ACTIVE: ContextVar[Optional[Dict]] = ContextVar("active_profile", default=None)
+
+
+class ProfilerBusy(Exception):
+    """A forced profile was requested while another capture is in progress."""
+
+
+def profiling_enabled() -> bool:
+    """True if runs should currently be profiled (env flag or active window)."""
+    if os.getenv("PROFILE_PIPELINE", "False").lower() == "true":
+        return True
+    return time.time() < _window_until
+
+
+def start_profile_window(seconds: float) -> float:
+    """Profile every pipeline run for the next `seconds`. Returns the window end (epoch)."""
+    global _window_until
+    _window_until = time.time() + max(float(seconds), 0.0)
+    return _window_until
+
+
+@contextmanager
+def profile_run(label: str, force: bool = False):
+    """
+    Profile the enclosed block if profiling is enabled (or `force` is set).
+
+    Yields a dict with the `profile_id` that will be written on exit,
+    or None when the block is not being profiled. Raises ProfilerBusy if
+    `force` is set and another capture holds the profiler.
+    """
+    active = _ACTIVE.get()
+    if active is not None:
+        yield active  # already inside a capture: part of the same profile
+        return
+    if not (force or profiling_enabled()):
+        yield None
+        return
+    if not _capture_lock.acquire(blocking=False):
+        if force:
+            raise ProfilerBusy(f"Another CPU profile is being captured; retry {label} later")
+        yield None
+        return
+
+    info = {
+        "profile_id": f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}_{_safe_label(label)}_{uuid.uuid4().hex[:6]}",
+        "label": label,
+    }
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    token = _ACTIVE.set(info)
+    try:
+        profiler.enable()
+        try:
+            yield info
+        finally:
+            profiler.disable()
+            info["duration_s"] = round(time.perf_counter() - start, 4)
+            _save_profile(profiler, info)
+    finally:
+        _ACTIVE.reset(token)
+        _capture_lock.release()
+
+
+def _safe_label(label: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in label)[:40]
+
+
+def _save_profile(profiler: cProfile.Profile, info: Dict):
+    """Write profile to PROFILE_DIR and prune old captures."""
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{info['profile_id']}.prof"))
+        print(f"🧪 Saved CPU profile {info['profile_id']} ({info['duration_s']}s)")
+        _prune_profiles()
+    except Exception as e:
+        print(f"⚠️ Failed to save profile {info['profile_id']}: {e}")
+
+
+def _prune_profiles():
+    for old in list_profiles()[MAX_PROFILES:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, f"{old['profile_id']}.prof"))
+        except OSError:
+            continue
+
+
+def list_profiles() -> List[Dict]:
+    """Return metadata for stored profiles, most recent first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for file in os.listdir(PROFILE_DIR):
+        if not file.endswith(".prof"):
+            continue
+        path = os.path.join(PROFILE_DIR, file)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        profiles.append({
+            "profile_id": file[:-len(".prof")],
+            "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+            "size_bytes": stat.st_size,
+        })
+    profiles.sort(key=lambda p: p["created_at"], reverse=True)
+    return profiles
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Resolve a stored profile id to its `.prof` path (None if unknown)."""
+    # Ids are generated from [A-Za-z0-9_-] only; reject anything else (path traversal)
+    if not profile_id or not all(ch.isalnum() or ch in "-_" for ch in profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.prof")
+    return path if os.path.isfile(path) else None
+
+
+def profile_text(profile_id: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+    """Render a stored profile as a pstats text report."""
+    path = profile_path(profile_id)
+    if path is None:
+        return None
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
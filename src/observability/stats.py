@@ -0,0 +1,146 @@
+"""
+stats.py
+--------
+Incrementally maintained request / run aggregates served as small JSON by
+/api/stats, so dashboards don't have to scrape and regex the Prometheus
+exposition.
+
+Counters are updated on every request; latency percentiles come from a
+fixed-size rolling window per endpoint / pair and are only re-sorted when
+the window changed since the last read. Aggregates are per API process.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+STATS_WINDOW = int(os.getenv("STATS_WINDOW", 512))
+
+
+class RollingLatency:
+    """Last N latency samples with cached p50/p95."""
+
+    def __init__(self, size: int = STATS_WINDOW):
+        self._samples = deque(maxlen=size)
+        self._cached: Optional[Dict[str, float]] = None
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+        self._cached = None
+
+    def percentiles(self) -> Dict[str, float]:
+        if self._cached is None:
+            ordered = sorted(self._samples)
+            self._cached = {
+                "p50_ms": _percentile_ms(ordered, 0.50),
+                "p95_ms": _percentile_ms(ordered, 0.95),
+                "window": len(ordered),
+            }
+        return self._cached
+
+
+def _percentile_ms(ordered, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 2)
+
+
+class _EndpointStats:
+    __slots__ = ("requests", "errors", "client_errors", "latency")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.client_errors = 0
+        self.latency = RollingLatency()
+
+
+class _PairStats:
+    __slots__ = ("runs", "failures", "shed", "latency", "last_run_at")
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.shed = 0
+        self.latency = RollingLatency()
+        self.last_run_at: Optional[float] = None
+
+
+class ApiStats:
+    """Thread-safe request and pipeline-run aggregates."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self._pairs: Dict[str, _PairStats] = {}
+
+    def record_request(self, endpoint: str, status: int, seconds: float):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _EndpointStats()
+            stats.requests += 1
+            if status >= 500:
+                stats.errors += 1
+            elif status >= 400:
+                stats.client_errors += 1
+            stats.latency.add(seconds)
+
+    def _pair(self, pair: str) -> _PairStats:
+        # caller holds self._lock
+        stats = self._pairs.get(pair)
+        if stats is None:
+            stats = self._pairs[pair] = _PairStats()
+        return stats
+
+    def record_run(self, pair: str, seconds: float, success: bool = True):
+        with self._lock:
+            stats = self._pair(pair)
+            stats.runs += 1
+            stats.latency.add(seconds)
+            if success:
+                stats.last_run_at = time.time()
+            else:
+                stats.failures += 1
+
+    def record_shed(self, pair: str):
+        """A run rejected by admission control (429) before it started."""
+        with self._lock:
+            self._pair(pair).shed += 1
+
+    def snapshot(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            endpoints = {
+                name: {
+                    "requests": s.requests,
+                    "errors": s.errors,
+                    "client_errors": s.client_errors,
+                    "error_rate": round(s.errors / s.requests, 4) if s.requests else 0.0,
+                    **s.latency.percentiles(),
+                }
+                for name, s in self._endpoints.items()
+            }
+            pairs = {
+                pair: {
+                    "runs": s.runs,
+                    "failures": s.failures,
+                    "shed": s.shed,
+                    "last_run_age_s": round(now - s.last_run_at, 1) if s.last_run_at else None,
+                    **s.latency.percentiles(),
+                }
+                for pair, s in self._pairs.items()
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        errors = sum(e["errors"] for e in endpoints.values())
+        return {
+            "uptime_s": round(now - self._started_at, 1),
+            "requests": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "endpoints": endpoints,
+            "pairs": pairs,
+        }
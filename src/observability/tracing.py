@@ -0,0 +1,146 @@
+"""
+tracing.py
+----------
+Lightweight spans for pipeline runs.
+
+Stage timings used to be derived by subtracting the ISO timestamps of
+consecutive trace steps. That was coarse, it counted the gaps between
+stages, and it could not see inside run_strategy_for_pair. Spans measure
+each stage directly:
+
+    with start_trace() as recorder:
+        with span("strategy", pair="EURUSD"):
+            with span("indicators"):
+                ...
+    trace["spans"] = recorder.export()
+
+- durations come from time.perf_counter_ns() (monotonic, ns resolution);
+- the current span lives in a contextvar, so nested span() / @traced calls
+  become children without passing anything around. Work handed to another
+  thread must run in contextvars.copy_context() to keep its parent;
+- outside start_trace() a span still times its block but is not recorded,
+  so instrumented code behaves the same in tests and one-off calls.
+
+Exported spans are plain dicts (name, path, parent, start/duration in ms
+relative to the trace start, attributes, status) stored in the trace JSON.
+Stages are top-level spans (there is no root span), so eval_pipeline reports
+them per nested path, e.g. "strategy/indicators" or "gather_inputs/news".
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+_ids = itertools.count(1)
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent", "path", "start_ns", "end_ns", "attrs", "status", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.name = name
+        self.span_id = next(_ids)
+        self.parent = parent
+        self.path = f"{parent.path}/{name}" if parent else name
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.attrs = attrs
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attrs[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+
+class SpanRecorder:
+    """Finished spans of one trace (one pipeline run)."""
+
+    def __init__(self):
+        self.start_ns = time.perf_counter_ns()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def record(self, s: Span):
+        with self._lock:
+            self.spans.append(s)
+
+    def export(self) -> List[Dict[str, Any]]:
+        """JSON-ready spans in start order; times in ms relative to the trace start."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        return [
+            {
+                "name": s.name,
+                "path": s.path,
+                "span_id": s.span_id,
+                "parent_id": s.parent.span_id if s.parent else None,
+                "start_ms": round((s.start_ns - self.start_ns) / 1e6, 3),
+                "duration_ms": round(s.duration_ms, 3),
+                "status": s.status,
+                **({"error": s.error} if s.error else {}),
+                **({"attrs": s.attrs} if s.attrs else {}),
+            }
+            for s in spans
+        ]
+
+
+_CURRENT: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_RECORDER: ContextVar[Optional[SpanRecorder]] = ContextVar("span_recorder", default=None)
+
+
+@contextmanager
+def start_trace():
+    """Collect every span finished inside the block (nested traces get their own recorder)."""
+    recorder = SpanRecorder()
+    recorder_token = _RECORDER.set(recorder)
+    parent_token = _CURRENT.set(None)
+    try:
+        yield recorder
+    finally:
+        _CURRENT.reset(parent_token)
+        _RECORDER.reset(recorder_token)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the block as a child of the current span; exceptions mark it as an error and propagate."""
+    s = Span(name, _CURRENT.get(), attrs)
+    token = _CURRENT.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.error = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        s.end_ns = time.perf_counter_ns()
+        _CURRENT.reset(token)
+        recorder = _RECORDER.get()
+        if recorder is not None:
+            recorder.record(s)
+
+
+def traced(name: str = None):
+    """Decorator form of span() (defaults to the function name)."""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT.get()
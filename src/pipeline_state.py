@@ -0,0 +1,141 @@
+# src/pipeline_state.py
+"""
+Last-run state per pair, used by graph.run_pipeline_once to skip work:
+
+- fingerprint of the last run's inputs + the Recommendation it produced,
+  so an unchanged refresh returns the previous result without re-running
+  sentiment/strategy, writing a trace or emailing;
+- the stance last emailed, for EMAIL_ON_STANCE_CHANGE_ONLY.
+
+State is kept in memory and mirrored to a small JSON file
+(PIPELINE_STATE_PATH, default data/state/pipeline_state.json) so separate
+`python -m src.main` runs share it. Set PIPELINE_STATE_PATH="" to keep it
+in memory only.
+
+Several processes write the file (uvicorn workers, the scheduler daemon,
+job workers, cron runs). Reads reload it when it changed on disk. Each
+update re-reads it under an exclusive flock on `<path>.lock` and changes
+only its own pair's fields, so other writers' entries are never
+overwritten with stale copies.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from src.schemas import Recommendation
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # project root
+DEFAULT_STATE_PATH = os.path.join(BASE_DIR, "data", "state", "pipeline_state.json")
+
+
+class PipelineState:
+    """Per-pair {fingerprint, recommendation, emailed_stance}, optionally persisted to JSON."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pairs: Optional[Dict[str, Dict]] = None
+        self._file_stat = None
+        self._models: Dict[str, Tuple[str, Recommendation]] = {}  # decoded recommendations
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size, st.st_ino
+        except OSError:
+            return None
+
+    def _read_file(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable pipeline state {self.path}: {e}")
+            return {}
+
+    def _load(self) -> Dict[str, Dict]:
+        """Current state; re-read when another process changed the file."""
+        if not self.path:
+            if self._pairs is None:
+                self._pairs = {}
+            return self._pairs
+        stat = self._stat()
+        if self._pairs is None or stat != self._file_stat:
+            self._pairs = self._read_file()
+            self._file_stat = stat
+        return self._pairs
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive inter-process lock for read-modify-write (no-op where fcntl is unavailable)."""
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _update(self, pair: Optional[str], fields: Dict):
+        """Merge `fields` into `pair`'s entry (pair=None: reset everything) and persist. Caller holds self._lock."""
+        if not self.path:
+            pairs = self._load()
+            if pair is None:
+                pairs.clear()
+            else:
+                pairs.setdefault(pair, {}).update(fields)
+            return
+        with self._file_lock():
+            pairs = {} if pair is None else self._read_file()  # latest on-disk state, not our cached copy
+            if pair is not None:
+                pairs.setdefault(pair, {}).update(fields)
+            tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(pairs, f)
+            os.replace(tmp, self.path)
+            self._pairs, self._file_stat = pairs, self._stat()
+
+    def previous(self, pair: str, fingerprint: str) -> Optional[Recommendation]:
+        """The Recommendation from the last run if it had the same input fingerprint."""
+        with self._lock:
+            entry = self._load().get(pair)
+            if not entry or entry.get("fingerprint") != fingerprint or not entry.get("recommendation"):
+                return None
+            cached = self._models.get(pair)
+            if cached is None or cached[0] != fingerprint:
+                cached = self._models[pair] = (fingerprint, Recommendation.model_validate(entry["recommendation"]))
+            return cached[1]
+
+    def remember(self, pair: str, fingerprint: str, rec: Recommendation):
+        with self._lock:
+            self._update(pair, {"fingerprint": fingerprint, "recommendation": rec.model_dump(mode="json")})
+            self._models[pair] = (fingerprint, rec)
+
+    def emailed_stance(self, pair: str) -> Optional[str]:
+        with self._lock:
+            return self._load().get(pair, {}).get("emailed_stance")
+
+    def mark_emailed(self, pair: str, stance: str):
+        with self._lock:
+            self._update(pair, {"emailed_stance": stance})
+
+    def clear(self):
+        with self._lock:
+            self._update(None, {})
+            self._models = {}
+
+
+def build_pipeline_state() -> PipelineState:
+    """State configured by PIPELINE_STATE_PATH ("" = memory only)."""
+    path = os.getenv("PIPELINE_STATE_PATH", DEFAULT_STATE_PATH)
+    return PipelineState(path or None)
@@ -0,0 +1,384 @@
+# src/scheduler.py
+"""
+Long-running scheduler daemon for the pipeline (`python -m src.main --daemon`).
+
+A one-shot `python -m src.main` pays interpreter start, heavy imports and the
+TextBlob lexicon load on every run, and always starts with cold caches. The
+daemon keeps one process alive and runs each pair on its own cron schedule:
+
+    SCHEDULES="EURUSD,GBPUSD=0 * * * *;USDJPY=*/15 * * * *"
+    # pairs without an entry use SCHEDULE_CRON (default hourly) for PAIRS
+
+Between runs it keeps warm:
+- imports and the TextBlob lexicon (warm_up() at start),
+- parsed RSS feeds (FEED_CACHE_TTL, default 300s in daemon mode),
+- converted candles and cross-rate USD legs (CANDLE_CACHE_TTL, default 60s),
+- per-headline sentiment (lru_cache) and per-pair indicator state.
+
+Runs never overlap: a pair that is still running when it is due again is
+skipped (counted as an overlap), and a lock file stops a second daemon from
+starting. SIGTERM / SIGINT stop scheduling new runs. In-flight runs are then
+allowed to finish (SCHEDULER_SHUTDOWN_TIMEOUT), so their traces and emails
+complete before the process exits.
+
+Per-pair run duration and drift (actual start − scheduled time) are exported
+as Prometheus metrics (SCHEDULER_METRICS_PORT) and in a JSON status file
+(SCHEDULER_STATUS_PATH). Cron times are UTC.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from src.observability.stats import RollingLatency
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # project root
+DEFAULT_STATUS_PATH = os.path.join(BASE_DIR, "data", "scheduler_status.json")
+DEFAULT_LOCK_PATH = os.path.join(BASE_DIR, "data", "state", "scheduler.lock")
+
+SCHEDULE_CRON = os.getenv("SCHEDULE_CRON", "0 * * * *")
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", 4))
+SCHEDULER_SHUTDOWN_TIMEOUT = float(os.getenv("SCHEDULER_SHUTDOWN_TIMEOUT", 120))
+
+SCHEDULER_RUN_DURATION = Histogram(
+    "scheduler_run_duration_seconds", "Duration of scheduled pipeline runs", ["pair"],
+)
+SCHEDULER_DRIFT = Histogram(
+    "scheduler_drift_seconds", "Delay between a run's scheduled time and its actual start", ["pair"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 300),
+)
+SCHEDULER_RUNS = Counter(
+    "scheduler_runs_total", "Scheduled pipeline runs by outcome", ["pair", "status"],
+)
+
+
+# ----------------------------
+# Cron expressions
+# ----------------------------
+_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))  # day of week: 0 and 7 are Sunday
+
+
+def _parse_field(field: str, low: int, high: int) -> frozenset:
+    values = set()
+    for part in field.split(","):
+        body, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if body == "*":
+            start, end = low, high
+        elif "-" in body:
+            start, end = (int(x) for x in body.split("-", 1))
+        else:
+            start = int(body)
+            end = high if step > 1 else start
+        if step < 1 or not (low <= start <= high and low <= end <= high) or start > end:
+            raise ValueError(f"Invalid cron field '{field}'")
+        values.update(range(start, end + 1, step))
+    if high == 7:
+        values = {v % 7 for v in values}
+    return frozenset(values)
+
+
+class CronSchedule:
+    """Standard 5-field cron expression (minute hour day-of-month month day-of-week), UTC."""
+
+    def __init__(self, expr: str):
+        self.expr = expr.strip()
+        fields = _ALIASES.get(self.expr, self.expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expr}'")
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(f, lo, hi) for f, (lo, hi) in zip(fields, _FIELD_RANGES)
+        )
+        # Like cron: if both day fields are restricted, either may match
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, t: datetime) -> bool:
+        dom = t.day in self.days
+        dow = (t.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, dt: datetime) -> datetime:
+        """First matching minute strictly after `dt`."""
+        t = dt.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression never matches: '{self.expr}'")
+
+    def __repr__(self):
+        return f"CronSchedule({self.expr!r})"
+
+
+def parse_schedules(spec: str, pairs: List[str], default_cron: str = SCHEDULE_CRON) -> List[Tuple[str, CronSchedule]]:
+    """
+    'EURUSD,GBPUSD=0 * * * *;USDJPY=*/15 * * * *' → [(pair, CronSchedule)].
+    Pairs listed in `pairs` without an entry get `default_cron`.
+    """
+    from src.guardrails.input_validation import validate_pair
+
+    schedules: Dict[str, CronSchedule] = {}
+    for entry in (spec or "").split(";"):
+        if not entry.strip():
+            continue
+        names, _, expr = entry.partition("=")
+        cron = CronSchedule(expr)
+        for name in names.split(","):
+            schedules[validate_pair(name)] = cron
+    default = CronSchedule(default_cron)
+    for pair in pairs:
+        schedules.setdefault(validate_pair(pair), default)
+    return list(schedules.items())
+
+
+# ----------------------------
+# Scheduler
+# ----------------------------
+class _PairSchedule:
+    __slots__ = ("pair", "cron", "next_run", "running", "runs", "failures", "overlaps",
+                 "duration", "drift", "last_duration_s", "last_drift_s", "last_status")
+
+    def __init__(self, pair: str, cron: CronSchedule):
+        self.pair, self.cron = pair, cron
+        self.next_run: Optional[datetime] = None
+        self.running = False
+        self.runs = self.failures = self.overlaps = 0
+        self.duration = RollingLatency()
+        self.drift = RollingLatency()
+        self.last_duration_s: Optional[float] = None
+        self.last_drift_s: Optional[float] = None
+        self.last_status: Optional[str] = None
+
+
+class Scheduler:
+    """Cron-driven pipeline runner: one in-flight run per pair, bounded worker pool."""
+
+    def __init__(self, schedules: List[Tuple[str, CronSchedule]], run_fn: Callable = None,
+                 dry_run_email: bool = True, workers: int = SCHEDULER_WORKERS,
+                 status_path: Optional[str] = DEFAULT_STATUS_PATH):
+        if run_fn is None:
+            from src.graph import run_pipeline_once as run_fn
+        self.run_fn = run_fn
+        self.dry_run_email = dry_run_email
+        self.status_path = status_path
+        self._pairs = {pair: _PairSchedule(pair, cron) for pair, cron in schedules}
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scheduled-run")
+        self._started_at = time.time()
+
+    # --- scheduling ---
+    def _push(self, state: _PairSchedule, after: datetime):
+        state.next_run = state.cron.next_after(after)
+        heapq.heappush(self._heap, (state.next_run, next(self._seq), state.pair))
+
+    def start(self, now: datetime = None):
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            for state in self._pairs.values():
+                self._push(state, now)
+
+    def tick(self, now: datetime = None) -> List[str]:
+        """Dispatch every run due at `now`; returns the pairs started."""
+        now = now or datetime.now(timezone.utc)
+        started = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and not self._stop.is_set():
+                scheduled, _, pair = heapq.heappop(self._heap)
+                state = self._pairs[pair]
+                # Missed slots (e.g. after a long run or a suspended host) are coalesced into one run
+                self._push(state, now)
+                if state.running:
+                    state.overlaps += 1
+                    SCHEDULER_RUNS.labels(pair=pair, status="overlap_skipped").inc()
+                    print(f"⏭️ {pair} still running; skipped the {scheduled.isoformat()} slot")
+                    continue
+                state.running = True
+                self._executor.submit(self._run, state, scheduled)
+                started.append(pair)
+        return started
+
+    def seconds_until_next(self, now: datetime = None) -> Optional[float]:
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            if not self._heap:
+                return None
+            return max((self._heap[0][0] - now).total_seconds(), 0.0)
+
+    def _run(self, state: _PairSchedule, scheduled: datetime):
+        start = time.perf_counter()
+        drift = (datetime.now(timezone.utc) - scheduled).total_seconds()
+        status = "error"
+        try:
+            trace = self.run_fn(state.pair, dry_run_email=self.dry_run_email)
+            status = (trace or {}).get("status", "error")
+        except Exception as e:
+            print(f"❌ Scheduled run for {state.pair} failed: {e}")
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                state.running = False
+                state.runs += 1
+                state.failures += status != "success"
+                state.duration.add(duration)
+                state.drift.add(max(drift, 0.0))
+                state.last_duration_s, state.last_drift_s, state.last_status = duration, drift, status
+            SCHEDULER_RUN_DURATION.labels(pair=state.pair).observe(duration)
+            SCHEDULER_DRIFT.labels(pair=state.pair).observe(max(drift, 0.0))
+            SCHEDULER_RUNS.labels(pair=state.pair, status=status).inc()
+            print(f"⏱ {state.pair}: {status} in {duration:.2f}s (drift {drift:+.2f}s)")
+            self.write_status()
+
+    # --- status ---
+    def snapshot(self) -> Dict:
+        with self._lock:
+            pairs = {
+                s.pair: {
+                    "cron": s.cron.expr,
+                    "next_run": s.next_run.isoformat() if s.next_run else None,
+                    "running": s.running,
+                    "runs": s.runs,
+                    "failures": s.failures,
+                    "overlaps_skipped": s.overlaps,
+                    "last_status": s.last_status,
+                    "last_duration_s": round(s.last_duration_s, 3) if s.last_duration_s is not None else None,
+                    "last_drift_s": round(s.last_drift_s, 3) if s.last_drift_s is not None else None,
+                    "duration": s.duration.percentiles(),
+                    "drift": s.drift.percentiles(),
+                }
+                for s in self._pairs.values()
+            }
+        return {"uptime_s": round(time.time() - self._started_at, 1), "pairs": pairs}
+
+    def write_status(self):
+        if not self.status_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.status_path)), exist_ok=True)
+            tmp = f"{self.status_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(tmp, self.status_path)
+        except OSError as e:
+            print(f"⚠️ Could not write scheduler status: {e}")
+
+    # --- lifecycle ---
+    def run_forever(self):
+        self.start()
+        self.write_status()
+        while not self._stop.is_set():
+            self.tick()
+            wait = self.seconds_until_next()
+            self._stop.wait(timeout=min(wait if wait is not None else 60.0, 60.0))
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self, timeout: float = SCHEDULER_SHUTDOWN_TIMEOUT):
+        """Stop dispatching and wait for in-flight runs (their traces/emails complete)."""
+        self._stop.set()
+        done = threading.Event()
+
+        def _drain():
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            done.set()
+
+        threading.Thread(target=_drain, daemon=True).start()
+        if not done.wait(timeout):
+            running = [s.pair for s in self._pairs.values() if s.running]
+            print(f"⚠️ Shutdown timeout: runs still in flight for {running}")
+        self.write_status()
+
+
+def _acquire_instance_lock(path: str):
+    """Exclusive lock file so only one daemon runs per host; returns the open handle."""
+    try:
+        import fcntl
+    except ImportError:  # non-POSIX: no single-instance guard
+        return None
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    handle = open(path, "a+")
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        raise RuntimeError(f"Another scheduler daemon holds {path}")
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    return handle
+
+
+def _configure_warm_caches():
+    """Daemon defaults for the cross-run caches unless set explicitly in the environment."""
+    from src.tools import news_tool, yfinance_tool
+
+    if "FEED_CACHE_TTL" not in os.environ:
+        news_tool.FEED_CACHE_TTL = 300.0
+    if "CANDLE_CACHE_TTL" not in os.environ:
+        yfinance_tool.CANDLE_CACHE_TTL = 60.0
+
+
+def run_daemon(pairs: List[str], dry_run_email: bool = True):
+    """Entry point for `python -m src.main --daemon`."""
+    lock = _acquire_instance_lock(os.getenv("SCHEDULER_LOCK_PATH", DEFAULT_LOCK_PATH))
+    schedules = parse_schedules(os.getenv("SCHEDULES", ""), pairs)
+
+    _configure_warm_caches()
+    from src.warmup import warm_up
+    warm_up()
+
+    metrics_port = int(os.getenv("SCHEDULER_METRICS_PORT", 0) or 0)
+    if metrics_port:
+        from prometheus_client import start_http_server
+        start_http_server(metrics_port)
+        print(f"📈 Scheduler metrics on :{metrics_port}/metrics")
+
+    scheduler = Scheduler(schedules, dry_run_email=dry_run_email,
+                          status_path=os.getenv("SCHEDULER_STATUS_PATH", DEFAULT_STATUS_PATH))
+
+    def _handle_signal(signum, frame):
+        print(f"\n🛑 Received {signal.Signals(signum).name}; finishing in-flight runs…")
+        scheduler.stop()
+
+    signal.signal(signal.SIGTERM, _handle_signal)
+    signal.signal(signal.SIGINT, _handle_signal)
+
+    for pair, cron in schedules:
+        print(f"🗓 {pair}: {cron.expr}")
+    try:
+        scheduler.run_forever()
+    finally:
+        scheduler.shutdown()
+        if lock is not None:
+            lock.close()
+        print("🏁 Scheduler stopped.")
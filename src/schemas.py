@@ -1,9 +1,14 @@
 #schemas.py
 
-from pydantic import BaseModel, Field
-from typing import List, Optional
+import os
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional
 from datetime import datetime
 
+# Debug switch: re-validate internally built models before they leave the API
+# (by default, models built by our own code are trusted and serialized directly)
+STRICT_VALIDATION = os.getenv("STRICT_VALIDATION", "False").lower() == "true"
+
 class Candle(BaseModel):
     ts: datetime
     open: float
@@ -11,9 +16,13 @@ class Candle(BaseModel):
     low: float
     close: float
     volume: float = 0.0   # ✅ default avoids NoneType issues
+    synthetic: bool = False   # derived from USD legs (src/tools/cross_rates.py): high/low are estimates
 
 
 class NewsItem(BaseModel):
+    # Immutable: one instance is shared by every pair that cites it (see src/tools/news_store.py)
+    model_config = ConfigDict(frozen=True)
+
     title: str
     url: Optional[str] = None
     timestamp: datetime
@@ -27,4 +36,9 @@ class Recommendation(BaseModel):
     confidence: float = 0.5
     horizon_hours: int = 24
     rationale: List[str] = Field(default_factory=list)
-    news: Optional[List[NewsItem]] = Field(default_factory=list)
\ No newline at end of file
+    news: Optional[List[NewsItem]] = Field(default_factory=list)
+    indicators: Optional[Dict[str, Optional[float]]] = None   # SMA/EMA/ATR/RSI/volatility at decision time
+
+
+class JobRequest(BaseModel):
+    pairs: List[str] = Field(default_factory=list)   # empty → PAIRS from the environment
@@ -0,0 +1,424 @@
+# src/streaming.py
+"""
+Streaming mode: consume bars (or ticks aggregated into bars) from a
+pluggable source, keep per-pair history incrementally, and re-run
+simple_strategy only for a pair whose bar just closed. Each new
+Recommendation is written straight into the recommendation cache, so the API
+serves results seconds after the bar closes, without polling yfinance.
+
+Events are JSON objects, one per line:
+
+    bar:  {"pair": "EURUSD", "ts": "2026-10-01T12:00:00Z",
+           "open": 1.0831, "high": 1.0840, "low": 1.0825, "close": 1.0836}
+    tick: {"pair": "EURUSD", "ts": "2026-10-01T12:00:03Z", "price": 1.0832}
+          ("bid" / "ask" instead of "price" → mid)
+
+A bar event is a closed bar; its "ts" is the bar's open time, as for
+yfinance candles. Ticks are bucketed into STREAM_INTERVAL bars. A bucket
+closes on the first tick of the next bucket, or STREAM_CLOSE_GRACE seconds
+after its end if the pair goes quiet. "After its end" is measured on the
+stream clock: the newest event timestamp seen, advanced by wall time while
+the source is idle. Replaying an old file therefore closes bars the same way
+a live feed does. Out-of-order bars and late ticks are dropped.
+
+Sources (--source / STREAM_SOURCE):
+    file:PATH          tail a JSONL file like `tail -f` (handles truncation/rotation)
+    tcp://HOST:PORT    read JSONL from a socket, reconnecting when it drops
+    -                  stdin
+
+Usage:
+    # standalone, sharing the cache with the API through SQLite
+    RECOMMENDATION_CACHE_BACKEND=sqlite python -m src.streaming --source file:data/stream/ticks.jsonl --interval 1m
+
+    # inside the API process (writes into LATEST_RECOMMENDATIONS)
+    STREAM_SOURCE=tcp://127.0.0.1:9009 STREAM_INTERVAL=1m uvicorn api:app
+
+News is fetched at most once per STREAM_NEWS_TTL seconds per pair. No
+emails are sent in streaming mode.
+
+Each pair's history is seeded once from the market data provider
+(STREAM_SEED, default on). A pair's result only reaches the cache once its
+history holds STREAM_MIN_BARS bars, so a first bar never replaces a good
+cached recommendation with "Not enough candle data".
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from src.schemas import Candle, NewsItem, Recommendation
+
+STREAM_SOURCE = os.getenv("STREAM_SOURCE", "")
+STREAM_INTERVAL = os.getenv("STREAM_INTERVAL", "1h")
+STREAM_HISTORY_BARS = int(os.getenv("STREAM_HISTORY_BARS", 200))
+STREAM_NEWS_TTL = float(os.getenv("STREAM_NEWS_TTL", 300))
+STREAM_CLOSE_GRACE = float(os.getenv("STREAM_CLOSE_GRACE", 2))
+# Seed each pair's history from the market data provider once (API lifespan and CLI)
+STREAM_SEED = os.getenv("STREAM_SEED", "True").lower() == "true"
+# Bars a pair needs before its result may replace the cached recommendation (the strategy needs 2)
+STREAM_MIN_BARS = max(int(os.getenv("STREAM_MIN_BARS", 2)), 2)
+
+# Sources yield None at least this often when idle, so quiet pairs still close
+POLL_INTERVAL = 0.2
+
+INTERVAL_SECONDS = {
+    "1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800,
+    "60m": 3600, "90m": 5400, "1h": 3600, "1d": 86400,
+}
+
+
+def _parse_ts(value) -> datetime:
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+def parse_event(line: str) -> Optional[Dict]:
+    """Decode one JSONL event; None for blank or malformed lines."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        event = json.loads(line)
+        event["pair"] = str(event["pair"]).replace("=X", "").upper()
+        event["ts"] = _parse_ts(event["ts"])
+        return event
+    except Exception:
+        return None
+
+
+# ----------------------------
+# Sources
+# ----------------------------
+class FileTailSource:
+    """Lines appended to a file; starts at the end unless from_start."""
+
+    def __init__(self, path: str, from_start: bool = False, poll_interval: float = POLL_INTERVAL):
+        self.path = path
+        self.from_start = from_start
+        self.poll_interval = poll_interval
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        f, inode, partial = None, None, ""
+        try:
+            while True:
+                if f is None:
+                    try:
+                        f = open(self.path, "r", encoding="utf-8")
+                    except OSError:
+                        self.from_start = True  # created after we started: every line is new
+                        time.sleep(self.poll_interval)
+                        yield None
+                        continue
+                    inode = os.fstat(f.fileno()).st_ino
+                    if not self.from_start:
+                        f.seek(0, os.SEEK_END)
+                    self.from_start = True  # reopened files (rotation) are read from the top
+
+                line = f.readline()
+                if line:
+                    partial += line
+                    if partial.endswith("\n"):
+                        yield partial
+                        partial = ""
+                    continue
+
+                # EOF: reopen if the file was rotated or truncated
+                try:
+                    st = os.stat(self.path)
+                    if st.st_ino != inode or st.st_size < f.tell():
+                        f.close()
+                        f, partial = None, ""
+                        continue
+                except OSError:
+                    pass
+                time.sleep(self.poll_interval)
+                yield None
+        finally:
+            if f is not None:
+                f.close()
+
+
+class SocketSource:
+    """Newline-delimited events from a TCP feed, reconnecting when it drops."""
+
+    def __init__(self, host: str, port: int, reconnect_delay: float = 1.0, poll_interval: float = POLL_INTERVAL):
+        self.host, self.port = host, port
+        self.reconnect_delay = reconnect_delay
+        self.poll_interval = poll_interval
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        while True:
+            try:
+                with socket.create_connection((self.host, self.port), timeout=5) as sock:
+                    sock.settimeout(self.poll_interval)
+                    buffer = b""
+                    while True:
+                        try:
+                            chunk = sock.recv(65536)
+                        except socket.timeout:
+                            yield None
+                            continue
+                        if not chunk:
+                            break
+                        buffer += chunk
+                        *lines, buffer = buffer.split(b"\n")
+                        for line in lines:
+                            yield line.decode("utf-8", "replace")
+            except OSError as e:
+                print(f"⚠️ Stream socket {self.host}:{self.port} unavailable: {e}")
+            time.sleep(self.reconnect_delay)
+            yield None
+
+
+class StdinSource:
+    def __iter__(self) -> Iterator[Optional[str]]:
+        yield from sys.stdin
+
+
+def open_source(spec: str, from_start: bool = False):
+    """Source for 'file:PATH', 'tcp://HOST:PORT' or '-' (stdin)."""
+    if spec == "-":
+        return StdinSource()
+    if spec.startswith("file:"):
+        return FileTailSource(spec[len("file:"):], from_start=from_start)
+    if spec.startswith("tcp://"):
+        host, _, port = spec[len("tcp://"):].rpartition(":")
+        return SocketSource(host or "127.0.0.1", int(port))
+    raise ValueError(f"Unknown stream source '{spec}' (expected file:PATH, tcp://HOST:PORT or -)")
+
+
+# ----------------------------
+# Tick → bar aggregation
+# ----------------------------
+class TickAggregator:
+    """One forming OHLC bar per pair, bucketed by interval."""
+
+    def __init__(self, interval_s: int, grace_s: float = STREAM_CLOSE_GRACE):
+        self.interval_s = interval_s
+        self.grace_s = grace_s
+        self._bars: Dict[str, List] = {}  # pair → [bucket start (epoch s), open, high, low, close, volume]
+        self.late_ticks = 0
+        self._clock: Optional[Tuple[float, float]] = None  # (newest event epoch s, monotonic when seen)
+
+    def now(self) -> float:
+        """Stream clock: newest event time, advanced by wall time since it arrived."""
+        if self._clock is None:
+            return time.time()
+        event_ts, seen_at = self._clock
+        return event_ts + (time.monotonic() - seen_at)
+
+    def _candle(self, bar) -> Candle:
+        start, o, h, l, c, v = bar
+        return Candle(ts=datetime.fromtimestamp(start, tz=timezone.utc), open=o, high=h, low=l, close=c, volume=v)
+
+    def add(self, pair: str, ts: datetime, price: float, volume: float = 0.0) -> Optional[Candle]:
+        """Apply a tick; returns the previous bar if this tick closed it."""
+        epoch = ts.timestamp()
+        if self._clock is None or epoch > self._clock[0]:
+            self._clock = (epoch, time.monotonic())
+        bucket = int(epoch) // self.interval_s * self.interval_s
+        bar = self._bars.get(pair)
+        if bar is not None and bucket < bar[0]:
+            self.late_ticks += 1
+            return None
+        if bar is not None and bucket == bar[0]:
+            bar[2] = max(bar[2], price)
+            bar[3] = min(bar[3], price)
+            bar[4] = price
+            bar[5] += volume
+            return None
+        self._bars[pair] = [bucket, price, price, price, price, volume]
+        return self._candle(bar) if bar is not None else None
+
+    def close_due(self, now: float = None) -> List[Tuple[str, Candle]]:
+        """Close bars whose interval ended more than grace_s ago (pairs that went quiet)."""
+        now = self.now() if now is None else now
+        due = [p for p, bar in self._bars.items() if bar[0] + self.interval_s + self.grace_s <= now]
+        return [(p, self._candle(self._bars.pop(p))) for p in due]
+
+
+# ----------------------------
+# Engine
+# ----------------------------
+class StreamingEngine:
+    """Per-pair rolling history → strategy re-evaluation → recommendation cache."""
+
+    def __init__(self, cache, interval: str = STREAM_INTERVAL, history_bars: int = STREAM_HISTORY_BARS,
+                 news: bool = True, news_ttl: float = STREAM_NEWS_TTL, seed: bool = False,
+                 min_bars: int = STREAM_MIN_BARS):
+        if interval not in INTERVAL_SECONDS:
+            raise ValueError(f"Unsupported stream interval '{interval}' (expected one of {list(INTERVAL_SECONDS)})")
+        self.cache = cache
+        self.interval = interval
+        self.interval_s = INTERVAL_SECONDS[interval]
+        self.history_bars = history_bars
+        self.news = news
+        self.news_ttl = news_ttl
+        self.seed = seed
+        self.min_bars = max(min_bars, 2)
+        self.aggregator = TickAggregator(self.interval_s)
+        self._history: Dict[str, Deque[Candle]] = {}
+        self._news: Dict[str, Tuple[float, List[NewsItem]]] = {}
+        self._stop = threading.Event()
+        self.stats = {"events": 0, "bars": 0, "evaluations": 0, "warming_up": 0, "rejected": 0, "errors": 0,
+                      "last_freshness_s": None}
+
+    # --- inputs ---
+    def _news_for(self, pair: str) -> List[NewsItem]:
+        if not self.news:
+            return []
+        cached = self._news.get(pair)
+        if cached and time.monotonic() - cached[0] < self.news_ttl:
+            return cached[1]
+        from src.tools.strategy_tools import fetch_news_items
+        try:
+            items = fetch_news_items(pair)
+        except Exception as e:
+            print(f"⚠️ News refresh failed for {pair}: {e}")
+            items = cached[1] if cached else []
+        self._news[pair] = (time.monotonic(), items)
+        return items
+
+    def _new_history(self, pair: str, before: datetime) -> Deque[Candle]:
+        history: Deque[Candle] = deque(maxlen=self.history_bars)
+        if self.seed:
+            # One provider download per pair at startup, never per bar
+            from src.tools.yfinance_tool import fetch_forex_candles
+            try:
+                days = max(1, -(-self.history_bars * self.interval_s // 86400))
+                history.extend(c for c in fetch_forex_candles(pair, interval=self.interval, days=days) if c.ts < before)
+            except Exception as e:
+                print(f"⚠️ Could not seed history for {pair}: {e}")
+        self._history[pair] = history
+        return history
+
+    # --- events ---
+    def handle(self, event: Dict) -> Optional[Recommendation]:
+        """Apply one parsed event; returns the new Recommendation if a bar closed."""
+        from src.guardrails.input_validation import validate_pair
+
+        self.stats["events"] += 1
+        try:
+            pair = validate_pair(event["pair"])
+            if "close" in event:
+                candle = Candle(ts=event["ts"], open=event.get("open", event["close"]),
+                                high=event.get("high", event["close"]), low=event.get("low", event["close"]),
+                                close=event["close"], volume=event.get("volume") or 0.0)
+                return self.on_bar(pair, candle)
+            price = event.get("price")
+            if price is None:
+                price = (float(event["bid"]) + float(event["ask"])) / 2.0
+            closed = self.aggregator.add(pair, event["ts"], float(price), float(event.get("volume") or 0.0))
+            return self.on_bar(pair, closed) if closed is not None else None
+        except Exception as e:
+            self.stats["rejected"] += 1
+            print(f"⚠️ Rejected stream event {event!r}: {e}")
+            return None
+
+    def on_bar(self, pair: str, candle: Candle) -> Optional[Recommendation]:
+        history = self._history.get(pair)
+        if history is None:
+            history = self._new_history(pair, candle.ts)
+        if history and candle.ts <= history[-1].ts:
+            self.stats["rejected"] += 1
+            return None
+        history.append(candle)
+        self.stats["bars"] += 1
+        if len(history) < self.min_bars:
+            # Too little history: a result now would be "Not enough candle data" and would
+            # replace the good cached recommendation
+            self.stats["warming_up"] += 1
+            return None
+        return self._evaluate(pair, candle)
+
+    def _evaluate(self, pair: str, candle: Candle) -> Optional[Recommendation]:
+        from src.tools.strategy_tools import run_strategy_on_inputs
+
+        try:
+            rec = run_strategy_on_inputs(pair, list(self._history[pair]), self._news_for(pair))
+            self.cache.set(pair, rec)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"❌ Streaming evaluation failed for {pair}: {e}")
+            return None
+        closed_at = candle.ts + timedelta(seconds=self.interval_s)
+        freshness = max((datetime.now(timezone.utc) - closed_at).total_seconds(), 0.0)
+        self.stats["evaluations"] += 1
+        self.stats["last_freshness_s"] = round(freshness, 3)
+        print(f"📡 {pair} bar {candle.ts.isoformat()} closed → {rec.stance} ({rec.confidence:.2f}), {freshness:.1f}s after close")
+        return rec
+
+    def idle(self, now: float = None):
+        for pair, candle in self.aggregator.close_due(now):
+            self.on_bar(pair, candle)
+
+    # --- loop ---
+    def run(self, source, max_events: int = None):
+        """Consume the source until stop() (or max_events events)."""
+        for line in source:
+            if self._stop.is_set():
+                break
+            if line is not None:
+                event = parse_event(line)
+                if event is None:
+                    self.stats["rejected"] += 1
+                else:
+                    self.handle(event)
+            self.idle()
+            if max_events is not None and self.stats["events"] >= max_events:
+                break
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_streaming(cache, spec: str, **kwargs) -> Tuple[StreamingEngine, threading.Thread]:
+    """Run a StreamingEngine on `spec` in a daemon thread (used by the API lifespan)."""
+    kwargs.setdefault("seed", STREAM_SEED)
+    engine = StreamingEngine(cache, **kwargs)
+    source = open_source(spec)
+    thread = threading.Thread(target=engine.run, args=(source,), name="streaming", daemon=True)
+    thread.start()
+    print(f"📡 Streaming {engine.interval} bars from {spec}")
+    return engine, thread
+
+
+def main(argv=None):
+    from src.cache import build_recommendation_cache
+
+    parser = argparse.ArgumentParser(description="Stream bars/ticks into the recommendation cache.")
+    parser.add_argument("--source", default=STREAM_SOURCE or "-", help="file:PATH, tcp://HOST:PORT or - (stdin)")
+    parser.add_argument("--interval", default=STREAM_INTERVAL, choices=list(INTERVAL_SECONDS))
+    parser.add_argument("--history", type=int, default=STREAM_HISTORY_BARS, help="Bars kept per pair")
+    parser.add_argument("--from-start", action="store_true", help="file: read existing lines before tailing")
+    parser.add_argument("--seed", action=argparse.BooleanOptionalAction, default=STREAM_SEED,
+                        help="Seed each pair's history from the market data provider once (STREAM_SEED)")
+    parser.add_argument("--no-news", action="store_true", help="Skip news (price-only decisions)")
+    args = parser.parse_args(argv)
+
+    cache = build_recommendation_cache()
+    if os.getenv("RECOMMENDATION_CACHE_BACKEND", "memory").lower() == "memory":
+        print("⚠️ RECOMMENDATION_CACHE_BACKEND=memory: results stay in this process. "
+              "Use sqlite to share them with the API.")
+
+    engine = StreamingEngine(cache, interval=args.interval, history_bars=args.history,
+                             news=not args.no_news, seed=args.seed)
+    print(f"📡 Streaming {args.interval} bars from {args.source}")
+    try:
+        engine.run(open_source(args.source, from_start=args.from_start))
+    except KeyboardInterrupt:
+        pass
+    print(f"🏁 Stream stopped: {engine.stats}")
+
+
+if __name__ == "__main__":
+    main()
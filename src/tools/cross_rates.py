@@ -0,0 +1,145 @@
+"""
+cross_rates.py
+--------------
+Synthetic cross rates: derive every MINOR_PAIRS price from the seven USD
+majors instead of downloading each cross separately.
+
+With USD value per unit of currency X written usd(X) (EURUSD for EUR,
+1 / USDJPY for JPY), a cross is
+
+    BASEQUOTE = usd(BASE) / usd(QUOTE)     e.g. EURJPY = EURUSD * USDJPY
+
+Open and close are exact (up to the quotes' own spread / timing) because
+both legs are sampled at the same bar boundaries. Intrabar extremes are not:
+the legs' highs and lows need not happen at the same moment, so high/low are
+estimated from one leg's extreme against the other leg's close (a tighter
+estimate than the leg-high / leg-low bound). Candles built this way carry
+`synthetic=True`.
+
+Enabled with SYNTHETIC_CROSSES=True. USD legs are cached for
+CROSS_LEG_TTL seconds and the majors themselves are served from the same
+cache (usd_major_frame), so a full-board refresh downloads 7 series instead
+of 22. Empty downloads are not cached.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Tuple
+
+from src.tools.providers import download_candles
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+SYNTHETIC_CROSSES = os.getenv("SYNTHETIC_CROSSES", "False").lower() == "true"
+CROSS_LEG_TTL = float(os.getenv("CROSS_LEG_TTL", 60))
+
+# Currency → (USD major, True if quoted as USD/XXX and must be inverted)
+USD_LEGS = {
+    "EUR": ("EURUSD", False),
+    "GBP": ("GBPUSD", False),
+    "AUD": ("AUDUSD", False),
+    "NZD": ("NZDUSD", False),
+    "JPY": ("USDJPY", True),
+    "CHF": ("USDCHF", True),
+    "CAD": ("USDCAD", True),
+}
+
+_lock = threading.Lock()
+# (leg, interval, window seconds) → (fetched at, frame)
+_legs: Dict[Tuple[str, str, int], Tuple[float, "pd.DataFrame"]] = {}
+stats = {"leg_fetches": 0, "leg_hits": 0}
+
+
+def is_derivable(pair: str) -> bool:
+    """True for a non-USD pair whose two currencies both have a USD major."""
+    pair = pair.replace("=X", "").upper()
+    base, quote = pair[:3], pair[3:6]
+    return len(pair) == 6 and "USD" not in (base, quote) and base in USD_LEGS and quote in USD_LEGS
+
+
+def _column(frame, name):
+    # yfinance may return (field, ticker) MultiIndex columns for a single symbol
+    return frame[name].to_numpy(dtype="float64").ravel()
+
+
+def _leg_frame(leg: str, start: datetime, end: datetime, interval: str) -> "pd.DataFrame":
+    """One USD major, shared by every cross that needs it while younger than CROSS_LEG_TTL."""
+    key = (leg, interval, int((end - start).total_seconds()))
+    now = time.monotonic()
+    with _lock:
+        cached = _legs.get(key)
+        if cached and now - cached[0] < CROSS_LEG_TTL:
+            stats["leg_hits"] += 1
+            return cached[1]
+
+    frame = download_candles(f"{leg}=X", start=start, end=end, interval=interval)
+    with _lock:
+        stats["leg_fetches"] += 1
+        if frame is not None and len(frame):
+            _legs[key] = (now, frame)  # an empty/failed download is retried on the next call
+    return frame
+
+
+def is_usd_leg(pair: str) -> bool:
+    """True for one of the seven USD majors in USD_LEGS."""
+    return pair.replace("=X", "").upper() in {leg for leg, _ in USD_LEGS.values()}
+
+
+def usd_major_frame(pair: str, start: datetime, end: datetime, interval: str = "1h") -> "pd.DataFrame":
+    """A USD major from the shared leg cache (a copy: callers may modify it)."""
+    return _leg_frame(pair.replace("=X", "").upper(), start, end, interval).copy()
+
+
+def _usd_value(frame) -> Dict[str, "np.ndarray"]:
+    """OHLC of USD per unit of the leg's currency."""
+    return {name: _column(frame, name.capitalize()) for name in ("open", "high", "low", "close")}
+
+
+def cross_frame(pair: str, start: datetime, end: datetime, interval: str = "1h") -> "pd.DataFrame":
+    """
+    OHLCV DataFrame for a cross derived from its two USD legs, on the bars
+    both legs have. Volume is 0 (spot FX volume is not additive).
+    """
+    import numpy as np
+    import pandas as pd
+
+    pair = pair.replace("=X", "").upper()
+    if not is_derivable(pair):
+        raise ValueError(f"{pair} cannot be derived from USD legs")
+
+    legs = {}
+    for ccy in (pair[:3], pair[3:6]):
+        leg, inverted = USD_LEGS[ccy]
+        frame = _leg_frame(leg, start, end, interval)
+        values = _usd_value(frame)
+        if inverted:
+            # usd(JPY) = 1 / USDJPY: highs and lows swap
+            values = {"open": 1.0 / values["open"], "high": 1.0 / values["low"],
+                      "low": 1.0 / values["high"], "close": 1.0 / values["close"]}
+        legs[ccy] = pd.DataFrame(values, index=frame.index)
+
+    base, quote = legs[pair[:3]], legs[pair[3:6]]
+    index = base.index.intersection(quote.index)
+    b = {k: base[k].reindex(index).to_numpy() for k in base.columns}
+    q = {k: quote[k].reindex(index).to_numpy() for k in quote.columns}
+
+    opens = b["open"] / q["open"]
+    closes = b["close"] / q["close"]
+    # Each leg's extreme against the other leg's close, never outside open/close
+    highs = np.maximum.reduce([opens, closes, b["high"] / q["close"], b["close"] / q["low"]])
+    lows = np.minimum.reduce([opens, closes, b["low"] / q["close"], b["close"] / q["high"]])
+
+    return pd.DataFrame(
+        {"Open": opens, "High": highs, "Low": lows, "Close": closes, "Volume": np.zeros(len(index))},
+        index=index,
+    )
+
+
+def clear():
+    with _lock:
+        _legs.clear()
+        stats.update(leg_fetches=0, leg_hits=0)
@@ -8,10 +8,19 @@ Supports both dry-run printing and actual SMTP email sending.
 import os
 import smtplib
 from email.mime.text import MIMEText
-from dotenv import load_dotenv
 from src.tools.mcp import mcp_tool
+from src.tools.rate_limit import acquire
 
-load_dotenv()
+_env_loaded = False
+
+
+def _load_env_once():
+    """Load .env on first email for callers that did not (api.py and src/main.py load it at startup)."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
 
 @mcp_tool(name="send_strategy_email", description="Send a daily forex strategy email or print it in dry-run mode.")
 def send_strategy_email(
@@ -34,12 +43,14 @@ def send_strategy_email(
     """
 
     # --- Load environment settings ---
+    _load_env_once()
     recipient = recipient or os.getenv("EMAIL_TO")
     sender = os.getenv("EMAIL_FROM", "forex-agent@localhost")
     smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
     smtp_port = int(os.getenv("SMTP_PORT", 587))
     smtp_user = os.getenv("SMTP_USER")
     smtp_pass = os.getenv("SMTP_PASS")
+    smtp_starttls = os.getenv("SMTP_STARTTLS", "True").lower() == "true"  # False for the local SMTP sink
     dry_run = dry_run if dry_run is not None else os.getenv("EMAIL_DRYRUN", "True").lower() == "true"
 
     # --- Validate configuration ---
@@ -62,9 +73,11 @@ def send_strategy_email(
         msg["To"] = recipient
 
         # --- Send via Gmail SMTP ---
+        acquire(f"smtp:{smtp_host}")
         print(f"📤 Connecting to SMTP server {smtp_host}:{smtp_port} ...")
         with smtplib.SMTP(smtp_host, smtp_port, timeout=30) as server:
-            server.starttls()
+            if smtp_starttls:
+                server.starttls()
             server.login(smtp_user, smtp_pass)
             server.send_message(msg)
 
@@ -20,9 +20,10 @@ from datetime import datetime, timezone
 from functools import wraps
 from typing import Any, Callable, Dict
 
+from src.observability.tracing import span
+
 # Directory for trace logs
 TRACE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "traces")
-os.makedirs(TRACE_DIR, exist_ok=True)
 
 
 def log_tool_trace(tool_name: str, input_data: Dict[str, Any], output_data: Any, success: bool, error_msg: str = ""):
@@ -35,6 +36,7 @@ def log_tool_trace(tool_name: str, input_data: Dict[str, Any], output_data: Any,
         "success": success,
         "error": error_msg or None,
     }
+    os.makedirs(TRACE_DIR, exist_ok=True)
     trace_path = os.path.join(TRACE_DIR, f"{datetime.now(timezone.utc).strftime('%Y%m%d')}_traces.jsonl")
     with open(trace_path, "a", encoding="utf-8") as f:
         f.write(json.dumps(trace_entry) + "\n")
@@ -44,6 +46,7 @@ def mcp_tool(name: str, description: str = "", fallback: Callable = None):
     """
     Decorator to make a function MCP-compatible.
     Automatically logs calls, captures errors, and returns standardized output.
+    Each call is timed as a `tool:<name>` span (nested under the caller's span).
 
     Args:
         name (str): Tool name (unique identifier).
@@ -51,8 +54,7 @@ def mcp_tool(name: str, description: str = "", fallback: Callable = None):
         fallback (Callable): Optional function to call if the main one fails.
     """
     def decorator(func: Callable):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
+        def call(*args, **kwargs):
             input_payload = {"args": args, "kwargs": kwargs}
             try:
                 result = func(*args, **kwargs)
@@ -88,6 +90,14 @@ def mcp_tool(name: str, description: str = "", fallback: Callable = None):
                     "status": "failed",
                     "error": error_message
                 }
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(f"tool:{name}") as tool_span:
+                response = call(*args, **kwargs)
+                tool_span.set_attribute("status", response.get("status"))
+                return response
+
         wrapper.mcp_name = name
         wrapper.mcp_description = description
         return wrapper
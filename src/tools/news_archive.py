@@ -0,0 +1,263 @@
+"""
+news_archive.py
+---------------
+Local, append-only archive of every fetched news entry, for replaying past
+decisions and for sentiment in historical analysis (src/evaluation/backtest.py).
+
+Layout: one gzip JSONL partition per UTC publication day
+(NEWS_ARCHIVE_DIR/YYYYMMDD.jsonl.gz). Every append is written as a single
+gzip member with one O_APPEND write, so concurrent workers can share the
+directory. Each record carries its precomputed sentiment and currency tags:
+
+    {"key": ..., "ts": ISO-8601, "title": ..., "url": ..., "source": ...,
+     "sentiment": -1.0..1.0, "currencies": ["EUR", "USD"]}
+
+Entries already archived for the same day (same URL, or title if no URL) are
+skipped, so each headline is scored once. The skip list is per process and
+covers only the last SEEN_PARTITIONS days, so another worker can still append
+a duplicate; reads keep the first record per key. Scoring runs outside the
+archive lock, so one slow batch does not stall other writers or queries.
+
+A torn gzip member (a writer killed mid-append) is skipped on read, together
+with nothing else: decoding resumes at the next member header.
+
+Usage:
+    from src.tools.news_archive import query, sentiment_series
+    query(start, end, currency="EUR")
+    sentiment_series("EURUSD", start, end, freq="1h")
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.tools.news_store import news_key
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # project root
+ARCHIVE_DIR = os.getenv("NEWS_ARCHIVE_DIR", os.path.join(BASE_DIR, "data", "news_archive"))
+ARCHIVE_ENABLED = os.getenv("NEWS_ARCHIVE", "True").lower() == "true"
+
+# Decoded partitions kept in memory for repeated queries
+PARTITION_CACHE_SIZE = 32
+# Day partitions whose archived keys are kept for write-time dedupe
+SEEN_PARTITIONS = 8
+
+# Currency tags: ISO codes plus unambiguous names
+CURRENCY_ALIASES = {
+    "USD": ("USD", "GREENBACK", "US DOLLAR"),
+    "EUR": ("EUR", "EURO", "EUROZONE", "ECB"),
+    "GBP": ("GBP", "STERLING", "POUND", "CABLE", "BOE"),
+    "JPY": ("JPY", "YEN", "BOJ"),
+    "CHF": ("CHF", "SWISS FRANC", "SNB"),
+    "AUD": ("AUD", "AUSSIE", "RBA"),
+    "CAD": ("CAD", "LOONIE", "BOC"),
+    "NZD": ("NZD", "KIWI", "RBNZ"),
+}
+_CURRENCY_RES = {
+    code: re.compile(r"\b(?:" + "|".join(re.escape(a) for a in aliases) + r")\b")
+    for code, aliases in CURRENCY_ALIASES.items()
+}
+
+_lock = threading.Lock()
+_seen: Dict[str, Tuple[int, set]] = {}              # partition path → (file size, archived keys)
+_partitions: Dict[str, Tuple[int, List[Dict]]] = {}  # path → (file size, records)
+
+
+def currency_tags(text: str) -> List[str]:
+    """Currencies mentioned in `text` (case-insensitive), e.g. 'ECB holds, euro slips vs yen' → [EUR, JPY]."""
+    upper = text.upper()
+    return [code for code, pattern in _CURRENCY_RES.items() if pattern.search(upper)]
+
+
+def _partition_path(day: str) -> str:
+    return os.path.join(ARCHIVE_DIR, f"{day}.jsonl.gz")
+
+
+def _members(data: bytes) -> Iterable[bytes]:
+    """Decompressed gzip members; a torn one is skipped by resyncing on the next member header."""
+    pos = 0
+    while pos < len(data):
+        d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            out = d.decompress(data[pos:])
+        except zlib.error:
+            out = None
+        if out is not None and d.eof:
+            yield out
+            pos = len(data) - len(d.unused_data)
+            continue
+        pos = data.find(b"\x1f\x8b\x08", pos + 1)
+        if pos < 0:
+            return
+
+
+def _read_partition(path: str) -> List[Dict]:
+    """Decode one partition: first record per key, torn members and lines skipped."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return []
+    cached = _partitions.get(path)
+    if cached and cached[0] == size:
+        return cached[1]
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    records, keys = [], set()
+    for member in _members(data):
+        for line in member.decode("utf-8", errors="replace").splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("key") not in keys:  # another process archived it too
+                keys.add(record.get("key"))
+                records.append(record)
+    if len(_partitions) >= PARTITION_CACHE_SIZE:
+        _partitions.pop(next(iter(_partitions)))
+    _partitions[path] = (len(data), records)
+    return records
+
+
+def _seen_keys(path: str) -> set:
+    """Keys archived in a partition, refreshed when another process has appended to it."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    cached = _seen.pop(path, None)
+    if cached is None or cached[0] != size:
+        keys = {r["key"] for r in _read_partition(path)}
+        cached = (size, keys | cached[1] if cached else keys)
+    _seen[path] = cached  # most recently used last
+    while len(_seen) > SEEN_PARTITIONS:
+        _seen.pop(next(iter(_seen)))
+    return cached[1]
+
+
+def archive_entries(entries: Iterable[Dict], scorer=None) -> int:
+    """
+    Append fetched news entries to the archive and return how many were new.
+
+    Args:
+        entries: dicts with title, url, timestamp (ISO-8601 UTC), source and
+            optionally `text` (title + summary) used for currency tagging.
+        scorer: sentiment function text → float (default: the strategy's
+            headline sentiment), only called for entries not archived yet.
+    """
+    if not ARCHIVE_ENABLED:
+        return 0
+    if scorer is None:
+        from src.agents.strategy_agent import _headline_sentiment as scorer
+
+    # 1️⃣ Drop entries already archived (under the lock: only set lookups)
+    fresh: Dict[Tuple[str, str], Dict] = {}
+    with _lock:
+        for e in entries:
+            key = news_key(e.get("url"), e.get("title"))
+            ts = e.get("timestamp") or datetime.now(timezone.utc).isoformat()
+            day = ts[:10].replace("-", "")
+            if (day, key) not in fresh and key not in _seen_keys(_partition_path(day)):
+                fresh[(day, key)] = {**e, "timestamp": ts}
+
+    # 2️⃣ Score without the lock (TextBlob is the slow part)
+    scored = []
+    for (day, key), e in fresh.items():
+        title = e.get("title", "") or ""
+        scored.append((day, {
+            "key": key,
+            "ts": e["timestamp"],
+            "title": title,
+            "url": e.get("url"),
+            "source": e.get("source"),
+            "sentiment": round(float(scorer(title)), 4),
+            "currencies": currency_tags(e.get("text") or title),
+        }))
+
+    # 3️⃣ Append what a concurrent call has not archived in the meantime
+    by_day: Dict[str, List[Dict]] = {}
+    with _lock:
+        for day, record in scored:
+            seen = _seen_keys(_partition_path(day))
+            if record["key"] not in seen:
+                seen.add(record["key"])
+                by_day.setdefault(day, []).append(record)
+
+        if by_day:
+            os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        for day, records in by_day.items():
+            payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+            path = _partition_path(day)
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, gzip.compress(payload, 6))
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if path in _seen:  # our own append: no need to re-read the partition
+                _seen[path] = (size, _seen[path][1])
+    return sum(len(r) for r in by_day.values())
+
+
+def _to_utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def query(start: datetime, end: datetime, currency: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+    """
+    Archived entries published in [start, end), optionally only those tagged
+    with `currency`, oldest first. Only the day partitions overlapping the
+    range are read.
+    """
+    start, end = _to_utc(start), _to_utc(end)
+    start_iso, end_iso = start.isoformat(), end.isoformat()
+    currency = currency.upper() if currency else None
+
+    results = []
+    day = start.date()
+    while day <= end.date():
+        with _lock:
+            records = _read_partition(_partition_path(day.strftime("%Y%m%d")))
+        for r in records:
+            # ISO-8601 UTC strings with the same offset compare chronologically
+            if start_iso <= r["ts"] < end_iso and (currency is None or currency in r["currencies"]):
+                results.append(r)
+        day += timedelta(days=1)
+
+    results.sort(key=lambda r: r["ts"])
+    return results[:limit] if limit else results
+
+
+def sentiment_series(pair: str, start: datetime, end: datetime, freq: str = "1h"):
+    """
+    Mean archived sentiment for a pair per `freq` bucket (pandas Series, 0 where no news).
+
+    News tagged with the base currency counts as-is, news tagged with the
+    quote currency counts inverted (good news for JPY is bad for USDJPY);
+    entries tagged with both are neutral for the pair.
+    """
+    import pandas as pd
+
+    base, quote = pair[:3].upper(), pair[3:6].upper()
+    start, end = _to_utc(start), _to_utc(end)
+    times, scores = [], []
+    for r in query(start, end):
+        tags = r["currencies"]
+        sign = (base in tags) - (quote in tags)
+        if sign:
+            times.append(pd.Timestamp(r["ts"]))
+            scores.append(sign * r["sentiment"])
+
+    index = pd.date_range(start=pd.Timestamp(start).floor(freq), end=pd.Timestamp(end), freq=freq, inclusive="left")
+    if not times:
+        return pd.Series(0.0, index=index)
+    series = pd.Series(scores, index=pd.DatetimeIndex(times).tz_convert("UTC"))
+    return series.resample(freq).mean().reindex(index).fillna(0.0)
@@ -0,0 +1,120 @@
+"""
+news_store.py
+-------------
+Shared, de-duplicated NewsItem objects.
+
+Most headlines in the RSS feeds are relevant to several currencies, so the
+same article is fetched for many pairs. Instead of building a fresh NewsItem
+per pair run, raw news dicts are canonicalized by a hash of their URL (or
+title when there is no URL) into one immutable NewsItem that every
+recommendation, cache entry and trace references.
+
+The store is a bounded LRU (NEWS_STORE_SIZE items, default 2048); evicted
+items stay alive for as long as a recommendation still references them.
+A feed may edit a headline (or its timestamp/source) and keep the URL.
+from_dict() therefore only reuses the stored item while title, timestamp and
+source still match the raw dict, and replaces it otherwise; a stale item
+would be scored with the old title and keep the input fingerprint unchanged.
+intern() only reuses the canonical object when its content is equal, so a
+decoded recommendation never picks up the other version.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from src.schemas import NewsItem
+
+NEWS_STORE_SIZE = int(os.getenv("NEWS_STORE_SIZE", 2048))
+
+
+def news_key(url: Optional[str], title: Optional[str]) -> str:
+    """Stable identity of a news item: its URL, falling back to the title."""
+    basis = (url or "").strip() or "title:" + (title or "").strip().lower()
+    return hashlib.blake2b(basis.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _signature(title: str, source: Optional[str], ts: Any) -> Tuple:
+    """What from_dict() compares on a hit; the raw timestamp, so a hit needs no parsing."""
+    return (title, source, ts.isoformat() if isinstance(ts, datetime) else ts)
+
+
+def _parse_timestamp(ts: Any) -> datetime:
+    if isinstance(ts, datetime):
+        return ts
+    if isinstance(ts, str):
+        try:
+            return datetime.fromisoformat(ts)
+        except Exception:
+            pass
+    return datetime.now(timezone.utc)
+
+
+class NewsStore:
+    """Thread-safe LRU of canonical NewsItem objects keyed by news_key()."""
+
+    def __init__(self, max_items: int = NEWS_STORE_SIZE):
+        self.max_items = max_items
+        self._items: "OrderedDict[str, NewsItem]" = OrderedDict()
+        self._signatures: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key: str, signature: Tuple = None) -> Optional[NewsItem]:
+        item = self._items.get(key)
+        if item is None or (signature is not None and self._signatures.get(key) != signature):
+            return None  # missing, or the feed has edited it since
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item
+
+    def _insert(self, key: str, item: NewsItem, signature: Tuple) -> NewsItem:
+        self.misses += 1
+        self._items[key] = item
+        self._items.move_to_end(key)
+        self._signatures[key] = signature
+        if len(self._items) > self.max_items:
+            evicted, _ = self._items.popitem(last=False)
+            self._signatures.pop(evicted, None)
+        return item
+
+    def from_dict(self, d: Dict[str, Any]) -> NewsItem:
+        """Canonical NewsItem for a raw news dict (timestamp is only parsed on a miss or an edit)."""
+        title = d.get("title", "") or ""
+        url = d.get("url")
+        key = news_key(url, title)
+        signature = _signature(title, d.get("source"), d.get("timestamp"))
+        with self._lock:
+            item = self._lookup(key, signature)
+            if item is not None:
+                return item
+        # Build outside the lock; if another thread raced us with the same content, keep its object
+        item = NewsItem(title=title, url=url, timestamp=_parse_timestamp(d.get("timestamp")),
+                        source=d.get("source"), sentiment=None)
+        with self._lock:
+            return self._lookup(key, signature) or self._insert(key, item, signature)
+
+    def intern(self, item: NewsItem) -> NewsItem:
+        """Canonical object equal to `item` (e.g. one decoded from JSON), or `item` itself if the content differs."""
+        key = news_key(item.url, item.title)
+        with self._lock:
+            canonical = self._lookup(key)
+            if canonical is None:
+                return self._insert(key, item, _signature(item.title, item.source, item.timestamp))
+        return canonical if canonical == item else item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._signatures.clear()
+            self.hits = self.misses = 0
+
+
+NEWS_STORE = NewsStore()
@@ -5,18 +5,47 @@ MCP-based tool to fetch forex-related news from public RSS feeds (FXStreet, Inve
 with robust timezone-aware parsing and sensible fallbacks.
 """
 
-import feedparser
+import os
+import threading
+import time
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict
-from dateutil import parser as date_parser
+from typing import List, Dict, Tuple
+from urllib.parse import urlparse
 from src.tools.mcp import mcp_tool
+from src.tools.news_archive import archive_entries
+from src.tools.rate_limit import acquire
 
 # --- RSS sources ---
-RSS_SOURCES = [
+DEFAULT_RSS_SOURCES = [
     "https://www.fxstreet.com/rss/news",
     "https://www.investing.com/rss/news_25.rss",
     "https://www.dailyfx.com/feeds/market-news",
 ]
+# Comma-separated override, e.g. feeds served by the local RSS stub (src/tools/stub_servers.py)
+RSS_SOURCES = [u.strip() for u in os.getenv("RSS_SOURCES", "").split(",") if u.strip()] or DEFAULT_RSS_SOURCES
+
+# Parsed feeds are reused for FEED_CACHE_TTL seconds (0 = always refetch). Every
+# currency reads the same feeds, so a multi-pair run downloads each feed once.
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", 0))
+_feed_lock = threading.Lock()
+_feeds: Dict[str, Tuple[float, object]] = {}
+
+
+def _parse_feed(url: str):
+    import feedparser
+
+    if FEED_CACHE_TTL > 0:
+        with _feed_lock:
+            cached = _feeds.get(url)
+        if cached and time.monotonic() - cached[0] < FEED_CACHE_TTL:
+            return cached[1]
+    acquire(urlparse(url).netloc)
+    print(f"🔎 Fetching from {url}")
+    feed = feedparser.parse(url)
+    if FEED_CACHE_TTL > 0 and not feed.bozo and feed.entries:
+        with _feed_lock:
+            _feeds[url] = (time.monotonic(), feed)
+    return feed
 
 
 @mcp_tool(name="fetch_forex_news", description="Fetch recent forex-related news from multiple RSS sources.")
@@ -33,17 +62,20 @@ def fetch_forex_news(currency: str) -> List[Dict]:
     Returns:
         List[Dict]: A list of news dictionaries containing title, link, published timestamp, and source.
     """
+    # Imported lazily: feedparser/dateutil are only needed once a pipeline runs
+    from dateutil import parser as date_parser
+
     keyword = currency.upper()
     # Slightly wider window to ensure we get something for the demo
     cutoff = datetime.now(timezone.utc) - timedelta(days=3)
 
     all_news: List[Dict] = []
     recent_fallback: List[Dict] = []
+    fetched: List[Dict] = []  # every recent entry, for the local news archive
 
     for url in RSS_SOURCES:
         try:
-            print(f"🔎 Fetching from {url}")
-            feed = feedparser.parse(url)
+            feed = _parse_feed(url)
 
             if feed.bozo:
                 print(f"⚠️ Skipped {url} (malformed feed)")
@@ -94,10 +126,17 @@ def fetch_forex_news(currency: str) -> List[Dict]:
 
                 # Always store for fallback
                 recent_fallback.append(item)
+                fetched.append({**item, "text": combined_text})
 
         except Exception as e:
             print(f"⚠️ Failed to fetch {url}: {e}")
 
+    # Keep a scored, currency-tagged copy for replay / backtests
+    try:
+        archive_entries(fetched)
+    except Exception as e:
+        print(f"⚠️ Failed to archive news: {e}")
+
     # ✅ Fallback: if no currency-specific items, return most recent headlines
     if not all_news and recent_fallback:
         print(f"⚠️ No currency-specific news found for {currency}, returning recent headlines instead.")
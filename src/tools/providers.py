@@ -0,0 +1,150 @@
+"""
+providers.py
+------------
+Pluggable upstream data backends for the tools in src/tools.
+
+Selected by config so the full API can be load-tested on an isolated machine:
+
+- MARKET_DATA_PROVIDER = "yfinance" (default) | "local"
+    local → candles read from LOCAL_CANDLE_DIR/<PAIR>_<interval>.csv (or <PAIR>.csv);
+            pairs without a file get a deterministic synthetic random walk.
+- RSS_SOURCES (news_tool)  → point at the local RSS stub (src/tools/stub_servers.py)
+- SMTP_HOST / SMTP_PORT / SMTP_STARTTLS=False (email_tool) → local SMTP sink
+
+Upstream calls go through the shared per-host rate limiter (src/tools/rate_limit.py).
+
+Local backend knobs:
+- LOCAL_PROVIDER_LATENCY_MS → simulated upstream latency per call
+- LOCAL_CANDLE_BARS         → payload size (bars returned per call; 0 = whole window)
+"""
+
+import os
+import time
+import zlib
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Tuple
+
+from src.tools.rate_limit import acquire
+
+# numpy / pandas / yfinance are imported on first use to keep API cold start fast
+if TYPE_CHECKING:
+    import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # project root
+DEFAULT_LOCAL_CANDLE_DIR = os.path.join(BASE_DIR, "data", "candles")
+
+# pandas frequency for each supported yfinance interval
+INTERVAL_FREQ = {
+    "1m": "1min", "2m": "2min", "5m": "5min", "15m": "15min", "30m": "30min",
+    "60m": "1h", "90m": "90min", "1h": "1h", "1d": "1D", "5d": "5D", "1wk": "7D",
+}
+
+# Parsed local candle files keyed by path → (mtime, frame)
+_LOCAL_FRAMES: Dict[str, Tuple[float, "pd.DataFrame"]] = {}
+
+
+def get_market_data_provider() -> str:
+    return os.getenv("MARKET_DATA_PROVIDER", "yfinance").strip().lower()
+
+
+def simulate_latency():
+    """Sleep for LOCAL_PROVIDER_LATENCY_MS (local backends only)."""
+    latency_ms = float(os.getenv("LOCAL_PROVIDER_LATENCY_MS", 0) or 0)
+    if latency_ms > 0:
+        time.sleep(latency_ms / 1000.0)
+
+
+def download_candles(symbol: str, start: datetime, end: datetime, interval: str = "1h") -> "pd.DataFrame":
+    """
+    Return an OHLCV DataFrame (DatetimeIndex, Open/High/Low/Close/Volume columns)
+    from the configured market data provider.
+
+    Args:
+        symbol: yfinance-style symbol, e.g. "EURUSD=X".
+    """
+    provider = get_market_data_provider()
+    if provider == "local":
+        return _download_local(symbol, start, end, interval)
+    if provider != "yfinance":
+        raise ValueError(f"Unknown MARKET_DATA_PROVIDER '{provider}' (expected 'yfinance' or 'local')")
+
+    import yfinance as yf
+
+    # Shared across workers: queue for a token instead of tripping Yahoo's limits
+    acquire("yfinance")
+
+    # Explicitly set auto_adjust=True to remove FutureWarning
+    return yf.download(
+        symbol,
+        start=start,
+        end=end,
+        interval=interval,
+        progress=False,
+        auto_adjust=True
+    )
+
+
+# ----------------------------
+# Local file backend
+# ----------------------------
+def _download_local(symbol: str, start: datetime, end: datetime, interval: str) -> "pd.DataFrame":
+    import pandas as pd
+
+    pair = symbol.replace("=X", "").upper()
+    freq = INTERVAL_FREQ.get(interval, "1h")
+
+    window_bars = max(int((end - start) / pd.Timedelta(freq)), 1)
+    bars = int(os.getenv("LOCAL_CANDLE_BARS", 0) or 0) or window_bars
+
+    base = _read_local_file(pair, interval)
+    if base is None or base.empty:
+        frame = synthetic_candles(pair, bars)
+    else:
+        # Tile / truncate recorded bars to the requested payload size
+        reps = -(-bars // len(base))
+        frame = pd.concat([base] * reps).iloc[-bars:].copy() if reps > 1 else base.iloc[-bars:].copy()
+
+    # Re-stamp so the newest bar is "now" — tools filter on recency
+    frame.index = pd.date_range(end=pd.Timestamp(end).floor(freq), periods=len(frame), freq=freq)
+    simulate_latency()
+    return frame
+
+
+def _read_local_file(pair: str, interval: str):
+    import pandas as pd
+
+    directory = os.getenv("LOCAL_CANDLE_DIR", DEFAULT_LOCAL_CANDLE_DIR)
+    for name in (f"{pair}_{interval}.csv", f"{pair}.csv"):
+        path = os.path.join(directory, name)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        cached = _LOCAL_FRAMES.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        frame = pd.read_csv(path, index_col=0)
+        frame.index = pd.to_datetime(frame.index, utc=True)
+        frame = frame[[c for c in ("Open", "High", "Low", "Close", "Volume") if c in frame.columns]].astype(float)
+        _LOCAL_FRAMES[path] = (mtime, frame)
+        return frame
+    return None
+
+
+def synthetic_candles(pair: str, bars: int, start_price: float = None) -> "pd.DataFrame":
+    """Deterministic (per pair) random-walk OHLCV frame with `bars` rows."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(zlib.crc32(pair.encode()))
+    price = start_price or (150.0 if pair.endswith("JPY") else 1.0 + rng.random())
+    closes = price * np.exp(np.cumsum(rng.normal(0, 0.0008, bars)))
+    opens = np.concatenate(([price], closes[:-1]))
+    spread = np.abs(rng.normal(0, 0.0004, bars)) * closes
+    return pd.DataFrame({
+        "Open": opens,
+        "High": np.maximum(opens, closes) + spread,
+        "Low": np.minimum(opens, closes) - spread,
+        "Close": closes,
+        "Volume": np.zeros(bars),
+    })
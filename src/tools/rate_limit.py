@@ -0,0 +1,196 @@
+"""
+rate_limit.py
+-------------
+Token-bucket rate limiter shared by every upstream call in src/tools
+(yfinance downloads, RSS feeds, SMTP).
+
+Bursty dashboard traffic and overlapping cron runs used to exceed yfinance's
+informal limits. The resulting errors then triggered pipeline retries, which
+made the burst worse. Callers now queue for a token instead of failing:
+`acquire(host)` reserves the next token and sleeps until it is due. It only
+raises RateLimitTimeout when the wait would exceed the caller's deadline
+(RATE_LIMIT_MAX_WAIT).
+
+Buckets are per upstream host, configured as host=rate:burst (tokens per
+second : bucket size):
+
+    RATE_LIMITS="yfinance=2:5,www.fxstreet.com=1:5,*=10:20"
+
+Hosts without an entry (and no "*" rule) are not limited.
+
+Backends (RATE_LIMIT_BACKEND):
+- file (default on POSIX): one 16-byte state file per host in RATE_LIMIT_DIR,
+  updated under flock. Every process on the machine (uvicorn workers,
+  the scheduler daemon, one-shot CLI runs) draws from the same buckets.
+  The default directory is outside the source tree:
+  $XDG_STATE_HOME/agentic-forex/ratelimit, or the system temp dir when
+  XDG_STATE_HOME is unset.
+- memory: per-process buckets.
+"""
+
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Machine-wide state, so not in the checkout (which it would dirty, and which may be read-only)
+DEFAULT_RATE_LIMIT_DIR = os.path.join(
+    os.getenv("XDG_STATE_HOME") or tempfile.gettempdir(), "agentic-forex", "ratelimit"
+)
+
+DEFAULT_RATE_LIMITS = "yfinance=2:5,www.fxstreet.com=1:5,www.investing.com=1:5,www.dailyfx.com=1:5"
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", 30))
+
+_STATE = struct.Struct("dd")  # tokens, updated_at (epoch seconds)
+
+
+class RateLimitTimeout(TimeoutError):
+    """The wait for a token would exceed the caller's deadline."""
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """'yfinance=2:5,*=10:20' → {host: (rate per second, burst)}."""
+    limits = {}
+    for entry in (spec or "").split(","):
+        if not entry.strip():
+            continue
+        host, _, value = entry.partition("=")
+        rate, _, burst = value.partition(":")
+        rate = float(rate)
+        burst = float(burst) if burst else max(rate, 1.0)
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Invalid rate limit '{entry}' (expected host=rate:burst, rate > 0, burst >= 1)")
+        limits[host.strip().lower()] = (rate, burst)
+    return limits
+
+
+def _refill_and_reserve(tokens: float, updated: float, now: float, rate: float, burst: float,
+                        cost: float) -> Tuple[float, float]:
+    """Bucket state after reserving `cost` tokens at `now` → (tokens left, seconds to wait)."""
+    tokens = min(burst, tokens + max(now - updated, 0.0) * rate)
+    tokens -= cost
+    # A negative balance is the queue: later callers wait behind earlier reservations
+    return tokens, (-tokens / rate if tokens < 0 else 0.0)
+
+
+class RateLimiter:
+    """Per-host token buckets with FIFO-style reservations."""
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], backend: str = "memory", directory: str = None):
+        if backend not in ("memory", "file"):
+            raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{backend}' (expected 'memory' or 'file')")
+        self.limits = limits
+        self.backend = backend
+        self.directory = directory or DEFAULT_RATE_LIMIT_DIR
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._fds: Dict[Tuple[int, str], int] = {}  # (pid, host) → fd; flock needs a fresh open per process
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def limit_for(self, host: str) -> Optional[Tuple[float, float]]:
+        host = host.lower()
+        return self.limits.get(host) or self.limits.get("*")
+
+    # --- backends ---
+    def _path(self, host: str) -> str:
+        name = "".join(c if c.isalnum() or c in ".-_" else "_" for c in host)
+        return os.path.join(self.directory, f"{name}.bucket")
+
+    def _fd(self, host: str) -> int:
+        key = (os.getpid(), host)
+        fd = self._fds.get(key)
+        if fd is None:
+            os.makedirs(self.directory, exist_ok=True)
+            fd = self._fds[key] = os.open(self._path(host), os.O_RDWR | os.O_CREAT, 0o644)
+        return fd
+
+    def _reserve(self, host, rate, burst, cost, now, max_wait) -> Optional[float]:
+        """Reserve tokens if the resulting wait fits max_wait; returns the wait, or None (nothing taken)."""
+        with self._lock:
+            if self.backend == "memory":
+                tokens, updated = self._buckets.get(host, (burst, now))
+                left, wait = _refill_and_reserve(tokens, updated, now, rate, burst, cost)
+                if wait > max_wait:
+                    return None
+                self._buckets[host] = (left, now)
+                return wait
+
+            import fcntl
+
+            fd = self._fd(host)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(fd, _STATE.size, 0)
+                tokens, updated = _STATE.unpack(raw) if len(raw) == _STATE.size else (burst, now)
+                left, wait = _refill_and_reserve(tokens, updated, now, rate, burst, cost)
+                if wait > max_wait:
+                    return None
+                os.pwrite(fd, _STATE.pack(left, now), 0)
+                return wait
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    # --- API ---
+    def acquire(self, host: str, cost: float = 1.0, max_wait: float = None) -> float:
+        """
+        Wait for `cost` tokens from `host`'s bucket; returns the seconds waited.
+        Raises RateLimitTimeout (without taking tokens) if the queue is longer than max_wait.
+        """
+        limit = self.limit_for(host)
+        if limit is None:
+            return 0.0
+        rate, burst = limit
+        max_wait = RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        wait = self._reserve(host.lower(), rate, burst, cost, time.time(), max_wait)
+
+        with self._lock:
+            stats = self.stats.setdefault(host.lower(), {"calls": 0, "waited": 0, "wait_s": 0.0, "timeouts": 0})
+            if wait is None:
+                stats["timeouts"] += 1
+            else:
+                stats["calls"] += 1
+                stats["waited"] += wait > 0
+                stats["wait_s"] += wait
+        if wait is None:
+            raise RateLimitTimeout(f"Rate limit for {host}: queue longer than {max_wait:.1f}s")
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def reset(self):
+        """Forget all bucket state (tests)."""
+        with self._lock:
+            self._buckets.clear()
+            self.stats.clear()
+            for (pid, host), fd in list(self._fds.items()):
+                if pid == os.getpid():
+                    os.close(fd)
+                    try:
+                        os.unlink(self._path(host))
+                    except OSError:
+                        pass
+            self._fds.clear()
+
+
+def build_rate_limiter() -> RateLimiter:
+    """Limiter configured by RATE_LIMITS / RATE_LIMIT_BACKEND / RATE_LIMIT_DIR."""
+    try:
+        import fcntl  # noqa: F401
+        default_backend = "file"
+    except ImportError:
+        default_backend = "memory"
+    return RateLimiter(
+        parse_limits(os.getenv("RATE_LIMITS", DEFAULT_RATE_LIMITS)),
+        backend=os.getenv("RATE_LIMIT_BACKEND", default_backend).strip().lower(),
+        directory=os.getenv("RATE_LIMIT_DIR", DEFAULT_RATE_LIMIT_DIR),
+    )
+
+
+RATE_LIMITER = build_rate_limiter()
+
+
+def acquire(host: str, cost: float = 1.0, max_wait: float = None) -> float:
+    """Queue for a token from the shared limiter (see RateLimiter.acquire)."""
+    return RATE_LIMITER.acquire(host, cost=cost, max_wait=max_wait)
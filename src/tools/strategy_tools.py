@@ -1,46 +1,43 @@
 # src/tools/strategy_tools.py
-from datetime import datetime, timezone
-from typing import List, Any, Dict
+import hashlib
+from typing import List, Any, Dict, Tuple
 
 from src.tools.yfinance_tool import fetch_forex_candles
 from src.tools.news_tool import fetch_forex_news
-from src.agents.strategy_agent import simple_strategy
+from src.tools.news_store import NEWS_STORE, news_key
+from src.agents.strategy_agent import STRATEGY_VERSION, simple_strategy
+from src.indicators import INDICATORS
+from src.observability.tracing import span
 from src.schemas import Candle, NewsItem, Recommendation
 
 
 def _dict_to_newsitem(d: Dict[str, Any]) -> NewsItem:
-    """Safely convert a raw news dict into a NewsItem Pydantic model."""
-    ts = d.get("timestamp")
-    if isinstance(ts, str):
-        try:
-            ts_parsed = datetime.fromisoformat(ts)
-        except Exception:
-            ts_parsed = datetime.now(timezone.utc)
-    else:
-        ts_parsed = datetime.now(timezone.utc)
+    """Canonical (shared, immutable) NewsItem for a raw news dict."""
+    return NEWS_STORE.from_dict(d)
 
-    return NewsItem(
-        title=d.get("title", "") or "",
-        url=d.get("url"),
-        timestamp=ts_parsed,
-        source=d.get("source"),
-        sentiment=None,
-    )
 
-
-def run_strategy_for_pair(pair: str) -> Recommendation:
+def gather_strategy_inputs(pair: str) -> Tuple[List[Candle], List[NewsItem]]:
     """
-    High-level strategy tool:
+    Input-gathering half of the strategy tool:
     1) Fetches candles using yfinance_tool
     2) Fetches recent forex news via news_tool
-    3) Feeds both into strategy_agent.simple_strategy()
-    Returns a Recommendation Pydantic object
+    Returns (candles, news_items)
     """
 
     # --- 1️⃣ Market data ---
-    candles: List[Candle] = fetch_forex_candles(pair, days=3)
+    with span("market_data") as market_span:
+        candles: List[Candle] = fetch_forex_candles(pair, days=3)
+        market_span.set_attribute("candles", len(candles))
 
     # --- 2️⃣ News data ---
+    with span("news") as news_span:
+        news_items = fetch_news_items(pair)
+        news_span.set_attribute("items", len(news_items))
+    return candles, news_items
+
+
+def fetch_news_items(pair: str) -> List[NewsItem]:
+    """Recent news for the pair's base currency as shared NewsItem objects."""
     currency_code = pair[:3].upper()
     raw_news = fetch_forex_news(currency_code)
 
@@ -70,8 +67,47 @@ def run_strategy_for_pair(pair: str) -> Recommendation:
                 # Skip malformed news entries without failing the strategy
                 continue
 
-    # --- 3️⃣ Strategy logic ---
-    rec = simple_strategy(pair, candles, news_items)
+    return news_items
+
+
+def input_fingerprint(pair: str, candles: List[Candle], news_items: List[NewsItem]) -> str:
+    """
+    Hash of everything the strategy decision depends on: last bar timestamp
+    and close, candle count, the ordered news ids with their titles (a feed
+    may edit a headline under the same URL), and STRATEGY_VERSION. Equal fingerprints
+    mean a rerun would produce the same Recommendation.
+    """
+    last = candles[-1] if candles else None
+    parts = [
+        pair,
+        STRATEGY_VERSION,
+        last.ts.isoformat() if last else "-",
+        repr(last.close) if last else "-",
+        str(len(candles)),
+        "\n".join(f"{news_key(n.url, n.title)}:{n.title}" for n in news_items),  # order matters: the strategy clusters and scores the first NEWS_WINDOW (10)
+    ]
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def run_strategy_on_inputs(pair: str, candles: List[Candle], news_items: List[NewsItem]) -> Recommendation:
+    """
+    Decision half of the strategy tool:
+    1) Updates the pair's incremental indicators (src/indicators.py)
+    2) Feeds candles, news and indicators into strategy_agent.simple_strategy()
+    Returns a Recommendation Pydantic object
+    """
+
+    # --- 3️⃣ Indicators (incremental per pair) ---
+    with span("indicators"):
+        try:
+            indicators = INDICATORS.update(pair, candles)
+        except Exception as e:
+            print(f"⚠️ Indicator update failed for {pair}: {e}")
+            indicators = {}
+
+    # --- 4️⃣ Strategy logic ---
+    with span("strategy_rule"):
+        rec = simple_strategy(pair, candles, news_items, indicators=indicators)
 
     # --- Validate and coerce output ---
     if not isinstance(rec, Recommendation):
@@ -88,3 +124,12 @@ def run_strategy_for_pair(pair: str) -> Recommendation:
             )
 
     return rec
+
+
+def run_strategy_for_pair(pair: str) -> Recommendation:
+    """
+    High-level strategy tool: gather_strategy_inputs() → run_strategy_on_inputs().
+    Returns a Recommendation Pydantic object
+    """
+    candles, news_items = gather_strategy_inputs(pair)
+    return run_strategy_on_inputs(pair, candles, news_items)
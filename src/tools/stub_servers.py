@@ -0,0 +1,231 @@
+"""
+stub_servers.py
+---------------
+Local stand-ins for third-party upstreams, for offline load testing:
+
+- RSS stub:  serves recorded feeds (*.xml) from a directory over HTTP.
+             Items are re-dated to "now" and tiled to a configurable count.
+- SMTP sink: accepts mail over plain SMTP (EHLO/AUTH/MAIL/RCPT/DATA) and
+             stores each message as an .eml file (or just counts it).
+
+Both support a configurable per-request latency.
+
+Usage:
+    python -m src.tools.stub_servers rss  --port 8765 --feeds-dir tests/performance/fixtures --entries 200 --latency-ms 80
+    python -m src.tools.stub_servers smtp --port 2525 --out-dir data/smtp_sink --latency-ms 20
+
+Then point the app at them:
+    RSS_SOURCES=http://127.0.0.1:8765/forex_news.xml
+    SMTP_HOST=127.0.0.1 SMTP_PORT=2525 SMTP_STARTTLS=False SMTP_USER=sink SMTP_PASS=sink
+"""
+
+import argparse
+import os
+import re
+import socketserver
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_ITEM_RE = re.compile(r"<item>.*?</item>", re.S)
+_PUBDATE_RE = re.compile(r"<pubDate>.*?</pubDate>", re.S)
+
+
+# ----------------------------
+# RSS stub
+# ----------------------------
+def render_feed(xml: str, entries: int = 0, now: datetime = None) -> bytes:
+    """
+    Re-date and tile the <item> elements of a recorded RSS document.
+
+    Args:
+        xml: recorded RSS 2.0 document.
+        entries: number of items to serve (0 = as recorded).
+    """
+    items = _ITEM_RE.findall(xml)
+    if not items:
+        return xml.encode("utf-8")
+
+    count = entries or len(items)
+    now = now or datetime.now(timezone.utc)
+    rendered = []
+    for i in range(count):
+        published = format_datetime(now - timedelta(minutes=5 * i))
+        rendered.append(_PUBDATE_RE.sub(f"<pubDate>{published}</pubDate>", items[i % len(items)]))
+
+    head = xml[:xml.find(items[0])]
+    tail = xml[xml.rfind(items[-1]) + len(items[-1]):]
+    return (head + "\n".join(rendered) + tail).encode("utf-8")
+
+
+class RSSStubServer(ThreadingHTTPServer):
+    """Serve recorded feeds from `feeds_dir`; GET /<name>.xml[?entries=N]."""
+
+    daemon_threads = True
+
+    def __init__(self, address, feeds_dir: str, entries: int = 0, latency_ms: float = 0.0):
+        self.feeds_dir = feeds_dir
+        self.entries = entries
+        self.latency_ms = latency_ms
+        super().__init__(address, _RSSHandler)
+
+
+class _RSSHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        name = os.path.basename(url.path)
+        path = os.path.join(self.server.feeds_dir, name)
+        if not name.endswith(".xml") or not os.path.isfile(path):
+            self.send_error(404, "Unknown feed")
+            return
+
+        query = parse_qs(url.query)
+        entries = int(query.get("entries", [self.server.entries])[0] or 0)
+        with open(path, "r", encoding="utf-8") as f:
+            body = render_feed(f.read(), entries=entries)
+
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000.0)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# ----------------------------
+# SMTP sink
+# ----------------------------
+class SMTPSinkServer(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server that accepts every message (no TLS)."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, out_dir: str = None, latency_ms: float = 0.0):
+        self.out_dir = out_dir
+        self.latency_ms = latency_ms
+        self.received = 0
+        self._count_lock = threading.Lock()
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        super().__init__(address, _SMTPHandler)
+
+    def store(self, mail_from: str, rcpt_to: list, data: bytes):
+        with self._count_lock:
+            self.received += 1
+        if self.out_dir:
+            path = os.path.join(self.out_dir, f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}.eml")
+            with open(path, "wb") as f:
+                f.write(f"X-Sink-From: {mail_from}\r\nX-Sink-To: {', '.join(rcpt_to)}\r\n".encode() + data)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode("utf-8"))
+
+    def handle(self):
+        mail_from, rcpt_to = "", []
+        self._reply("220 forex-smtp-sink ESMTP ready")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            verb = line.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                self._reply("250-forex-smtp-sink")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250 8BITMIME")
+            elif verb == "HELO":
+                self._reply("250 forex-smtp-sink")
+            elif verb == "AUTH":
+                parts = line.split()
+                if len(parts) == 2 and parts[1].upper() == "LOGIN":
+                    for prompt in ("334 VXNlcm5hbWU6", "334 UGFzc3dvcmQ6"):
+                        self._reply(prompt)
+                        self.rfile.readline()
+                elif len(parts) == 2:
+                    self._reply("334 ")
+                    self.rfile.readline()
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                mail_from, rcpt_to = line[10:].strip(), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_to.append(line[8:].strip())
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                chunks = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    chunks.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                if self.server.latency_ms:
+                    time.sleep(self.server.latency_ms / 1000.0)
+                self.server.store(mail_from, rcpt_to, b"".join(chunks))
+                self._reply("250 OK: queued")
+            elif verb in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+def start_in_thread(server):
+    """Run a stub server in a daemon thread (useful from tests / load harness)."""
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local upstream stand-ins for load testing.")
+    sub = parser.add_subparsers(dest="kind", required=True)
+
+    rss = sub.add_parser("rss", help="Serve recorded RSS feeds over HTTP")
+    rss.add_argument("--host", default="127.0.0.1")
+    rss.add_argument("--port", type=int, default=8765)
+    rss.add_argument("--feeds-dir", default=os.path.join("tests", "performance", "fixtures"))
+    rss.add_argument("--entries", type=int, default=0, help="Items per feed (0 = as recorded)")
+    rss.add_argument("--latency-ms", type=float, default=0.0)
+
+    smtp = sub.add_parser("smtp", help="Accept and store outgoing email")
+    smtp.add_argument("--host", default="127.0.0.1")
+    smtp.add_argument("--port", type=int, default=2525)
+    smtp.add_argument("--out-dir", default=None, help="Store messages as .eml files (default: count only)")
+    smtp.add_argument("--latency-ms", type=float, default=0.0)
+
+    args = parser.parse_args(argv)
+    if args.kind == "rss":
+        server = RSSStubServer((args.host, args.port), args.feeds_dir, args.entries, args.latency_ms)
+        print(f"📡 RSS stub serving {args.feeds_dir} on http://{args.host}:{args.port}/<feed>.xml")
+    else:
+        server = SMTPSinkServer((args.host, args.port), args.out_dir, args.latency_ms)
+        print(f"📮 SMTP sink listening on {args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,34 @@
 # src/tools/yfinance_tool.py
-import yfinance as yf
+import os
+import threading
+import time
 from datetime import datetime, timezone, timedelta
 from src.schemas import Candle
+from src.tools.providers import download_candles
+from src.tools import cross_rates
+
+# Converted candles are reused for CANDLE_CACHE_TTL seconds (0 = always refetch)
+CANDLE_CACHE_TTL = float(os.getenv("CANDLE_CACHE_TTL", 0))
+_candle_lock = threading.Lock()
+_candles = {}  # (symbol, interval, days) → (fetched at, candles)
+
 
 def fetch_forex_candles(pair: str, interval: str = "1h", days: int = 7) -> list[Candle]:
+    """Candles for a pair, served from the short-lived cache when CANDLE_CACHE_TTL > 0."""
+    if CANDLE_CACHE_TTL <= 0:
+        return _fetch_forex_candles(pair, interval, days)
+    key = (pair if pair.endswith("=X") else f"{pair}=X", interval, days)
+    with _candle_lock:
+        cached = _candles.get(key)
+    if cached and time.monotonic() - cached[0] < CANDLE_CACHE_TTL:
+        return list(cached[1])
+    candles = _fetch_forex_candles(pair, interval, days)
+    with _candle_lock:
+        _candles[key] = (time.monotonic(), candles)
+    return list(candles)
+
+
+def _fetch_forex_candles(pair: str, interval: str = "1h", days: int = 7) -> list[Candle]:
     """
     Fetch historical candle data for a forex pair.
 
@@ -20,15 +45,16 @@ def fetch_forex_candles(pair: str, interval: str = "1h", days: int = 7) -> list[
     end = datetime.now(timezone.utc)
     start = end - timedelta(days=days)
 
-    # Explicitly set auto_adjust=True to remove FutureWarning
-    df = yf.download(
-        yf_pair,
-        start=start,
-        end=end,
-        interval=interval,
-        progress=False,
-        auto_adjust=True
-    )
+    # yfinance or local stand-in, depending on MARKET_DATA_PROVIDER;
+    # crosses can instead be derived from the (cached) USD legs
+    synthetic = cross_rates.SYNTHETIC_CROSSES and cross_rates.is_derivable(yf_pair)
+    if synthetic:
+        df = cross_rates.cross_frame(yf_pair, start=start, end=end, interval=interval)
+    elif cross_rates.SYNTHETIC_CROSSES and cross_rates.is_usd_leg(yf_pair):
+        # Majors share the leg cache with the crosses: each leg is downloaded once per CROSS_LEG_TTL
+        df = cross_rates.usd_major_frame(yf_pair, start=start, end=end, interval=interval)
+    else:
+        df = download_candles(yf_pair, start=start, end=end, interval=interval)
 
     # Convert numeric columns to float safely
     numeric_cols = ["Open", "High", "Low", "Close", "Volume"]
@@ -46,6 +72,7 @@ def fetch_forex_candles(pair: str, interval: str = "1h", days: int = 7) -> list[
                 low=float(row["Low"].iloc[0]) if hasattr(row["Low"], "iloc") else float(row["Low"]),
                 close=float(row["Close"].iloc[0]) if hasattr(row["Close"], "iloc") else float(row["Close"]),
                 volume=float(row["Volume"].iloc[0]) if "Volume" in row and row["Volume"] is not None and hasattr(row["Volume"], "iloc") else float(row.get("Volume", 0.0)),
+                synthetic=synthetic,
             )
         )
 
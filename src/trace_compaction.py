@@ -0,0 +1,318 @@
+# src/trace_compaction.py
+"""
+Trace retention and compaction.
+
+graph.save_trace writes one pretty-printed JSON file per run, and
+mcp.log_tool_trace appends to a daily `YYYYMMDD_traces.jsonl` tool log.
+Left alone, both grow forever. This job rolls files older than
+TRACE_COMPACT_AFTER_HOURS (default 24) into compressed segments, partitioned
+by day (and pair, for runs):
+
+    <trace dir>/segments/runs/day=2024-06-11/pair=EURUSD/part-<id>.parquet
+    <trace dir>/segments/tools/day=2024-06-11/part-<id>.parquet
+
+The loose files are deleted once their segment is written. Partitions older
+than TRACE_RETENTION_DAYS (default 90, 0 = keep forever) are deleted.
+
+Segments are Parquet (zstd) when pyarrow is installed. Besides a few flat
+columns for queries (run_id, pair, started_at, status, stance, confidence,
+error_type), each row keeps the full trace as JSON. Without pyarrow, or with
+TRACE_SEGMENT_FORMAT=jsonl.gz, segments are gzip'd JSON lines instead.
+iter_segment_traces() reads both formats and skips partitions outside the
+requested days/pairs. eval_pipeline.load_traces uses it.
+
+Usage:
+    python -m src.trace_compaction [--dir data/traces] [--retention-days 30] [--dry-run]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+TRACE_COMPACT_AFTER_HOURS = float(os.getenv("TRACE_COMPACT_AFTER_HOURS", 24))
+TRACE_RETENTION_DAYS = int(os.getenv("TRACE_RETENTION_DAYS", 90))
+TRACE_SEGMENT_FORMAT = os.getenv("TRACE_SEGMENT_FORMAT", "auto").lower()  # auto | parquet | jsonl.gz
+
+SEGMENTS = "segments"
+_TOOL_LOG_RE = re.compile(r"^(\d{8})_traces\.jsonl$")
+_SAFE_PAIR_RE = re.compile(r"^[A-Z0-9]{3,12}$")
+_SEGMENT_EXTS = (".parquet", ".jsonl.gz")
+
+RUN_COLUMNS = ("run_id", "pair", "started_at", "status", "stance", "confidence", "error_type", "trace")
+TOOL_COLUMNS = ("timestamp", "tool", "success", "error", "entry")
+
+
+def _segment_format(fmt: str = None) -> str:
+    fmt = (fmt or TRACE_SEGMENT_FORMAT).lower()
+    if fmt == "auto":
+        try:
+            import pyarrow  # noqa: F401
+            return "parquet"
+        except ImportError:
+            return "jsonl.gz"
+    if fmt not in ("parquet", "jsonl.gz"):
+        raise ValueError(f"Unknown TRACE_SEGMENT_FORMAT '{fmt}' (expected auto, parquet or jsonl.gz)")
+    return fmt
+
+
+def _parse_ts(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _pair_partition(pair) -> str:
+    pair = str(pair or "").upper()
+    return pair if _SAFE_PAIR_RE.match(pair) else "other"
+
+
+def _run_row(trace: dict) -> dict:
+    rec = trace.get("recommendation") or {}
+    confidence = rec.get("confidence") if isinstance(rec, dict) else None
+    return {
+        "run_id": str(trace.get("run_id") or ""),
+        "pair": str(trace.get("pair") or ""),
+        "started_at": str(trace.get("started_at") or ""),
+        "status": str(trace.get("status") or ""),
+        "stance": str(rec.get("stance") or "") if isinstance(rec, dict) else "",
+        "confidence": float(confidence) if isinstance(confidence, (int, float)) else None,
+        "error_type": str(trace.get("error_type") or ""),
+        "trace": json.dumps(trace, separators=(",", ":"), default=str),
+    }
+
+
+def _tool_row(entry: dict) -> dict:
+    return {
+        "timestamp": str(entry.get("timestamp") or ""),
+        "tool": str(entry.get("tool") or ""),
+        "success": bool(entry.get("success")),
+        "error": str(entry.get("error") or ""),
+        "entry": json.dumps(entry, separators=(",", ":"), default=str),
+    }
+
+
+def _write_segment(directory: str, rows: List[dict], columns, payload_column: str, fmt: str) -> str:
+    """Write rows to a new part file (atomically via rename); returns its path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{int(time.time())}-{uuid.uuid4().hex[:8]}.{fmt}")
+    tmp = path + ".tmp"
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({col: [row[col] for row in rows] for col in columns})
+        pq.write_table(table, tmp, compression="zstd")
+    else:
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for row in rows:
+                f.write(row[payload_column] + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def _read_segment(path: str, payload_column: str) -> Iterator[dict]:
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            print(f"⚠️ pyarrow not installed; skipping segment {path}")
+            return
+        for payload in pq.read_table(path, columns=[payload_column]).column(payload_column).to_pylist():
+            yield json.loads(payload)
+    else:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _partitions(root: str, name: str) -> List[str]:
+    """Values of `name=` sub-directories under root (sorted)."""
+    if not os.path.isdir(root):
+        return []
+    prefix = f"{name}="
+    return sorted(d[len(prefix):] for d in os.listdir(root) if d.startswith(prefix))
+
+
+def _segment_files(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(_SEGMENT_EXTS))
+
+
+def iter_segment_traces(trace_dir: str, since: datetime = None, pairs: Iterable[str] = None) -> Iterator[dict]:
+    """Run traces from compacted segments, pruning day/pair partitions outside the filter."""
+    root = os.path.join(trace_dir, SEGMENTS, "runs")
+    wanted = {_pair_partition(p) for p in pairs} if pairs else None
+    since_day = since.astimezone(timezone.utc).date().isoformat() if since else None
+    for day in _partitions(root, "day"):
+        if since_day and day < since_day:
+            continue
+        day_dir = os.path.join(root, f"day={day}")
+        for pair in _partitions(day_dir, "pair"):
+            if wanted is not None and pair not in wanted:
+                continue
+            for path in _segment_files(os.path.join(day_dir, f"pair={pair}")):
+                yield from _read_segment(path, "trace")
+
+
+def iter_segment_tool_entries(trace_dir: str, since: datetime = None) -> Iterator[dict]:
+    """Tool-log entries from compacted segments."""
+    root = os.path.join(trace_dir, SEGMENTS, "tools")
+    since_day = since.astimezone(timezone.utc).date().isoformat() if since else None
+    for day in _partitions(root, "day"):
+        if since_day and day < since_day:
+            continue
+        for path in _segment_files(os.path.join(root, f"day={day}")):
+            yield from _read_segment(path, "entry")
+
+
+def _load_trace(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Skipping unreadable trace {os.path.basename(path)}: {e}")
+        return None
+
+
+def _loose_run_traces(trace_dir: str, cutoff: float) -> Dict[tuple, List[str]]:
+    """
+    {(day, pair): [path, ...]} for run trace files last modified before cutoff.
+    Only paths are kept: a backlog of weeks of traces would not fit in memory,
+    so each group is loaded again when it is compacted.
+    """
+    groups: Dict[tuple, List[str]] = {}
+    for name in os.listdir(trace_dir):
+        path = os.path.join(trace_dir, name)
+        if not name.endswith(".json") or not os.path.isfile(path) or os.path.getmtime(path) >= cutoff:
+            continue
+        trace = _load_trace(path)
+        if trace is None:
+            continue
+        started = _parse_ts(trace.get("started_at")) or datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+        key = (started.date().isoformat(), _pair_partition(trace.get("pair")))
+        groups.setdefault(key, []).append(path)
+    return groups
+
+
+def _apply_retention(trace_dir: str, oldest_day: str, dry_run: bool) -> int:
+    """Delete day partitions before oldest_day; returns the number removed."""
+    removed = 0
+    for kind in ("runs", "tools"):
+        root = os.path.join(trace_dir, SEGMENTS, kind)
+        for day in _partitions(root, "day"):
+            if day < oldest_day:
+                removed += 1
+                if not dry_run:
+                    shutil.rmtree(os.path.join(root, f"day={day}"))
+    return removed
+
+
+def compact_traces(trace_dir: str, older_than_hours: float = None, retention_days: int = None,
+                   fmt: str = None, dry_run: bool = False, now: datetime = None) -> Dict:
+    """Roll old loose traces / tool logs into segments, then apply retention. Returns counts."""
+    older_than_hours = TRACE_COMPACT_AFTER_HOURS if older_than_hours is None else older_than_hours
+    retention_days = TRACE_RETENTION_DAYS if retention_days is None else retention_days
+    fmt = _segment_format(fmt)
+    now = now or datetime.now(timezone.utc)
+    cutoff = now.timestamp() - older_than_hours * 3600
+    oldest_day = (now - timedelta(days=retention_days)).date().isoformat() if retention_days > 0 else ""
+    stats = {"format": fmt, "runs_compacted": 0, "tool_logs_compacted": 0, "expired_files": 0,
+             "segments_written": 0, "partitions_deleted": 0}
+    if not os.path.isdir(trace_dir):
+        return stats
+
+    # 1️⃣ Run traces → segments/runs/day=/pair=
+    # One (day, pair) group in memory at a time
+    for (day, pair), paths in sorted(_loose_run_traces(trace_dir, cutoff).items()):
+        if day < oldest_day:
+            stats["expired_files"] += len(paths)  # already past retention: just delete
+        else:
+            stats["runs_compacted"] += len(paths)
+            if not dry_run:
+                traces = (_load_trace(path) for path in paths)
+                rows = sorted((_run_row(t) for t in traces if t is not None), key=lambda r: r["started_at"])
+                if rows:
+                    _write_segment(os.path.join(trace_dir, SEGMENTS, "runs", f"day={day}", f"pair={pair}"),
+                                   rows, RUN_COLUMNS, "trace", fmt)
+                    stats["segments_written"] += 1
+        if not dry_run:
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    # 2️⃣ Daily tool logs (never today's, which is still being appended to) → segments/tools/day=
+    today = now.strftime("%Y%m%d")
+    for name in sorted(os.listdir(trace_dir)):
+        match = _TOOL_LOG_RE.match(name)
+        path = os.path.join(trace_dir, name)
+        if not match or match.group(1) >= today or os.path.getmtime(path) >= cutoff:
+            continue
+        stamp = match.group(1)
+        day = f"{stamp[:4]}-{stamp[4:6]}-{stamp[6:]}"
+        if day < oldest_day:
+            stats["expired_files"] += 1
+        else:
+            stats["tool_logs_compacted"] += 1
+            if not dry_run:
+                rows = []
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            rows.append(_tool_row(json.loads(line)))
+                        except ValueError:
+                            continue  # torn last line from a crashed writer
+                if rows:
+                    _write_segment(os.path.join(trace_dir, SEGMENTS, "tools", f"day={day}"),
+                                   rows, TOOL_COLUMNS, "entry", fmt)
+                    stats["segments_written"] += 1
+        if not dry_run:
+            os.remove(path)
+
+    # 3️⃣ Retention on existing segments
+    if oldest_day:
+        stats["partitions_deleted"] = _apply_retention(trace_dir, oldest_day, dry_run)
+    return stats
+
+
+def _trace_dirs() -> List[str]:
+    """Pipeline trace dir (graph) and tool-log dir (mcp), de-duplicated."""
+    from src.graph import TRACE_DIR
+    from src.tools.mcp import TRACE_DIR as TOOL_TRACE_DIR
+
+    dirs = []
+    for d in (TRACE_DIR, TOOL_TRACE_DIR):
+        if os.path.realpath(d) not in {os.path.realpath(x) for x in dirs}:
+            dirs.append(d)
+    return dirs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact old traces into day/pair segments and apply retention.")
+    parser.add_argument("--dir", action="append", help="Trace directory (repeatable; default: pipeline + tool-log dirs)")
+    parser.add_argument("--older-than-hours", type=float, default=None)
+    parser.add_argument("--retention-days", type=int, default=None, help="0 keeps segments forever")
+    parser.add_argument("--format", choices=("auto", "parquet", "jsonl.gz"), default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without touching files")
+    args = parser.parse_args(argv)
+
+    for trace_dir in args.dir or _trace_dirs():
+        stats = compact_traces(trace_dir, older_than_hours=args.older_than_hours,
+                               retention_days=args.retention_days, fmt=args.format, dry_run=args.dry_run)
+        print(f"🗜 {trace_dir}: {json.dumps(stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# src/warmup.py
+"""
+Optional warm-up phase.
+
+Heavy dependencies (pandas/numpy/yfinance, feedparser, dateutil, TextBlob)
+are imported lazily on first use so the API and CLI start quickly. Calling
+warm_up() loads them up front — e.g. in a background thread after the API
+is already serving /api/health (WARMUP_ON_STARTUP=background).
+"""
+
+import time
+from typing import Dict
+
+
+def warm_up() -> Dict[str, float]:
+    """Import heavy modules and prime the TextBlob lexicon. Returns seconds per stage."""
+    timings = {}
+
+    start = time.perf_counter()
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import yfinance  # noqa: F401
+    timings["market_data"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    import feedparser  # noqa: F401
+    from dateutil import parser  # noqa: F401
+    timings["news"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from src.agents.strategy_agent import _headline_sentiment
+    _headline_sentiment("EUR/USD climbs on strong data")
+    timings["sentiment"] = time.perf_counter() - start
+
+    print("🔥 Warm-up complete: " + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+    return timings
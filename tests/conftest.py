@@ -5,6 +5,31 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import pytest
 from src.tools.strategy_tools import run_strategy_for_pair
 from src.tools.email_tool import send_strategy_email
+from src import graph
+from src.pipeline_state import PipelineState
+from src.tools import mcp, rate_limit
+
+
+@pytest.fixture(autouse=True)
+def isolated_pipeline_state(monkeypatch, tmp_path):
+    """Keep skip/email state out of the repo's data/state and independent between tests."""
+    monkeypatch.setattr(graph, "PIPELINE_STATE", PipelineState(str(tmp_path / "pipeline_state.json")))
+
+
+@pytest.fixture(autouse=True)
+def isolated_trace_dirs(monkeypatch, tmp_path):
+    """Run traces and tool logs go to tmp_path instead of data/traces and src/data/traces."""
+    monkeypatch.setattr(graph, "TRACE_DIR", str(tmp_path / "traces"))
+    monkeypatch.setattr(mcp, "TRACE_DIR", str(tmp_path / "tool_traces"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_rate_limits(monkeypatch, tmp_path):
+    """Fresh token buckets per test, stored under tmp_path instead of the shared state dir."""
+    directory = str(tmp_path / "ratelimit")
+    monkeypatch.setenv("RATE_LIMIT_DIR", directory)
+    monkeypatch.setattr(rate_limit, "DEFAULT_RATE_LIMIT_DIR", directory)
+    monkeypatch.setattr(rate_limit, "RATE_LIMITER", rate_limit.build_rate_limiter())
 
 @pytest.fixture
 def sample_pair():
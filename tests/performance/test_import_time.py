@@ -0,0 +1,59 @@
+# tests/performance/test_import_time.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+HEAVY_MODULES = ["yfinance", "pandas", "numpy", "feedparser", "textblob", "dateutil", "dotenv"]
+
+# Generous ceiling: fastapi + pydantic + prometheus_client alone take ~0.3-0.5s
+MAX_IMPORT_SECONDS = float(os.getenv("MAX_IMPORT_SECONDS", 3.0))
+
+
+def _import_in_subprocess(module: str, env: dict = None) -> dict:
+    """Import `module` in a fresh interpreter and report wall time + loaded heavy modules."""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, **(env or {})},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# Cheap (~1s) regression guards: marked unit too, so they stay in every default or -m unit run
+@pytest.mark.unit
+@pytest.mark.performance
+@pytest.mark.parametrize("module", ["api", "src.main"])
+def test_cold_import_is_fast_and_lazy(module):
+    result = _import_in_subprocess(module)
+    print(f"\n⏱ import {module}: {result['seconds']:.3f}s")
+
+    # both entry points read .env before importing src.* (module-level settings)
+    assert set(result["loaded"]) <= {"dotenv"}
+    assert result["seconds"] < MAX_IMPORT_SECONDS
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+def test_import_does_not_create_trace_dir(tmp_path):
+    trace_dir = tmp_path / "traces"
+    _import_in_subprocess("src.graph", env={"TRACE_DIR": str(trace_dir)})
+    assert not trace_dir.exists()
+
+
+@pytest.mark.performance
+def test_warm_up_loads_heavy_modules():
+    from src.warmup import warm_up
+
+    timings = warm_up()
+    assert set(timings) == {"market_data", "news", "sentiment"}
+    assert "textblob" in sys.modules
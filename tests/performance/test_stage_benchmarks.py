@@ -0,0 +1,294 @@
+# tests/performance/test_stage_benchmarks.py
+"""
+Offline benchmarks for every pipeline stage, driven by recorded fixtures
+(tests/performance/fixtures) instead of live yfinance / RSS calls.
+
+Run (deselected by default, see the `benchmark` marker in pytest.ini):
+    pytest -m benchmark tests/performance/test_stage_benchmarks.py
+
+Results are written as JSON to BENCH_RESULTS_PATH (default: a file in the
+system temp dir). Only BENCH_UPDATE_BASELINE=true rewrites the tracked
+data/benchmarks/stage_benchmarks.json, so ordinary runs leave the tree clean.
+Point BENCH_BASELINE at a previous results file to print a per-stage
+comparison at the end of the run.
+"""
+
+import copy
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import feedparser
+import pandas as pd
+import pytest
+import yfinance
+
+from src import graph
+from src.tools import mcp, news_archive, news_tool, rate_limit, yfinance_tool
+from src.agents.strategy_agent import simple_strategy
+from src.evaluation.eval_pipeline import summarize_traces
+from src.schemas import Candle, NewsItem, Recommendation
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+TRACKED_RESULTS_PATH = os.path.join(BASE_DIR, "data", "benchmarks", "stage_benchmarks.json")
+if os.getenv("BENCH_UPDATE_BASELINE", "False").lower() == "true":
+    RESULTS_PATH = TRACKED_RESULTS_PATH
+else:
+    RESULTS_PATH = os.getenv("BENCH_RESULTS_PATH", os.path.join(tempfile.gettempdir(), "stage_benchmarks.json"))
+
+CANDLE_SIZES = [72, 720, 7200]
+NEWS_SIZES = [20, 200, 2000]
+TRACE_SIZES = [10, 100, 1000]
+
+_RESULTS = []
+
+# Heavy and they write a results file, so they only run when selected with -m benchmark / -m performance
+pytestmark = pytest.mark.benchmark
+
+
+# ----------------------------
+# Harness
+# ----------------------------
+def _iterations_for(size: int) -> int:
+    """More repetitions for small inputs, fewer for large ones."""
+    return max(3, min(50, 10000 // max(size, 1)))
+
+
+def _measure(stage: str, size: int, fn, items: int = None):
+    """Time `fn` (after one warm-up call) and record latency + throughput."""
+    fn()
+    iterations = _iterations_for(size)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    mean_s = statistics.mean(samples)
+    result = {
+        "stage": stage,
+        "size": size,
+        "iterations": iterations,
+        "mean_ms": round(mean_s * 1000, 4),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+        "min_ms": round(samples[0] * 1000, 4),
+        "throughput_items_per_s": round((items or size) / mean_s, 1) if mean_s > 0 else None,
+    }
+    _RESULTS.append(result)
+    return result
+
+
+@pytest.fixture(scope="module", autouse=True)
+def bench_report():
+    """Write all results collected in this module to JSON (and compare to a baseline)."""
+    _RESULTS.clear()
+    yield
+    if not _RESULTS:
+        return
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": list(_RESULTS),
+    }
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📁 Benchmark results written to {RESULTS_PATH}")
+
+    baseline_path = os.getenv("BENCH_BASELINE")
+    if baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = {(r["stage"], r["size"]): r for r in json.load(f).get("results", [])}
+        print("=== Comparison vs baseline (mean_ms) ===")
+        for r in _RESULTS:
+            old = baseline.get((r["stage"], r["size"]))
+            if old and old["mean_ms"]:
+                ratio = r["mean_ms"] / old["mean_ms"]
+                print(f"  {r['stage']:<22} n={r['size']:<6} {old['mean_ms']:>10.3f} → {r['mean_ms']:>10.3f}  (x{ratio:.2f})")
+
+
+# ----------------------------
+# Recorded fixtures
+# ----------------------------
+@pytest.fixture(scope="module")
+def recorded_candles() -> pd.DataFrame:
+    df = pd.read_csv(os.path.join(FIXTURE_DIR, "candles_EURUSD_1h.csv"), index_col=0)
+    df.index = pd.to_datetime(df.index, utc=True)
+    return df
+
+
+@pytest.fixture(scope="module")
+def recorded_feed():
+    with open(os.path.join(FIXTURE_DIR, "forex_news.xml"), "rb") as f:
+        feed = feedparser.parse(f.read())
+    assert not feed.bozo and feed.entries
+    return feed
+
+
+def _scale_frame(df: pd.DataFrame, size: int) -> pd.DataFrame:
+    """Tile recorded candles to `size` hourly bars ending now."""
+    reps = -(-size // len(df))
+    scaled = pd.concat([df] * reps).iloc[:size].copy()
+    end = pd.Timestamp.now(tz="UTC").floor("h")
+    scaled.index = pd.date_range(end=end, periods=size, freq="h")
+    return scaled
+
+
+def _scale_feed(feed, size: int):
+    """Tile recorded entries to `size` items with recent publish dates (inside the 3-day cutoff)."""
+    now = datetime.now(timezone.utc)
+    entries = []
+    for i in range(size):
+        entry = copy.copy(feed.entries[i % len(feed.entries)])
+        entry["published"] = (now - timedelta(seconds=60 * i % (2 * 86400))).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        entries.append(entry)
+    return feedparser.FeedParserDict(bozo=False, entries=entries, feed=feed.feed)
+
+
+def _candles(size: int):
+    now = datetime.now(timezone.utc)
+    return [
+        Candle(ts=now - timedelta(hours=size - i), open=1.08, high=1.09, low=1.07, close=1.08 + (i % 7) * 0.0003)
+        for i in range(size)
+    ]
+
+
+def _news(size: int):
+    now = datetime.now(timezone.utc)
+    return [
+        NewsItem(title=f"EUR/USD headline {i % 40} climbs on strong data", url=f"https://example.com/{i}",
+                 timestamp=now - timedelta(minutes=i), source="example.com")
+        for i in range(size)
+    ]
+
+
+def _trace(i: int):
+    started = datetime.now(timezone.utc) - timedelta(minutes=i)
+    pair = ["EURUSD", "GBPUSD", "USDJPY", "AUDCAD"][i % 4]
+    rec = simple_strategy(pair, _candles(3), _news(10))
+    steps = [
+        {"step": "strategy_tool_start", "ts": started.isoformat()},
+        {"step": "strategy_tool_end", "stance": rec.stance, "confidence": rec.confidence,
+         "rationale_count": len(rec.rationale), "news_count": len(rec.news),
+         "ts": (started + timedelta(seconds=1.2)).isoformat()},
+        {"step": "email_agent_start", "ts": (started + timedelta(seconds=1.3)).isoformat()},
+        {"step": "email_agent_end", "email_status": "dryrun", "recipient": None,
+         "ts": (started + timedelta(seconds=1.35)).isoformat()},
+    ]
+    return {
+        "run_id": f"bench{i:06d}", "pair": pair, "started_at": started.isoformat(), "steps": steps,
+        "finished_at": steps[-1]["ts"], "status": "success" if i % 10 else "error",
+        "error": None if i % 10 else "TimeoutError: upstream", "recommendation": rec,
+    }
+
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path):
+    """
+    Keep tool traces, pipeline traces and the news archive out of the repo's data directory,
+    and lift upstream rate limits: the stubs are local, and the benchmarks measure parsing.
+    """
+    monkeypatch.setattr(mcp, "TRACE_DIR", str(tmp_path))
+    monkeypatch.setattr(graph, "TRACE_DIR", str(tmp_path))
+    monkeypatch.setattr(news_archive, "ARCHIVE_DIR", str(tmp_path / "news_archive"))
+    monkeypatch.setattr(rate_limit.RATE_LIMITER, "limits", {})
+    return tmp_path
+
+
+# ----------------------------
+# Stage benchmarks
+# ----------------------------
+@pytest.mark.performance
+@pytest.mark.parametrize("size", CANDLE_SIZES)
+def test_bench_fetch_forex_candles_parsing(size, recorded_candles, offline, monkeypatch):
+    frame = _scale_frame(recorded_candles, size)
+    monkeypatch.setattr(yfinance, "download", lambda *a, **k: frame.copy())
+
+    result = _measure("fetch_forex_candles", size, lambda: yfinance_tool.fetch_forex_candles("EURUSD", days=3))
+    assert len(yfinance_tool.fetch_forex_candles("EURUSD", days=3)) == size
+    assert result["mean_ms"] > 0
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("size", NEWS_SIZES)
+def test_bench_fetch_forex_news_filtering(size, recorded_feed, offline, monkeypatch):
+    feed = _scale_feed(recorded_feed, size)
+    monkeypatch.setattr(feedparser, "parse", lambda *a, **k: feed)
+
+    items = size * len(news_tool.RSS_SOURCES)
+    result = _measure("fetch_forex_news", size, lambda: news_tool.fetch_forex_news("EUR"), items=items)
+    out = news_tool.fetch_forex_news("EUR")
+    assert out["status"] == "success" and out["data"]
+    assert result["mean_ms"] > 0
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("size", CANDLE_SIZES)
+def test_bench_simple_strategy(size):
+    candles = _candles(size)
+    news = _news(max(size // 10, 10))
+
+    result = _measure("simple_strategy", size, lambda: simple_strategy("EURUSD", candles, news))
+    assert isinstance(simple_strategy("EURUSD", candles, news), Recommendation)
+    assert result["mean_ms"] > 0
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("size", NEWS_SIZES)
+def test_bench_save_trace(size, offline):
+    trace = _trace(0)
+    trace["recommendation"].news = _news(size)
+
+    result = _measure("save_trace", size, lambda: graph.save_trace("bench", trace))
+    assert os.path.exists(os.path.join(str(offline), "bench.json"))
+    assert result["mean_ms"] > 0
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("size", TRACE_SIZES)
+def test_bench_summarize_traces(size):
+    traces = [_trace(i) for i in range(size)]
+
+    result = _measure("summarize_traces", size, lambda: summarize_traces(traces))
+    pairs, _ = summarize_traces(traces)
+    assert sum(p["runs"] for p in pairs.values()) == size
+    assert result["mean_ms"] > 0
+
+
+@pytest.mark.performance
+def test_bench_backtest_all_pairs():
+    from src.evaluation.backtest import backtest
+    from src.guardrails.input_validation import ALLOWED_PAIRS
+    from src.tools.providers import synthetic_candles
+
+    bars = 2 * 24 * 365  # two years of hourly bars per pair
+    frames = {pair: synthetic_candles(pair, bars) for pair in ALLOWED_PAIRS}
+
+    result = _measure("backtest_all_pairs", bars, lambda: backtest(frames), items=bars * len(frames))
+    assert len(backtest(frames)) == len(ALLOWED_PAIRS)
+    assert result["mean_ms"] < 5000
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("size", CANDLE_SIZES)
+def test_bench_indicator_update(size):
+    """Per-run indicator cost once warm: one new bar, independent of window size."""
+    from src.indicators import IndicatorEngine
+
+    candles = _candles(size + 1)
+    engine = IndicatorEngine()
+    engine.update("EURUSD", candles[:-1])
+    window = candles[1:]
+
+    result = _measure("indicator_update", size, lambda: engine.update("EURUSD", window), items=1)
+    assert engine.get("EURUSD")["rsi_14"] is not None
+    assert result["mean_ms"] > 0
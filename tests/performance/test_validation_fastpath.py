@@ -0,0 +1,106 @@
+# tests/performance/test_validation_fastpath.py
+"""
+Microbenchmark: /run response body via FastAPI's response_model path
+(validate the returned model again, then serialize) vs serializing the
+already-validated Recommendation directly (api._recommendation_response).
+
+Run:
+    pytest -m performance tests/performance/test_validation_fastpath.py -s
+"""
+
+import asyncio
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException, Response
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+
+import api
+from src import schemas
+from src.cache import MemoryRecommendationCache
+from src.schemas import NewsItem, Recommendation
+
+ITERATIONS = 2000
+
+
+def _recommendation() -> Recommendation:
+    now = datetime.now(timezone.utc)
+    news = [NewsItem(title=f"EUR/USD headline {i} climbs on strong data", url=f"https://example.com/{i}",
+                     timestamp=now, source="example.com") for i in range(10)]
+    rationale = ["Daily move 0.0012"] + [f"{n.title} (example.com) [Sentiment=+0.10]" for n in news]
+    return Recommendation(pair="EURUSD", stance="BUY", confidence=0.8, rationale=rationale, news=news)
+
+
+def _run_route_field():
+    return next(r for r in api.router.routes if r.path == "/api/run").response_field
+
+
+def _cost(fn):
+    """(µs CPU per call, peak KiB allocated per call)."""
+    fn()
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        fn()
+    cpu_us = (time.process_time() - start) * 1e6 / ITERATIONS
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return cpu_us, peak / 1024
+
+
+@pytest.mark.performance
+def test_direct_serialization_skips_response_model_revalidation(monkeypatch):
+    monkeypatch.setattr(schemas, "STRICT_VALIDATION", False)
+    rec = _recommendation()
+    field = _run_route_field()
+    loop = asyncio.new_event_loop()
+    try:
+        def via_response_model():
+            body = loop.run_until_complete(serialize_response(field=field, response_content=rec, dump_json=True))
+            return Response(content=body, media_type="application/json").body
+
+        validated_body = via_response_model()
+        fastapi_cpu, fastapi_kib = _cost(via_response_model)
+        direct_cpu, direct_kib = _cost(lambda: api._recommendation_response(rec).body)
+    finally:
+        loop.close()
+
+    print(f"\n=== /run response body ({ITERATIONS} calls) ===")
+    print(f"  response_model path: {fastapi_cpu:8.1f} µs CPU  {fastapi_kib:6.1f} KiB peak")
+    print(f"  trusted direct:      {direct_cpu:8.1f} µs CPU  {direct_kib:6.1f} KiB peak")
+
+    assert api._recommendation_response(rec).body == validated_body
+    assert direct_kib <= fastapi_kib
+
+
+@pytest.mark.performance
+def test_strict_mode_revalidates_and_rejects_bad_models(monkeypatch):
+    bad = Recommendation.model_construct(pair="EURUSD", stance="BUY", confidence="high", horizon_hours=24,
+                                         rationale=[], news=[])
+    monkeypatch.setattr(schemas, "STRICT_VALIDATION", True)
+    with pytest.raises(HTTPException) as excinfo, warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # pydantic warns while dumping the bad value
+        api._recommendation_response(bad)
+    assert excinfo.value.status_code == 500  # our bug, not the client's
+
+    monkeypatch.setattr(api, "LATEST_RECOMMENDATIONS", MemoryRecommendationCache())
+    monkeypatch.setattr(api, "safe_run_pipeline_once", lambda pair: bad)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        assert TestClient(api.app).get("/api/run", params={"pair": "EURUSD"}).status_code == 500
+
+    good = _recommendation()
+    monkeypatch.setattr(schemas, "STRICT_VALIDATION", False)
+    trusted = api._recommendation_response(good).body
+    monkeypatch.setattr(schemas, "STRICT_VALIDATION", True)
+    assert api._recommendation_response(good).body == trusted
@@ -0,0 +1,139 @@
+# tests/unit/test_admission.py
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from src.guardrails.admission import AdmissionController, Overloaded
+from src.schemas import Recommendation
+
+
+def _hold(controller, entered, release):
+    with controller.admit():
+        entered.set()
+        release.wait(5)
+
+
+@pytest.mark.unit
+def test_concurrency_limit_and_queue_full_sheds():
+    controller = AdmissionController(max_concurrent=1, queue_size=1, queue_timeout=5)
+    entered, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=_hold, args=(controller, entered, release))
+    holder.start()
+    assert entered.wait(2)
+
+    queued_waits = []
+    queued = threading.Thread(target=lambda: queued_waits.append(_admit_and_return(controller)))
+    queued.start()
+    _wait_until(lambda: controller.waiting == 1)
+
+    with pytest.raises(Overloaded) as exc:
+        with controller.admit():
+            pass
+    assert exc.value.reason == "queue_full"
+    assert exc.value.retry_after >= 1
+
+    release.set()
+    holder.join(2)
+    queued.join(2)
+    assert queued_waits and queued_waits[0] > 0
+    snap = controller.snapshot()
+    assert snap["admitted"] == 2
+    assert snap["rejected"] == {"queue_full": 1}
+    assert snap["in_flight"] == 0 and snap["queue_depth"] == 0
+
+
+@pytest.mark.unit
+def test_queue_timeout_sheds():
+    controller = AdmissionController(max_concurrent=1, queue_size=4, queue_timeout=0.1)
+    with controller.admit():
+        start = time.monotonic()
+        with pytest.raises(Overloaded) as exc:
+            with controller.admit():
+                pass
+        assert time.monotonic() - start >= 0.1
+    assert exc.value.reason == "timeout"
+    assert controller.waiting == 0
+    with controller.admit() as waited:  # slot is free again
+        assert waited < 0.1
+
+
+@pytest.mark.unit
+def test_waiters_are_admitted_in_arrival_order():
+    controller = AdmissionController(max_concurrent=1, queue_size=4, queue_timeout=5)
+    order = []
+
+    def run(name):
+        with controller.admit():
+            order.append(name)
+
+    with controller.admit():
+        waiters = []
+        for i, name in enumerate(["first", "second", "third"]):
+            waiters.append(threading.Thread(target=run, args=(name,)))
+            waiters[-1].start()
+            _wait_until(lambda: controller.waiting == i + 1)
+    for t in waiters:
+        t.join(2)
+    assert order == ["first", "second", "third"]
+
+
+@pytest.mark.unit
+def test_newcomer_cannot_take_a_freed_slot_from_a_waiter():
+    controller = AdmissionController(max_concurrent=1, queue_size=4, queue_timeout=5)
+    waits = []
+    with controller.admit():
+        queued = threading.Thread(target=lambda: waits.append(_admit_and_return(controller)))
+        queued.start()
+        _wait_until(lambda: controller.waiting == 1)
+    # The slot is free now, but the queued request holds the oldest ticket
+    with pytest.raises(Overloaded) as exc:
+        with controller.admit(timeout=0):
+            pass
+    assert exc.value.reason == "timeout"
+    queued.join(2)
+    assert len(waits) == 1
+
+
+@pytest.mark.unit
+def test_disabled_controller_admits_everything():
+    controller = AdmissionController(max_concurrent=0, queue_size=0)
+    with controller.admit(), controller.admit():
+        pass
+    assert controller.snapshot()["admitted"] == 0
+
+
+@pytest.mark.unit
+def test_api_run_returns_429_with_retry_after(monkeypatch):
+    controller = AdmissionController(max_concurrent=1, queue_size=0, queue_timeout=1)
+    monkeypatch.setattr(api, "ADMISSION", controller)
+    monkeypatch.setattr(
+        api, "safe_run_pipeline_once",
+        lambda pair: Recommendation(pair=pair, stance="AVOID", confidence=0.0),
+    )
+    client = TestClient(api.app)
+
+    with controller.admit():  # occupy the only slot
+        response = client.get("/api/run", params={"pair": "EURUSD"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    assert client.get("/api/run", params={"pair": "EURUSD"}).status_code == 200
+    admission = client.get("/api/stats").json()["admission"]
+    assert admission["rejected"] == {"queue_full": 1}
+    assert admission["admitted"] == 2
+    assert client.get("/api/stats").json()["pairs"]["EURUSD"]["shed"] == 1
+
+
+def _admit_and_return(controller):
+    with controller.admit() as waited:
+        return waited
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
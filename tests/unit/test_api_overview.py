@@ -0,0 +1,30 @@
+# tests/unit/test_api_overview.py
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+
+
+@pytest.mark.unit
+def test_overview_combines_health_and_request_stats():
+    client = TestClient(api.app)
+    client.get("/api/health")
+    data = client.get("/api/overview").json()
+
+    assert data["health"]["status"] == "ok"
+    assert data["health"]["gauge"] == 1
+    assert data["stats"]["requests"] >= 1
+    assert data["stats"]["endpoints"]["/api/health"]["requests"] >= 1
+    assert isinstance(data["cached_pairs"], int)
+
+
+@pytest.mark.unit
+def test_stats_endpoint_groups_by_route_template():
+    client = TestClient(api.app)
+    client.get("/api/admin/profiles/abc")  # 403 without token
+    client.get("/api/does-not-exist")
+    data = client.get("/api/stats").json()
+
+    assert "/api/admin/profiles/{profile_id}" in data["endpoints"]
+    assert "/api/admin/profiles/abc" not in data["endpoints"]
+    assert data["endpoints"]["other"]["client_errors"] >= 1
@@ -0,0 +1,57 @@
+# tests/unit/test_backtest.py
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.agents import strategy_agent
+from src.evaluation.backtest import BUY, AVOID, SELL, backtest, backtest_series, strategy_signals
+from src.schemas import Candle, NewsItem
+
+
+def _candles(closes):
+    now = datetime.now(timezone.utc)
+    return [Candle(ts=now + timedelta(hours=i), open=c, high=c, low=c, close=c) for i, c in enumerate(closes)]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("sentiment", [0.0, 0.5, -0.5, 0.15])
+def test_vectorized_rule_matches_simple_strategy(monkeypatch, sentiment):
+    monkeypatch.setattr(strategy_agent, "_headline_sentiment", lambda text: sentiment)
+    news = [NewsItem(title="EUR headline", timestamp=datetime.now(timezone.utc))]
+    rng = np.random.default_rng(7)
+    closes = 1.1 + np.cumsum(rng.normal(0, 0.0008, 200))
+
+    stance, confidence = strategy_signals(closes, sentiment)
+    names = {BUY: "BUY", AVOID: "AVOID", SELL: "SELL"}
+    for i in range(1, len(closes)):
+        rec = strategy_agent.simple_strategy("EURUSD", _candles(closes[i - 1:i + 1]), news)
+        assert rec.stance == names[int(stance[i])]
+        assert rec.confidence == pytest.approx(confidence[i])
+
+
+@pytest.mark.unit
+def test_backtest_series_scores_next_bar_move():
+    closes = [1.0000, 1.0010, 1.0020, 1.0012, 1.0016, 1.0030]
+    # signals:  -     BUY     BUY     SELL    AVOID   (last bar unscored)
+    result = backtest_series(closes)
+    assert result["signals"] == 5
+    assert result["stances"] == {"BUY": 2, "AVOID": 2, "SELL": 1}
+    assert result["trades"] == 3
+    assert result["hit_rate"] == pytest.approx(1 / 3, abs=1e-4)  # BUY@1 wins, BUY@2 loses, SELL@3 loses
+    assert len(result["pnl_curve"]) == 5
+    assert result["max_drawdown"] > 0
+
+
+@pytest.mark.unit
+def test_backtest_accepts_frames_candles_and_arrays():
+    import pandas as pd
+
+    closes = [1.0, 1.001, 1.002, 1.0]
+    results = backtest({
+        "EURUSD": np.array(closes),
+        "GBPUSD": _candles(closes),
+        "USDJPY": pd.DataFrame({"Close": closes}),
+    })
+    assert {r["trades"] for r in results.values()} == {2}
+    assert backtest_series([1.0])["signals"] == 0
@@ -0,0 +1,48 @@
+# tests/unit/test_cardinality.py
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import CollectorRegistry, Counter, generate_latest
+
+import api
+from src.observability.cardinality import OTHER, GuardedMetric, method_label, pair_label
+
+
+@pytest.mark.unit
+def test_normalizers_fold_unknown_values():
+    assert pair_label(" eurusd ") == "EURUSD"
+    assert pair_label("XXXYYY") == OTHER
+    assert pair_label(None) == OTHER
+    assert method_label("get") == "GET"
+    assert method_label("PROPFIND") == OTHER
+
+
+@pytest.mark.unit
+def test_guarded_metric_caps_series():
+    registry = CollectorRegistry()
+    metric = GuardedMetric(Counter("guard_test_total", "test", ["pair", "status"], registry=registry),
+                           max_series=3)
+    for i in range(10):
+        metric.labels(pair=f"P{i}", status="error").inc()
+    metric.labels("P0", "error").inc()  # already known: keeps its own series
+
+    assert metric.series() == 4  # 3 real series + the overflow series
+    exposition = generate_latest(registry).decode()
+    assert 'guard_test_total{pair="other",status="other"} 7.0' in exposition
+    assert 'guard_test_total{pair="P0",status="error"} 2.0' in exposition
+    assert 'pair="P5"' not in exposition
+
+
+@pytest.mark.unit
+def test_api_labels_use_route_templates_and_allowed_pairs():
+    client = TestClient(api.app)
+    for i in range(5):
+        client.get(f"/scanner/probe-{i}")
+        client.get("/api/run", params={"pair": f"ZZZ{i:03d}"})
+
+    exposition = client.get("/api/metrics").text
+    assert "probe-" not in exposition
+    assert "ZZZ" not in exposition
+    assert 'forex_run_total{pair="other",status="validation_error"}' in exposition
+    assert 'api_request_latency_seconds_count{path="other"}' in exposition
+    assert 'api_request_latency_seconds_count{path="/api/run"}' in exposition
+    assert 'metric_label_series{metric="api_request"}' in exposition
@@ -0,0 +1,128 @@
+# tests/unit/test_cross_rates.py
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents.strategy_agent import simple_strategy
+from src.guardrails.input_validation import ALLOWED_PAIRS, MINOR_PAIRS
+from src.tools import cross_rates, providers, yfinance_tool
+from src.tools.yfinance_tool import fetch_forex_candles
+
+END = datetime(2026, 10, 1, tzinfo=timezone.utc)
+START = END - timedelta(days=3)
+
+
+@pytest.fixture
+def legs(monkeypatch):
+    """USD majors from the deterministic synthetic generator; counts downloads."""
+    calls = []
+
+    def download(symbol, start, end, interval="1h"):
+        calls.append(symbol)
+        frame = providers.synthetic_candles(symbol.replace("=X", ""), 72)
+        frame.index = pd.date_range(end=pd.Timestamp(end).floor("1h"), periods=72, freq="1h")
+        return frame
+
+    monkeypatch.setattr(cross_rates, "download_candles", download)
+    cross_rates.clear()
+    yield calls
+    cross_rates.clear()
+
+
+@pytest.mark.unit
+def test_cross_closes_are_products_of_legs(legs):
+    eurusd = cross_rates._leg_frame("EURUSD", START, END, "1h")
+    usdjpy = cross_rates._leg_frame("USDJPY", START, END, "1h")
+    usdcad = cross_rates._leg_frame("USDCAD", START, END, "1h")
+    gbpusd = cross_rates._leg_frame("GBPUSD", START, END, "1h")
+
+    eurjpy = cross_rates.cross_frame("EURJPY", START, END)
+    np.testing.assert_allclose(eurjpy["Close"], eurusd["Close"] * usdjpy["Close"])
+    np.testing.assert_allclose(eurjpy["Open"], eurusd["Open"] * usdjpy["Open"])
+
+    gbpcad = cross_rates.cross_frame("GBPCAD", START, END)
+    np.testing.assert_allclose(gbpcad["Close"], gbpusd["Close"] * usdcad["Close"])
+
+    # JPY/CHF: both legs inverted
+    chfjpy = cross_rates.cross_frame("CHFJPY", START, END)
+    usdchf = cross_rates._leg_frame("USDCHF", START, END, "1h")
+    np.testing.assert_allclose(chfjpy["Close"], usdjpy["Close"] / usdchf["Close"])
+
+
+@pytest.mark.unit
+def test_estimated_range_contains_open_close_and_stays_within_leg_bounds(legs):
+    frame = cross_rates.cross_frame("EURJPY", START, END)
+    eurusd = cross_rates._leg_frame("EURUSD", START, END, "1h")
+    usdjpy = cross_rates._leg_frame("USDJPY", START, END, "1h")
+
+    assert (frame["High"] >= frame[["Open", "Close"]].max(axis=1)).all()
+    assert (frame["Low"] <= frame[["Open", "Close"]].min(axis=1)).all()
+    upper = np.maximum(eurusd["High"] * usdjpy["High"], frame[["Open", "Close"]].max(axis=1))
+    lower = np.minimum(eurusd["Low"] * usdjpy["Low"], frame[["Open", "Close"]].min(axis=1))
+    assert (frame["High"] <= upper + 1e-9).all()
+    assert (frame["Low"] >= lower - 1e-9).all()
+
+
+@pytest.mark.unit
+def test_full_board_fetches_each_usd_leg_once(legs):
+    for pair in MINOR_PAIRS:
+        assert cross_rates.is_derivable(pair)
+        cross_rates.cross_frame(pair, START, END)
+    assert sorted(set(legs)) == sorted(legs)
+    assert len(legs) == 7
+    assert cross_rates.stats["leg_fetches"] == 7
+
+
+@pytest.mark.unit
+def test_leg_cache_expires(legs, monkeypatch):
+    monkeypatch.setattr(cross_rates, "CROSS_LEG_TTL", 0)
+    cross_rates.cross_frame("EURJPY", START, END)
+    cross_rates.cross_frame("EURJPY", START, END)
+    assert len(legs) == 4
+
+
+@pytest.mark.unit
+def test_majors_are_not_derived():
+    assert not cross_rates.is_derivable("EURUSD")
+    assert not cross_rates.is_derivable("USDJPY=X")
+    with pytest.raises(ValueError):
+        cross_rates.cross_frame("EURUSD", START, END)
+
+
+@pytest.mark.unit
+def test_fetch_flags_synthetic_candles(legs, monkeypatch):
+    monkeypatch.setattr(cross_rates, "SYNTHETIC_CROSSES", True)
+    candles = fetch_forex_candles("GBPJPY", days=3)
+    assert len(candles) == 72
+    assert all(c.synthetic for c in candles)
+
+    rec = simple_strategy("GBPJPY", candles, [])
+    assert any("derived from USD legs" in r for r in rec.rationale)
+
+
+@pytest.mark.unit
+def test_full_board_refresh_downloads_each_major_once(legs, monkeypatch):
+    monkeypatch.setattr(cross_rates, "SYNTHETIC_CROSSES", True)
+    monkeypatch.setattr(yfinance_tool, "CANDLE_CACHE_TTL", 0)
+    monkeypatch.setattr(yfinance_tool, "download_candles",
+                        lambda *a, **kw: pytest.fail("majors must come from the leg cache"))
+
+    for pair in ALLOWED_PAIRS:
+        assert fetch_forex_candles(pair, days=3)
+    assert sorted(legs) == sorted(f"{leg}=X" for leg, _ in cross_rates.USD_LEGS.values())
+    assert not any(c.synthetic for c in fetch_forex_candles("EURUSD", days=3))
+
+
+@pytest.mark.unit
+def test_empty_leg_download_is_not_cached(monkeypatch):
+    frames = [pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"]),
+              providers.synthetic_candles("EURUSD", 24)]
+    monkeypatch.setattr(cross_rates, "download_candles", lambda *a, **kw: frames.pop(0))
+    cross_rates.clear()
+
+    assert cross_rates._leg_frame("EURUSD", START, END, "1h").empty
+    assert len(cross_rates._leg_frame("EURUSD", START, END, "1h")) == 24
+    assert cross_rates.stats["leg_fetches"] == 2
+    cross_rates.clear()
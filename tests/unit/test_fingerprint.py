@@ -0,0 +1,165 @@
+# tests/unit/test_fingerprint.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src import graph
+from src.pipeline_state import PipelineState
+from src.schemas import Candle, NewsItem
+from src.tools.strategy_tools import input_fingerprint
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _candles(closes):
+    return [Candle(ts=T0 + timedelta(hours=i), open=c, high=c, low=c, close=c) for i, c in enumerate(closes)]
+
+
+def _news(*titles):
+    return [NewsItem(title=t, url=f"https://example.com/{i}", source="test", timestamp=T0) for i, t in enumerate(titles)]
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    """graph with stubbed inputs, in-memory state, traces in tmp_path and counted emails."""
+    inputs = {"candles": _candles([1.1, 1.1010]), "news": _news("Euro rallies")}
+    calls = {"strategy": 0, "email": 0}
+
+    def gather(pair):
+        return inputs["candles"], inputs["news"]
+
+    real_strategy = graph.run_strategy_on_inputs
+
+    def strategy(pair, candles, news):
+        calls["strategy"] += 1
+        return real_strategy(pair, candles, news)
+
+    def email(subject, body, dry_run=True):
+        calls["email"] += 1
+        # same envelope as the real @mcp_tool-wrapped send_strategy_email
+        return {"tool": "send_strategy_email", "status": "success",
+                "data": {"status": "sent", "recipient": "ops@example.com", "subject": subject}}
+
+    monkeypatch.setattr(graph, "gather_strategy_inputs", gather)
+    monkeypatch.setattr(graph, "run_strategy_on_inputs", strategy)
+    monkeypatch.setattr(graph, "send_strategy_email", email)
+    monkeypatch.setattr(graph, "PIPELINE_STATE", PipelineState(None))
+    monkeypatch.setattr(graph, "TRACE_DIR", str(tmp_path))
+    monkeypatch.setattr(graph, "SKIP_UNCHANGED", True)
+    monkeypatch.setattr(graph, "EMAIL_ON_STANCE_CHANGE_ONLY", False)
+    return inputs, calls, tmp_path
+
+
+@pytest.mark.unit
+def test_fingerprint_tracks_last_bar_and_news():
+    candles, news = _candles([1.1, 1.101]), _news("A", "B")
+    fp = input_fingerprint("EURUSD", candles, news)
+
+    assert fp == input_fingerprint("EURUSD", _candles([1.1, 1.101]), _news("A", "B"))
+    assert fp != input_fingerprint("GBPUSD", candles, news)
+    assert fp != input_fingerprint("EURUSD", _candles([1.1, 1.102]), news)
+    assert fp != input_fingerprint("EURUSD", _candles([1.1, 1.101, 1.101]), news)
+    assert fp != input_fingerprint("EURUSD", candles, list(reversed(news)))
+    assert fp != input_fingerprint("EURUSD", candles, news[:1])
+
+
+@pytest.mark.unit
+def test_unchanged_inputs_skip_strategy_trace_and_email(pipeline):
+    inputs, calls, trace_dir = pipeline
+
+    first = graph.run_pipeline_once("EURUSD")
+    second = graph.run_pipeline_once("EURUSD")
+
+    assert first["status"] == second["status"] == "success"
+    assert second["skipped"] == "unchanged_inputs"
+    assert second["fingerprint"] == first["fingerprint"]
+    assert second["recommendation"] is first["recommendation"]
+    assert calls == {"strategy": 1, "email": 1}
+    assert len(list(trace_dir.glob("*.json"))) == 1
+
+    inputs["candles"] = _candles([1.1, 1.1010, 1.1030])
+    third = graph.run_pipeline_once("EURUSD")
+    assert "skipped" not in third
+    assert calls["strategy"] == 2
+
+
+@pytest.mark.unit
+def test_failed_live_email_is_retried_on_unchanged_inputs(pipeline, monkeypatch):
+    _, calls, _ = pipeline
+    outcomes = iter(["error", "sent"])
+
+    def flaky_email(subject, body, dry_run=True):
+        calls["email"] += 1
+        return {"tool": "send_strategy_email", "status": "success",
+                "data": {"status": next(outcomes), "recipient": "ops@example.com", "subject": subject}}
+
+    monkeypatch.setattr(graph, "send_strategy_email", flaky_email)
+
+    first = graph.run_pipeline_once("EURUSD", dry_run_email=False)    # SMTP fails
+    assert first["steps"][-1]["email_status"] == "error"
+    second = graph.run_pipeline_once("EURUSD", dry_run_email=False)   # same inputs, but not skipped
+    assert "skipped" not in second
+    assert second["steps"][-1]["email_status"] == "sent"
+    third = graph.run_pipeline_once("EURUSD", dry_run_email=False)    # now delivered → skipped
+    assert third["skipped"] == "unchanged_inputs"
+    assert calls == {"strategy": 2, "email": 2}
+
+
+@pytest.mark.unit
+def test_skip_can_be_disabled(pipeline, monkeypatch):
+    _, calls, _ = pipeline
+    monkeypatch.setattr(graph, "SKIP_UNCHANGED", False)
+
+    graph.run_pipeline_once("EURUSD")
+    graph.run_pipeline_once("EURUSD")
+    assert calls["strategy"] == 2
+
+
+@pytest.mark.unit
+def test_email_only_on_stance_change(pipeline, monkeypatch):
+    inputs, calls, _ = pipeline
+    monkeypatch.setattr(graph, "EMAIL_ON_STANCE_CHANGE_ONLY", True)
+
+    trace = graph.run_pipeline_once("EURUSD")                  # BUY → emailed
+    assert trace["steps"][-1]["email_status"] == "sent"
+    assert graph.PIPELINE_STATE.emailed_stance("EURUSD") == "BUY"
+    inputs["candles"] = _candles([1.1, 1.1010, 1.1020])
+    trace = graph.run_pipeline_once("EURUSD")                  # still BUY → no email
+    assert trace["recommendation"].stance == "BUY"
+    assert trace["steps"][-1]["email_status"] == "skipped_no_change"
+
+    inputs["candles"] = _candles([1.1, 1.1010, 1.1020, 1.1000])
+    trace = graph.run_pipeline_once("EURUSD")                  # SELL → emailed
+    assert trace["recommendation"].stance == "SELL"
+    assert calls["email"] == 2
+
+
+@pytest.mark.unit
+def test_state_survives_reload(tmp_path):
+    path = str(tmp_path / "state.json")
+    state = PipelineState(path)
+    rec = graph.run_strategy_on_inputs("EURUSD", _candles([1.1, 1.101]), _news("Euro rallies"))
+    state.remember("EURUSD", "abc", rec)
+    state.mark_emailed("EURUSD", rec.stance)
+
+    reloaded = PipelineState(path)
+    assert reloaded.previous("EURUSD", "abc") == rec
+    assert reloaded.previous("EURUSD", "other") is None
+    assert reloaded.emailed_stance("EURUSD") == rec.stance
+
+
+@pytest.mark.unit
+def test_writers_sharing_the_file_do_not_clobber_each_other(tmp_path):
+    path = str(tmp_path / "state.json")
+    worker_a, worker_b = PipelineState(path), PipelineState(path)
+    assert worker_b.emailed_stance("GBPUSD") is None  # b has loaded (empty) state
+
+    rec = graph.run_strategy_on_inputs("EURUSD", _candles([1.1, 1.101]), _news("Euro rallies"))
+    worker_a.remember("EURUSD", "abc", rec)
+    worker_a.mark_emailed("EURUSD", "BUY")
+    worker_b.mark_emailed("GBPUSD", "SELL")  # must merge, not overwrite with b's stale copy
+
+    assert worker_b.emailed_stance("EURUSD") == "BUY"
+    assert worker_b.previous("EURUSD", "abc") == rec
+    assert worker_a.emailed_stance("GBPUSD") == "SELL"
+    assert PipelineState(path).emailed_stance("EURUSD") == "BUY"
@@ -0,0 +1,103 @@
+# tests/unit/test_http_cache.py
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from src.cache import MemoryRecommendationCache
+from src.http_cache import EncodedPayloadCache, choose_encoding, etag_matches, make_etag
+from src.schemas import NewsItem, Recommendation
+
+
+def _rec(pair, stance="BUY", news=0):
+    items = [
+        NewsItem(title=f"{pair} headline {i}", url=f"https://example.com/{pair}/{i}",
+                 timestamp=datetime.now(timezone.utc), source="example.com")
+        for i in range(news)
+    ]
+    return Recommendation(pair=pair, stance=stance, confidence=0.7, rationale=["r"] * 5, news=items)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api, "LATEST_RECOMMENDATIONS", MemoryRecommendationCache())
+    monkeypatch.setattr(api, "READ_PAYLOADS", EncodedPayloadCache())
+    return TestClient(api.app)
+
+
+@pytest.mark.unit
+def test_etag_helpers():
+    tag = make_etag("recommendations", b"[1]")
+    opaque = tag[2:]
+    assert tag == make_etag("recommendations", b"[1]")
+    assert tag != make_etag("recommendations", b"[2]")
+    assert etag_matches(tag, tag)
+    assert etag_matches(opaque, tag)
+    assert etag_matches(f'W/"x-1", {tag}', tag)
+    assert not etag_matches('W/"recommendations-6"', tag)
+    assert etag_matches("*", tag)
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding(None) is None
+
+
+@pytest.mark.unit
+def test_recommendations_not_modified_until_cache_changes(client):
+    api.LATEST_RECOMMENDATIONS["EURUSD"] = _rec("EURUSD")
+
+    first = client.get("/api/recommendations")
+    assert first.status_code == 200
+    assert first.json()[0]["pair"] == "EURUSD"
+    etag = first.headers["etag"]
+
+    assert client.get("/api/recommendations", headers={"If-None-Match": etag}).status_code == 304
+
+    api.LATEST_RECOMMENDATIONS["GBPUSD"] = _rec("GBPUSD", "SELL")
+    changed = client.get("/api/recommendations", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert {r["pair"] for r in changed.json()} == {"EURUSD", "GBPUSD"}
+
+
+@pytest.mark.unit
+def test_history_pair_etag_and_missing_pair(client):
+    assert client.get("/api/history", params={"pair": "EURUSD"}).json() == {"message": "No data for EURUSD"}
+    api.LATEST_RECOMMENDATIONS["EURUSD"] = _rec("EURUSD")
+    resp = client.get("/api/history", params={"pair": "eurusd"})
+    assert resp.json()["stance"] == "BUY"
+    again = client.get("/api/history", params={"pair": "EURUSD"}, headers={"If-None-Match": resp.headers["etag"]})
+    assert again.status_code == 304
+
+
+@pytest.mark.unit
+def test_large_payloads_are_gzipped(client):
+    for pair in ("EURUSD", "GBPUSD", "USDJPY"):
+        api.LATEST_RECOMMENDATIONS[pair] = _rec(pair, news=15)
+
+    resp = client.get("/api/recommendations", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert len(resp.json()) == 3
+
+    raw = client.get("/api/recommendations", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+    assert gzip.decompress(api.READ_PAYLOADS.get("recommendations", api.LATEST_RECOMMENDATIONS.version(), None)
+                           .encoded("gzip")[0]) == raw.content
+
+
+@pytest.mark.unit
+def test_etag_survives_restart_only_for_identical_bodies(client, monkeypatch):
+    api.LATEST_RECOMMENDATIONS["EURUSD"] = _rec("EURUSD")
+    etag = client.get("/api/recommendations").headers["etag"]
+
+    # "restart": fresh cache whose version counter starts over, with different content
+    monkeypatch.setattr(api, "LATEST_RECOMMENDATIONS", MemoryRecommendationCache())
+    monkeypatch.setattr(api, "READ_PAYLOADS", EncodedPayloadCache())
+    api.LATEST_RECOMMENDATIONS["EURUSD"] = _rec("EURUSD", "SELL")
+    assert client.get("/api/recommendations", headers={"If-None-Match": etag}).status_code == 200
+
+    monkeypatch.setattr(api, "LATEST_RECOMMENDATIONS", MemoryRecommendationCache())
+    monkeypatch.setattr(api, "READ_PAYLOADS", EncodedPayloadCache())
+    api.LATEST_RECOMMENDATIONS["EURUSD"] = _rec("EURUSD")
+    assert client.get("/api/recommendations", headers={"If-None-Match": etag}).status_code == 304
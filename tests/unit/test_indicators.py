@@ -0,0 +1,111 @@
+# tests/unit/test_indicators.py
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.agents.strategy_agent import simple_strategy
+from src.indicators import IndicatorEngine, IndicatorState
+from src.schemas import Candle
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _series(n, seed=3):
+    rng = np.random.default_rng(seed)
+    closes = 1.08 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    spread = np.abs(rng.normal(0, 0.0005, n))
+    return closes + spread, closes - spread, closes
+
+
+def _candles(n, seed=3):
+    highs, lows, closes = _series(n, seed)
+    return [Candle(ts=T0 + timedelta(hours=i), open=c, high=h, low=l, close=c)
+            for i, (h, l, c) in enumerate(zip(highs, lows, closes))]
+
+
+def _reference(highs, lows, closes, period=14, sma=20, ema=20, window=24):
+    """Straightforward full-recompute definitions."""
+    ema_v = closes[:ema].mean()
+    for c in closes[ema:]:
+        ema_v += (c - ema_v) * 2 / (ema + 1)
+    tr = [max(highs[i] - lows[i], abs(highs[i] - closes[i - 1]), abs(lows[i] - closes[i - 1]))
+          for i in range(1, len(closes))]
+    atr = np.mean(tr[:period])
+    for x in tr[period:]:
+        atr = (atr * (period - 1) + x) / period
+    change = np.diff(closes)
+    gain, loss = np.clip(change, 0, None), np.clip(-change, 0, None)
+    ag, al = gain[:period].mean(), loss[:period].mean()
+    for g, l in zip(gain[period:], loss[period:]):
+        ag, al = (ag * (period - 1) + g) / period, (al * (period - 1) + l) / period
+    return {
+        "sma_20": closes[-sma:].mean(),
+        "ema_20": ema_v,
+        "atr_14": atr,
+        "rsi_14": 100 - 100 / (1 + ag / al),
+        "volatility_24": np.std(np.diff(np.log(closes))[-window:], ddof=1),
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("mode", ["batch", "incremental"])
+def test_values_match_reference_definitions(mode):
+    highs, lows, closes = _series(500)
+    state = IndicatorState()
+    if mode == "batch":
+        state.initialize(highs, lows, closes)
+    else:
+        for h, l, c in zip(highs, lows, closes):
+            state.update(h, l, c)
+
+    expected = _reference(highs, lows, closes)
+    for name, value in state.values().items():
+        assert value == pytest.approx(expected[name], rel=1e-9), name
+
+
+@pytest.mark.unit
+def test_warm_up_returns_none_until_enough_bars():
+    highs, lows, closes = _series(15)
+    state = IndicatorState()
+    state.initialize(highs, lows, closes)
+    values = state.values()
+    assert values["sma_20"] is None and values["ema_20"] is None and values["volatility_24"] is None
+    assert values["atr_14"] is not None and values["rsi_14"] is not None
+
+    for h, l, c in zip(*_series(10, seed=4)):
+        state.update(h, l, c)
+    assert state.values()["sma_20"] is not None and state.values()["ema_20"] is not None
+
+
+@pytest.mark.unit
+def test_engine_applies_only_new_bars_and_previews_forming_bar():
+    engine = IndicatorEngine()
+    candles = _candles(100)
+    first = engine.update("EURUSD", candles[:72])
+    state = engine._states["EURUSD"]
+    assert state.bars == 71 and state.last_ts == candles[70].ts  # newest bar is only previewed
+
+    # Next run: the 72-bar window slid forward by one bar
+    second = engine.update("EURUSD", candles[1:73])
+    assert state.bars == 72 and state.last_ts == candles[71].ts
+    assert first != second
+
+    fresh = IndicatorState()
+    fresh.initialize([c.high for c in candles[:73]], [c.low for c in candles[:73]], [c.close for c in candles[:73]])
+    for name, value in fresh.values().items():
+        assert second[name] == pytest.approx(value, rel=1e-9)
+
+    # A gap beyond the window rebuilds from scratch
+    engine.update("EURUSD", candles[90:])
+    assert state.last_ts == candles[98].ts and state.bars == 9
+
+
+@pytest.mark.unit
+def test_strategy_reports_indicators():
+    candles = _candles(72)
+    indicators = IndicatorEngine().update("EURUSD", candles)
+    rec = simple_strategy("EURUSD", candles, [], indicators=indicators)
+    assert rec.indicators["rsi_14"] == pytest.approx(indicators["rsi_14"], abs=1e-6)
+    assert any(line.startswith("📐 Indicators: SMA20=") for line in rec.rationale)
+    assert simple_strategy("EURUSD", candles, []).indicators is None
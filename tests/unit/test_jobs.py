@@ -0,0 +1,177 @@
+# tests/unit/test_jobs.py
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from src.cache import MemoryRecommendationCache
+from src.jobs import JobManager, JobStore
+from src.schemas import Recommendation
+
+
+def _trace(pair, status="success"):
+    trace = {"run_id": f"run-{pair}", "status": status}
+    if status == "success":
+        trace["recommendation"] = Recommendation(pair=pair, stance="BUY", confidence=0.6)
+    else:
+        trace["error"] = "boom"
+    return trace
+
+
+def _wait_for(store, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = store.get(job_id)
+        if job["status"] == "completed":
+            return job
+        assert time.monotonic() < deadline, job
+        time.sleep(0.01)
+
+
+@pytest.mark.unit
+def test_job_runs_pairs_and_records_results(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    cache = MemoryRecommendationCache()
+    manager = JobManager(store, cache=cache, workers=2,
+                         run_fn=lambda pair: _trace(pair, "error" if pair == "USDJPY" else "success"))
+
+    job_id = manager.submit(["EURUSD", "USDJPY", "GBPUSD"])
+    job = _wait_for(store, job_id)
+    manager.shutdown(wait=True)
+
+    assert job["counts"] == {"queued": 0, "running": 0, "succeeded": 2, "failed": 1}
+    assert [r["pair"] for r in job["results"]] == ["EURUSD", "USDJPY", "GBPUSD"]
+    assert job["results"][0]["recommendation"]["stance"] == "BUY"
+    assert job["results"][1]["error"] == "boom"
+    assert cache["EURUSD"].stance == "BUY" and "USDJPY" not in cache
+    assert store.list()[0]["job_id"] == job_id
+
+
+@pytest.mark.unit
+def test_resume_requeues_orphans_and_runs_each_pair_once(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    store = JobStore(path)
+    job_id = store.create(["EURUSD", "GBPUSD"])
+    assert store.claim(job_id, "EURUSD", "somehost:1:dead", lease=60)
+    assert store.requeue_expired() == []  # lease still valid, even though nobody renews it
+    assert store.requeue_expired(now=time.time() + 61) == [(job_id, "EURUSD")]
+
+    calls = []
+    lock = threading.Lock()
+
+    def run(pair):
+        with lock:
+            calls.append(pair)
+        return _trace(pair)
+
+    # two "workers" resuming the same file after a restart
+    first, second = JobManager(JobStore(path), run_fn=run), JobManager(JobStore(path), run_fn=run)
+    assert first.resume() == 2
+    second.resume()
+    job = _wait_for(store, job_id)
+    first.shutdown(wait=True)
+    second.shutdown(wait=True)
+
+    assert job["counts"]["succeeded"] == 2
+    assert sorted(calls) == ["EURUSD", "GBPUSD"]
+
+
+@pytest.mark.unit
+def test_events_yield_pairs_then_done(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    manager = JobManager(store, workers=1, run_fn=_trace)
+    job_id = manager.submit(["EURUSD", "GBPUSD"])
+
+    events = list(manager.events(job_id, poll=0.01, timeout=5))
+    manager.shutdown(wait=True)
+
+    assert [e["event"] for e in events] == ["pair", "pair", "done"]
+    assert events[-1]["data"]["status"] == "completed"
+    assert list(manager.events("missing", poll=0.01)) == []
+
+
+@pytest.mark.unit
+def test_job_endpoints(monkeypatch, tmp_path):
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite")), workers=1, run_fn=_trace)
+    monkeypatch.setattr(api, "JOBS", manager)
+    client = TestClient(api.app)
+
+    assert client.post("/api/jobs", json={"pairs": ["EURUSD", "BADPAIR"]}).status_code == 400
+    response = client.post("/api/jobs", json={"pairs": ["eurusd", "GBPUSD", "EURUSD"]})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    stream = client.get(f"/api/jobs/{job_id}/stream")
+    assert stream.headers["content-type"].startswith("text/event-stream")
+    assert stream.text.count("event: pair") == 2 and "event: done" in stream.text
+
+    job = client.get(f"/api/jobs/{job_id}").json()
+    assert [r["pair"] for r in job["results"]] == ["EURUSD", "GBPUSD"]
+    assert job["status"] == "completed"
+    assert client.get("/api/jobs/unknown").status_code == 404
+    assert client.get("/api/jobs").json()[0]["job_id"] == job_id
+    manager.shutdown(wait=True)
+
+
+@pytest.mark.unit
+def test_lease_is_renewed_while_running_and_taken_over_after_expiry(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    release = threading.Event()
+
+    def slow(pair):
+        release.wait(5)
+        return _trace(pair)
+
+    # the same hostname:pid after a container restart must not keep the old claim alive
+    stale = JobStore(path)
+    job_id = stale.create(["EURUSD"])
+    stale.claim(job_id, "EURUSD", "host:1:before-restart", lease=0.05)
+    time.sleep(0.1)
+
+    manager = JobManager(JobStore(path), workers=1, run_fn=slow, lease=0.3)
+    assert manager.resume() == 1
+    time.sleep(0.6)  # two lease periods: only the heartbeat keeps the claim
+    assert manager.store.requeue_expired() == []
+    assert not stale.finish(job_id, "EURUSD", "failed", error="late", owner="host:1:before-restart")
+
+    release.set()
+    job = _wait_for(stale, job_id)
+    manager.shutdown(wait=True)
+    assert job["results"][0]["status"] == "succeeded"
+
+
+@pytest.mark.unit
+def test_reads_do_not_take_the_write_lock(tmp_path):
+    import sqlite3
+
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    job_id = store.create(["EURUSD"])
+    writer = sqlite3.connect(store.path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")  # another process mid-write
+    try:
+        start = time.monotonic()
+        assert store.get(job_id)["status"] == "queued"
+        assert store.pending() == [(job_id, "EURUSD")]
+        assert store.list()[0]["job_id"] == job_id
+        assert time.monotonic() - start < 1
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+
+@pytest.mark.unit
+def test_async_events_match_sync_events(tmp_path):
+    import asyncio
+
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    manager = JobManager(store, workers=1, run_fn=_trace)
+    job_id = manager.submit(["EURUSD", "GBPUSD"])
+
+    async def collect():
+        return [e async for e in manager.aevents(job_id, poll=0.01, timeout=5)]
+
+    events = asyncio.run(collect())
+    manager.shutdown(wait=True)
+    assert [e["event"] for e in events] == ["pair", "pair", "done"]
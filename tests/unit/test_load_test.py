@@ -0,0 +1,54 @@
+# tests/unit/test_load_test.py
+import asyncio
+
+import pytest
+
+import api
+from src.evaluation import load_test
+from src.schemas import Recommendation
+
+
+@pytest.mark.unit
+def test_parse_mix_and_unknown_endpoint():
+    assert load_test.parse_mix("run=1,recommendations=4") == {"run": 1.0, "recommendations": 4.0}
+    with pytest.raises(ValueError):
+        load_test.parse_mix("trade=1")
+
+
+@pytest.mark.unit
+def test_percentile_nearest_rank():
+    values = sorted(float(v) for v in range(1, 101))
+    assert load_test.percentile(values, 50) == 50.0
+    assert load_test.percentile(values, 99) == 99.0
+    assert load_test.percentile([], 95) == 0.0
+
+
+@pytest.mark.unit
+def test_saturation_rules():
+    base = {"p99_ms": 100.0, "error_rate": 0.0, "throughput_rps": 20.0, "issued_rate_rps": 20.0}
+    assert not load_test.is_saturated(base, max_p99_ms=500, max_error_rate=0.01)
+    assert load_test.is_saturated({**base, "p99_ms": 900.0}, max_p99_ms=500, max_error_rate=0.01)
+    assert load_test.is_saturated({**base, "error_rate": 0.2}, max_p99_ms=500, max_error_rate=0.01)
+    assert load_test.is_saturated({**base, "throughput_rps": 10.0}, max_p99_ms=500, max_error_rate=0.01)
+
+
+@pytest.mark.unit
+def test_in_process_open_loop_run(monkeypatch):
+    monkeypatch.setattr(
+        api, "safe_run_pipeline_once",
+        lambda pair: Recommendation(pair=pair, stance="AVOID", confidence=0.0),
+    )
+
+    async def _run():
+        async with load_test.make_client(app=api.app) as client:
+            return await load_test.run_load(
+                client, rate=40, duration=0.5, mix={"run": 1, "recommendations": 1},
+                pairs=["EURUSD", "BADPAIR"], arrival="constant", seed=3,
+            )
+
+    report = asyncio.run(_run())
+    assert report["requests"] >= 15
+    assert set(report["endpoints"]) <= {"run", "recommendations"}
+    # invalid pair → 400s are counted as errors
+    assert report["errors"] == report["status_codes"].get("400", 0)
+    assert report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"]
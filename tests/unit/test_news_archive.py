@@ -0,0 +1,138 @@
+# tests/unit/test_news_archive.py
+import gzip
+import os
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from src.evaluation.backtest import archived_sentiment
+from src.tools import news_archive
+
+DAY1 = datetime(2026, 10, 18, 9, 30, tzinfo=timezone.utc)
+DAY2 = datetime(2026, 10, 19, 14, 5, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def archive(monkeypatch, tmp_path):
+    monkeypatch.setattr(news_archive, "ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(news_archive, "ARCHIVE_ENABLED", True)
+    return tmp_path
+
+
+def _entry(title, ts, url=None, text=None):
+    return {"title": title, "url": url or f"https://example.com/{abs(hash(title))}", "timestamp": ts.isoformat(),
+            "source": "example.com", "text": text}
+
+
+SCORES = {"Euro rallies after ECB": 0.6, "Yen slumps as BoJ holds": -0.4, "Dollar steady": 0.0}
+
+
+@pytest.mark.unit
+def test_currency_tags():
+    assert news_archive.currency_tags("ECB holds, euro slips vs yen") == ["EUR", "JPY"]
+    assert news_archive.currency_tags("EUR/USD climbs") == ["USD", "EUR"]
+    assert news_archive.currency_tags("Europe stocks") == []
+
+
+@pytest.mark.unit
+def test_archive_partitions_by_day_and_skips_duplicates(archive):
+    calls = []
+
+    def scorer(text):
+        calls.append(text)
+        return SCORES.get(text, 0.0)
+
+    entries = [_entry("Euro rallies after ECB", DAY1), _entry("Yen slumps as BoJ holds", DAY2)]
+    assert news_archive.archive_entries(entries, scorer=scorer) == 2
+    assert news_archive.archive_entries(entries, scorer=scorer) == 0
+    assert len(calls) == 2  # each headline scored once
+    assert sorted(os.listdir(archive)) == ["20261018.jsonl.gz", "20261019.jsonl.gz"]
+
+
+@pytest.mark.unit
+def test_query_by_range_and_currency(archive):
+    news_archive.archive_entries(
+        [_entry("Euro rallies after ECB", DAY1), _entry("Yen slumps as BoJ holds", DAY2),
+         _entry("Dollar steady", DAY2 + timedelta(minutes=5), text="DOLLAR STEADY AHEAD OF USD CPI")],
+        scorer=lambda t: SCORES[t],
+    )
+    everything = news_archive.query(DAY1 - timedelta(days=1), DAY2 + timedelta(days=1))
+    assert [r["title"] for r in everything] == ["Euro rallies after ECB", "Yen slumps as BoJ holds", "Dollar steady"]
+
+    assert [r["title"] for r in news_archive.query(DAY1, DAY2 + timedelta(hours=1), currency="jpy")] == \
+        ["Yen slumps as BoJ holds"]
+    assert news_archive.query(DAY1 + timedelta(minutes=1), DAY2) == []
+    assert news_archive.query(DAY1, DAY2 + timedelta(days=1), currency="USD")[0]["sentiment"] == 0.0
+
+
+@pytest.mark.unit
+def test_torn_trailing_member_is_ignored(archive):
+    news_archive.archive_entries([_entry("Euro rallies after ECB", DAY1)], scorer=lambda t: 0.6)
+    path = archive / "20261018.jsonl.gz"
+    with open(path, "ab") as f:
+        f.write(gzip.compress(b'{"key": "x"}\n')[:10])
+    assert len(news_archive.query(DAY1, DAY1 + timedelta(hours=1))) == 1
+
+
+@pytest.mark.unit
+def test_sentiment_series_signs_base_and_quote(archive):
+    news_archive.archive_entries(
+        [_entry("Euro rallies after ECB", DAY1), _entry("Yen slumps as BoJ holds", DAY2)],
+        scorer=lambda t: SCORES[t],
+    )
+    start, end = DAY1.replace(minute=0), DAY2.replace(minute=0) + timedelta(hours=1)
+    eurusd = news_archive.sentiment_series("EURUSD", start, end)
+    usdjpy = news_archive.sentiment_series("USDJPY", start, end)
+
+    assert eurusd[pd.Timestamp("2026-10-18 09:00", tz="UTC")] == pytest.approx(0.6)
+    assert usdjpy[pd.Timestamp("2026-10-19 14:00", tz="UTC")] == pytest.approx(0.4)  # bad yen news → USDJPY up
+    assert eurusd.sum() == pytest.approx(0.6)
+
+    index = pd.date_range(start=start, end=end, freq="1h", inclusive="left")
+    aligned = archived_sentiment({"EURUSD": pd.DataFrame({"Close": 1.0}, index=index)})
+    assert aligned["EURUSD"].shape == (len(index),)
+    assert aligned["EURUSD"].max() == pytest.approx(0.6)
+
+
+@pytest.mark.unit
+def test_torn_member_in_the_middle_does_not_hide_later_entries(archive):
+    news_archive.archive_entries([_entry("Euro rallies after ECB", DAY1)], scorer=lambda t: 0.6)
+    path = archive / "20261018.jsonl.gz"
+    with open(path, "ab") as f:
+        f.write(gzip.compress(b'{"key": "torn", "ts": "x"}\n' * 50)[:25])  # writer killed mid-append
+    news_archive._seen.clear()
+    news_archive.archive_entries([_entry("Yen slumps as BoJ holds", DAY1 + timedelta(minutes=1))],
+                                 scorer=lambda t: -0.4)
+
+    news_archive._partitions.clear()
+    titles = [r["title"] for r in news_archive.query(DAY1, DAY1 + timedelta(hours=1))]
+    assert titles == ["Euro rallies after ECB", "Yen slumps as BoJ holds"]
+
+
+@pytest.mark.unit
+def test_duplicates_from_another_process_are_counted_once(archive):
+    news_archive.archive_entries([_entry("Euro rallies after ECB", DAY1)], scorer=lambda t: 0.6)
+    path = archive / "20261018.jsonl.gz"
+    with gzip.open(path, "rb") as f:
+        record = f.read()
+    with open(path, "ab") as f:  # a second worker that raced us appended the same headline
+        f.write(gzip.compress(record))
+
+    assert len(news_archive.query(DAY1, DAY1 + timedelta(hours=1))) == 1
+    series = news_archive.sentiment_series("EURUSD", DAY1.replace(minute=0), DAY1.replace(minute=0) + timedelta(hours=1))
+    assert series.sum() == pytest.approx(0.6)
+
+
+@pytest.mark.unit
+def test_scoring_runs_outside_the_lock_and_seen_is_bounded(archive, monkeypatch):
+    def scorer(text):
+        assert not news_archive._lock.locked()
+        return 0.1
+
+    monkeypatch.setattr(news_archive, "SEEN_PARTITIONS", 3)
+    news_archive._seen.clear()
+    entries = [_entry(f"Dollar steady {i}", DAY1 - timedelta(days=i)) for i in range(6)]
+    assert news_archive.archive_entries(entries, scorer=scorer) == 6
+    assert len(news_archive._seen) == 3
+    assert news_archive.archive_entries(entries, scorer=scorer) == 0  # evicted days are re-read from disk
@@ -0,0 +1,101 @@
+# tests/unit/test_news_dedup.py
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from src.agents import strategy_agent
+from src.agents.strategy_agent import simple_strategy
+from src.schemas import Candle, NewsItem
+from src.tools import news_dedup
+from src.tools.news_dedup import cluster_titles, title_tokens
+
+TITLES = [
+    "EUR/USD rises to 1.0850 as ECB holds rates",
+    "Gold price slips as US dollar strengthens",
+    "EUR/USD climbs to 1.0850 as ECB holds rates steady",
+    "USD/JPY jumps above 150.00 after BoJ decision",
+    "Gold slips as the US dollar strengthens",
+    "USD/JPY jumps above 150 after BoJ decision",
+    "Fed's Powell says rates will stay higher for longer",
+    "Powell: rates to stay higher for longer",
+    "GBP/USD falls to 1.2650 as BoE cuts rates",
+    "Oil price slips as demand worries mount",
+]
+
+
+@pytest.mark.unit
+def test_title_tokens_normalize():
+    assert title_tokens("USD/JPY jumps above 150.00") == title_tokens("usd/jpy JUMPS above 150")
+    assert "the" not in title_tokens("Gold slips as the dollar strengthens")
+
+
+@pytest.mark.unit
+def test_clusters_cross_feed_rewrites_only():
+    assert cluster_titles(TITLES) == [[0, 2], [1, 4], [3, 5], [6, 7], [8], [9]]
+    assert cluster_titles(["Same title", "Same title", ""]) == [[0, 1], [2]]
+
+
+@pytest.mark.unit
+def test_clustering_only_compares_lsh_candidates(monkeypatch):
+    comparisons = []
+    real_jaccard = news_dedup.jaccard
+    monkeypatch.setattr(news_dedup, "jaccard", lambda a, b: comparisons.append(1) or real_jaccard(a, b))
+
+    rng = random.Random(7)
+    words = [f"w{i}" for i in range(5000)]
+    titles = [" ".join(rng.sample(words, 8)) for _ in range(4000)]
+    clusters = cluster_titles(titles)
+    assert len(clusters) == len(titles)        # random titles are all distinct stories
+    assert len(comparisons) < 5 * len(titles)  # all-pairs would be 8M Jaccard checks
+
+
+def _candles():
+    t = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    return [Candle(ts=t, open=1.1, high=1.1, low=1.1, close=1.1),
+            Candle(ts=t, open=1.1, high=1.1, low=1.1, close=1.101)]
+
+
+def _news(*pairs):
+    t = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    return [NewsItem(title=title, source=source, url=f"https://{source}/{i}", timestamp=t)
+            for i, (title, source) in enumerate(pairs)]
+
+
+@pytest.mark.unit
+def test_strategy_scores_each_story_once(monkeypatch):
+    scores = {"Euro surges on strong growth data": 0.8, "Euro surges on strong growth data, ECB upbeat": 0.8,
+              "Euro surges on strong eurozone growth data": 0.8, "Dollar weakens ahead of payrolls": -0.4}
+    monkeypatch.setattr(strategy_agent, "_headline_sentiment", lambda text: scores[text])
+    news = _news(
+        ("Euro surges on strong growth data", "fxstreet.com"),
+        ("Euro surges on strong growth data, ECB upbeat", "investing.com"),
+        ("Euro surges on strong eurozone growth data", "dailyfx.com"),
+        ("Dollar weakens ahead of payrolls", "fxstreet.com"),
+    )
+
+    rec = simple_strategy("EURUSD", _candles(), news)
+    assert [n.source for n in rec.news] == ["fxstreet.com", "fxstreet.com"]
+    assert "🧠 Average news sentiment = +0.20" in rec.rationale       # (0.8 - 0.4) / 2, not (2.4 - 0.4) / 4
+    assert any("+2 similar" in r for r in rec.rationale)
+
+    monkeypatch.setattr(news_dedup, "NEWS_DEDUP", False)
+    rec = simple_strategy("EURUSD", _candles(), news)
+    assert len(rec.news) == 4
+    assert "🧠 Average news sentiment = +0.50" in rec.rationale
+
+
+@pytest.mark.unit
+def test_strategy_scores_only_the_first_ten_items(monkeypatch):
+    scored = []
+    monkeypatch.setattr(strategy_agent, "_headline_sentiment", lambda text: scored.append(text) or 0.0)
+    # 10 copies of one story, then 5 distinct ones further down the feed
+    news = _news(*[("Euro surges on strong growth data", f"feed{i}.com") for i in range(10)],
+                 *[(f"Unrelated story number {i} about oil", "late.com") for i in range(5)])
+
+    for dedup in (True, False):
+        scored.clear()
+        monkeypatch.setattr(news_dedup, "NEWS_DEDUP", dedup)
+        rec = simple_strategy("EURUSD", _candles(), news)
+        assert scored == ["Euro surges on strong growth data"]  # the later items are outside the window
+        assert [n.source for n in rec.news] == ["feed0.com"]
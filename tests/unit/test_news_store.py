@@ -0,0 +1,104 @@
+# tests/unit/test_news_store.py
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from src.agents.strategy_agent import simple_strategy
+from src.cache import SQLiteRecommendationCache
+from src.schemas import Candle, NewsItem, Recommendation
+from src.tools.news_store import NewsStore, NEWS_STORE
+
+RAW = {"title": "ECB holds rates", "url": "https://example.com/ecb", "timestamp": "2026-10-19T08:00:00+00:00",
+       "source": "FXStreet"}
+
+
+@pytest.mark.unit
+def test_same_url_returns_same_object_until_the_feed_edits_it():
+    store = NewsStore()
+    first = store.from_dict(RAW)
+    assert store.from_dict(dict(RAW)) is first
+    assert first.timestamp == datetime(2026, 10, 19, 8, tzinfo=timezone.utc)
+    assert (store.hits, store.misses) == (1, 1)
+
+    edited = store.from_dict({**RAW, "title": "ECB holds rates, signals cut"})  # same URL
+    assert edited is not first and edited.title == "ECB holds rates, signals cut"
+    assert store.from_dict({**RAW, "title": "ECB holds rates, signals cut"}) is edited  # replaced in the store
+    assert len(store) == 1
+
+    moved = store.from_dict({**RAW, "title": edited.title, "timestamp": "2026-10-19T09:00:00+00:00"})
+    assert moved is not edited and moved.timestamp.hour == 9
+
+
+@pytest.mark.unit
+def test_title_used_when_url_missing():
+    store = NewsStore()
+    a = store.from_dict({"title": "USD slips", "timestamp": RAW["timestamp"]})
+    b = store.from_dict({"title": "USD slips", "timestamp": RAW["timestamp"]})
+    assert a is b
+    assert store.from_dict({"title": "usd slips ", "timestamp": RAW["timestamp"]}).title == "usd slips "
+
+
+@pytest.mark.unit
+def test_store_is_bounded_lru():
+    store = NewsStore(max_items=2)
+    a = store.from_dict({**RAW, "url": "u1"})
+    store.from_dict({**RAW, "url": "u2"})
+    store.from_dict({**RAW, "url": "u1"})  # refresh u1
+    store.from_dict({**RAW, "url": "u3"})  # evicts u2
+    assert len(store) == 2
+    assert store.from_dict({**RAW, "url": "u1"}) is a
+
+
+@pytest.mark.unit
+def test_news_items_are_immutable():
+    item = NewsStore().from_dict(RAW)
+    with pytest.raises(ValidationError):
+        item.title = "changed"
+
+
+@pytest.mark.unit
+def test_recommendations_share_news_objects():
+    NEWS_STORE.clear()
+    item = NEWS_STORE.from_dict(RAW)
+    now = datetime.now(timezone.utc)
+    candles = [Candle(ts=now, open=1, high=1, low=1, close=1.0), Candle(ts=now, open=1, high=1, low=1, close=1.01)]
+    recs = [simple_strategy(pair, candles, [NEWS_STORE.from_dict(RAW)]) for pair in ("EURUSD", "EURGBP")]
+    assert all(rec.news[0] is item for rec in recs)
+
+
+@pytest.mark.unit
+def test_sqlite_decode_interns_news(tmp_path):
+    cache = SQLiteRecommendationCache(str(tmp_path / "recs.sqlite"))
+    news = [NewsItem(title="Shared headline", url="https://example.com/shared", timestamp=datetime.now(timezone.utc))]
+    for pair in ("EURUSD", "GBPUSD"):
+        cache.set(pair, Recommendation(pair=pair, stance="BUY", news=news))
+    cache._decoded.clear()  # force decoding from the stored JSON
+
+    _, items = cache.snapshot()
+    assert items["EURUSD"].news[0] is items["GBPUSD"].news[0]
+
+
+@pytest.mark.unit
+def test_intern_keeps_changed_content(tmp_path):
+    store = NewsStore()
+    ts = datetime(2026, 10, 19, 8, tzinfo=timezone.utc)
+    original = store.intern(NewsItem(title="ECB holds rates", url="https://example.com/ecb", timestamp=ts))
+    same = NewsItem(title="ECB holds rates", url="https://example.com/ecb", timestamp=ts)
+    edited = NewsItem(title="ECB holds rates", url="https://example.com/ecb", timestamp=ts, source="Reuters")
+
+    assert store.intern(same) is original
+    assert store.intern(edited) is edited and edited.source == "Reuters"
+    assert store.intern(same) is original  # the canonical object was not replaced either
+
+
+@pytest.mark.unit
+def test_edited_headline_changes_the_input_fingerprint():
+    from src.tools.strategy_tools import input_fingerprint
+
+    store = NewsStore()
+    candles = [Candle(ts=datetime(2026, 10, 19, 8, tzinfo=timezone.utc), open=1.0, high=1.0, low=1.0, close=1.0)]
+    before = input_fingerprint("EURUSD", candles, [store.from_dict(RAW)])
+    assert input_fingerprint("EURUSD", candles, [store.from_dict(dict(RAW))]) == before
+    after = input_fingerprint("EURUSD", candles, [store.from_dict({**RAW, "title": "ECB signals cut"})])
+    assert after != before
@@ -0,0 +1,113 @@
+# tests/unit/test_profiling.py
+import pytest
+from fastapi.testclient import TestClient
+
+from src.observability import profiling
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "_window_until", 0.0)
+    monkeypatch.delenv("PROFILE_PIPELINE", raising=False)
+    return tmp_path
+
+
+def _busy_work():
+    return sum(i * i for i in range(20000))
+
+
+@pytest.mark.unit
+def test_profile_run_disabled_by_default(profile_dir):
+    with profiling.profile_run("noop") as prof:
+        _busy_work()
+    assert prof is None
+    assert profiling.list_profiles() == []
+
+
+@pytest.mark.unit
+def test_forced_profile_is_saved_and_readable(profile_dir):
+    with profiling.profile_run("pipeline_EURUSD", force=True) as prof:
+        _busy_work()
+
+    assert prof is not None
+    stored = profiling.list_profiles()
+    assert [p["profile_id"] for p in stored] == [prof["profile_id"]]
+    assert "_busy_work" in profiling.profile_text(prof["profile_id"])
+
+
+@pytest.mark.unit
+def test_profile_window_enables_capture(profile_dir):
+    profiling.start_profile_window(30)
+    with profiling.profile_run("windowed") as prof:
+        _busy_work()
+    assert prof is not None
+
+
+@pytest.mark.unit
+def test_profile_path_rejects_traversal(profile_dir):
+    assert profiling.profile_path("../../etc/passwd") is None
+
+
+@pytest.mark.unit
+def test_admin_profile_endpoints_require_token(profile_dir, monkeypatch):
+    import api
+
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    client = TestClient(api.app)
+
+    assert client.get("/api/admin/profiles").status_code == 403
+    assert client.get("/api/run", params={"pair": "EURUSD", "profile": 1}).status_code == 403
+
+    resp = client.get("/api/admin/profiles", headers={"X-Admin-Token": "s3cret"})
+    assert resp.status_code == 200
+    assert resp.json() == []
+
+
+@pytest.mark.unit
+def test_forced_profile_while_busy_raises_and_nested_runs_share_the_capture(profile_dir):
+    with profiling.profile_run("outer", force=True) as outer:
+        with profiling.profile_run("pipeline_EURUSD") as inner:
+            assert inner is outer  # e.g. graph.run_pipeline_once inside the API's forced profile
+
+    profiling._capture_lock.acquire()  # another request is being profiled
+    try:
+        with pytest.raises(profiling.ProfilerBusy):
+            with profiling.profile_run("forced", force=True):
+                pass
+        profiling.start_profile_window(30)
+        with profiling.profile_run("windowed") as prof:
+            assert prof is None  # unforced runs just go unprofiled
+    finally:
+        profiling._capture_lock.release()
+
+
+@pytest.mark.unit
+def test_forced_api_profile_lands_on_the_trace(profile_dir, monkeypatch):
+    import api
+    from src import graph
+    from src.cache import MemoryRecommendationCache
+    from src.schemas import Recommendation
+
+    traces = []
+
+    def steps(pair, dry_run_email, profile_id=None, recorder=None):
+        traces.append({"pair": pair, "profile_id": profile_id})
+        return {"status": "success", "recommendation": Recommendation(pair=pair, stance="BUY", confidence=0.5)}
+
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(api, "LATEST_RECOMMENDATIONS", MemoryRecommendationCache())
+    monkeypatch.setattr(graph, "_run_pipeline_steps", steps)
+    client = TestClient(api.app)
+    headers = {"X-Admin-Token": "s3cret"}
+
+    resp = client.get("/api/run", params={"pair": "EURUSD", "profile": 1}, headers=headers)
+    assert resp.status_code == 200
+    assert traces[-1]["profile_id"] == resp.headers["X-Profile-Id"]
+
+    profiling._capture_lock.acquire()
+    try:
+        resp = client.get("/api/run", params={"pair": "EURUSD", "profile": 1}, headers=headers)
+    finally:
+        profiling._capture_lock.release()
+    assert resp.status_code == 409
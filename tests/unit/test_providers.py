@@ -0,0 +1,96 @@
+# tests/unit/test_providers.py
+import os
+import time
+
+import pytest
+
+from src.tools import mcp, news_archive, news_tool, providers
+from src.tools.email_tool import send_strategy_email
+from src.tools.stub_servers import RSSStubServer, SMTPSinkServer, start_in_thread
+from src.tools.yfinance_tool import fetch_forex_candles
+from src.schemas import Candle
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "..", "performance", "fixtures")
+
+
+@pytest.fixture
+def local_market(monkeypatch, tmp_path):
+    monkeypatch.setenv("MARKET_DATA_PROVIDER", "local")
+    monkeypatch.setenv("LOCAL_CANDLE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.unit
+def test_local_provider_synthesizes_missing_pairs(local_market, monkeypatch):
+    monkeypatch.setenv("LOCAL_CANDLE_BARS", "50")
+    candles = fetch_forex_candles("GBPJPY", days=3)
+    assert len(candles) == 50
+    assert all(isinstance(c, Candle) for c in candles)
+    assert candles[-1].high >= candles[-1].low
+    # deterministic per pair
+    assert fetch_forex_candles("GBPJPY", days=3)[0].close == candles[0].close
+
+
+@pytest.mark.unit
+def test_local_provider_reads_recorded_file(local_market):
+    with open(os.path.join(FIXTURE_DIR, "candles_EURUSD_1h.csv"), "r", encoding="utf-8") as src:
+        (local_market / "EURUSD_1h.csv").write_text(src.read(), encoding="utf-8")
+
+    candles = fetch_forex_candles("EURUSD", days=3)
+    assert len(candles) == 72
+    assert candles[-1].close == pytest.approx(1.08986, abs=1e-5)
+
+
+@pytest.mark.unit
+def test_local_provider_latency(local_market, monkeypatch):
+    monkeypatch.setenv("LOCAL_PROVIDER_LATENCY_MS", "50")
+    start = time.perf_counter()
+    fetch_forex_candles("EURUSD", days=1)
+    assert time.perf_counter() - start >= 0.05
+
+
+@pytest.mark.unit
+def test_unknown_provider_raises(monkeypatch):
+    monkeypatch.setenv("MARKET_DATA_PROVIDER", "bloomberg")
+    with pytest.raises(ValueError):
+        fetch_forex_candles("EURUSD", days=1)
+
+
+@pytest.mark.unit
+def test_news_from_local_rss_stub(monkeypatch, tmp_path):
+    monkeypatch.setattr(mcp, "TRACE_DIR", str(tmp_path))
+    monkeypatch.setattr(news_archive, "ARCHIVE_DIR", str(tmp_path / "news_archive"))
+    server = RSSStubServer(("127.0.0.1", 0), FIXTURE_DIR, entries=40)
+    start_in_thread(server)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/forex_news.xml"
+        monkeypatch.setattr(news_tool, "RSS_SOURCES", [url])
+        result = news_tool.fetch_forex_news("EUR")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert result["status"] == "success"
+    assert result["data"]
+    assert all(item["source"].startswith("127.0.0.1") for item in result["data"])
+
+
+@pytest.mark.unit
+def test_email_to_local_smtp_sink(monkeypatch, tmp_path):
+    monkeypatch.setattr(mcp, "TRACE_DIR", str(tmp_path))
+    server = SMTPSinkServer(("127.0.0.1", 0), out_dir=str(tmp_path / "mail"))
+    start_in_thread(server)
+    try:
+        monkeypatch.setenv("SMTP_HOST", "127.0.0.1")
+        monkeypatch.setenv("SMTP_PORT", str(server.server_address[1]))
+        monkeypatch.setenv("SMTP_STARTTLS", "False")
+        monkeypatch.setenv("SMTP_USER", "sink")
+        monkeypatch.setenv("SMTP_PASS", "sink")
+        result = send_strategy_email("FX Test", "Body", recipient="desk@example.com", dry_run=False)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert result["data"]["status"] == "sent"
+    assert server.received == 1
+    assert len(os.listdir(tmp_path / "mail")) == 1
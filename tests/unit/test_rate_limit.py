@@ -0,0 +1,109 @@
+# tests/unit/test_rate_limit.py
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from src.guardrails import pipeline_safety
+from src.tools import news_tool, rate_limit
+from src.tools.rate_limit import RateLimiter, RateLimitTimeout, parse_limits
+
+
+@pytest.mark.unit
+def test_parse_limits():
+    assert parse_limits("yfinance=2:5, WWW.FXSTREET.COM=0.5:2,*=10") == {
+        "yfinance": (2.0, 5.0), "www.fxstreet.com": (0.5, 2.0), "*": (10.0, 10.0)}
+    with pytest.raises(ValueError):
+        parse_limits("yfinance=0:5")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("backend", ["memory", "file"])
+def test_burst_then_queue(backend, tmp_path):
+    limiter = RateLimiter({"host": (20.0, 3.0)}, backend=backend, directory=str(tmp_path))
+    start = time.perf_counter()
+    waits = [limiter.acquire("host") for _ in range(6)]
+    elapsed = time.perf_counter() - start
+
+    assert waits[:3] == [0.0, 0.0, 0.0]              # burst
+    assert all(w > 0 for w in waits[3:])             # then one token every 50 ms
+    assert elapsed == pytest.approx(0.15, abs=0.06)
+    assert limiter.stats["host"]["calls"] == 6
+    assert limiter.acquire("unlisted") == 0.0        # no rule, no "*"
+
+
+@pytest.mark.unit
+def test_deadline_raises_without_taking_tokens(tmp_path):
+    limiter = RateLimiter({"host": (1.0, 1.0)}, backend="memory")
+    limiter.acquire("host")
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("host", max_wait=0.1)
+    # the failed call did not join the queue: the next caller waits ~1s, not ~2s
+    assert limiter.acquire("host", max_wait=1.5) <= 1.0
+    assert limiter.stats["host"]["timeouts"] == 1
+
+
+@pytest.mark.unit
+def test_threads_are_queued_fairly():
+    limiter = RateLimiter({"host": (50.0, 1.0)}, backend="memory")
+    done = []
+
+    def worker():
+        limiter.acquire("host")
+        done.append(time.perf_counter())
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(done) - start == pytest.approx(9 / 50, abs=0.06)
+
+
+def _acquire_many(directory, n, out):
+    limiter = RateLimiter({"host": (40.0, 1.0)}, backend="file", directory=directory)
+    for _ in range(n):
+        limiter.acquire("host")
+    out.put(time.time())
+
+
+@pytest.mark.unit
+def test_file_backend_is_shared_across_processes(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    out = ctx.Queue()
+    start = time.time()
+    procs = [ctx.Process(target=_acquire_many, args=(str(tmp_path), 6, out)) for _ in range(2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(10)
+    finished = max(out.get(timeout=5) for _ in procs)
+    # 12 tokens at 40/s with burst 1: ≥ 11/40 s in total, not 5/40 s per process
+    assert finished - start >= 11 / 40 - 0.02
+
+
+@pytest.mark.unit
+def test_feeds_are_limited_per_host(monkeypatch):
+    import feedparser
+
+    hosts = []
+    monkeypatch.setattr(rate_limit.RATE_LIMITER, "acquire", lambda host, cost=1.0, max_wait=None: hosts.append(host))
+    monkeypatch.setattr(feedparser, "parse", lambda url: type("F", (), {"bozo": True, "entries": []})())
+    news_tool._parse_feed("https://www.fxstreet.com/rss/news")
+    assert hosts == ["www.fxstreet.com"]
+
+
+@pytest.mark.unit
+def test_rate_limited_runs_are_not_retried(monkeypatch):
+    calls = []
+
+    def limited(pair, dry_run_email=True):
+        calls.append(pair)
+        return {"status": "error", "error_type": "RateLimitTimeout", "error": "queue full"}
+
+    monkeypatch.setattr(pipeline_safety, "run_pipeline_once", limited)
+    rec = pipeline_safety.safe_run_pipeline_once("EURUSD", retries=3, delay=0)
+    assert rec.stance == "AVOID"
+    assert calls == ["EURUSD"]
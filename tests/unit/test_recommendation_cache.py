@@ -0,0 +1,190 @@
+# tests/unit/test_recommendation_cache.py
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from src.cache import (
+    MemoryRecommendationCache,
+    SQLiteRecommendationCache,
+    build_recommendation_cache,
+)
+from src.schemas import Recommendation
+
+
+def _rec(pair, stance="BUY", confidence=0.7):
+    return Recommendation(pair=pair, stance=stance, confidence=confidence, rationale=["test"])
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    return build_recommendation_cache(request.param, path=str(tmp_path / "recs.sqlite"))
+
+
+@pytest.mark.unit
+def test_set_get_and_versions(cache):
+    assert cache.get("EURUSD") is None
+    assert cache.version() == 0
+
+    v1 = cache.set("EURUSD", _rec("EURUSD"))
+    cache["GBPUSD"] = _rec("GBPUSD", "SELL")
+
+    assert cache["EURUSD"].stance == "BUY"
+    assert cache.version("EURUSD") == v1
+    assert cache.version() == v1 + 1
+    version, items = cache.snapshot()
+    assert version == cache.version()
+    assert sorted(items) == ["EURUSD", "GBPUSD"]
+    assert len(cache) == 2 and "GBPUSD" in cache
+
+
+@pytest.mark.unit
+def test_run_lease_is_exclusive(cache):
+    with cache.run_lease("EURUSD") as first:
+        with cache.run_lease("EURUSD") as second:
+            assert first is True
+            assert second is False
+    with cache.run_lease("EURUSD") as again:
+        assert again is True
+
+
+@pytest.mark.unit
+def test_expired_lease_can_be_taken_over(cache):
+    assert cache.try_acquire_lease("EURUSD", ttl=0.01) is not None
+    time.sleep(0.05)
+    assert cache.try_acquire_lease("EURUSD", ttl=10) is not None
+
+
+@pytest.mark.unit
+def test_wait_for_update_returns_other_writers_result(cache):
+    since = cache.version("EURUSD")
+    threading.Timer(0.05, lambda: cache.set("EURUSD", _rec("EURUSD", "SELL"))).start()
+    rec = cache.wait_for_update("EURUSD", since, timeout=2)
+    assert rec is not None and rec.stance == "SELL"
+    assert cache.wait_for_update("EURUSD", cache.version("EURUSD"), timeout=0.1) is None
+
+
+@pytest.mark.unit
+def test_sqlite_instances_share_state(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    worker_a, worker_b = SQLiteRecommendationCache(path), SQLiteRecommendationCache(path)
+
+    worker_a.set("EURUSD", _rec("EURUSD"))
+    assert worker_b.get("EURUSD").stance == "BUY"
+    worker_b.set("EURUSD", _rec("EURUSD", "AVOID", 0.0))
+    assert worker_a.get("EURUSD").stance == "AVOID"
+    assert worker_a.version() == worker_b.version() == 2
+    assert worker_b.try_acquire_lease("USDJPY", ttl=10) is not None
+    assert worker_a.try_acquire_lease("USDJPY", ttl=10) is None
+
+
+def _write_many(path, pair, n):
+    cache = SQLiteRecommendationCache(path)
+    for i in range(n):
+        cache.set(pair, _rec(pair, confidence=i / n))
+
+
+@pytest.mark.unit
+def test_sqlite_version_counter_is_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "procs.sqlite")
+    SQLiteRecommendationCache(path).close()  # never carry an open SQLite connection across fork()
+    procs = [multiprocessing.Process(target=_write_many, args=(path, p, 25)) for p in ("EURUSD", "GBPUSD", "USDJPY")]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+
+    assert all(p.exitcode == 0 for p in procs)
+    assert SQLiteRecommendationCache(path).version() == 75
+
+
+@pytest.mark.unit
+def test_wait_for_update_returns_when_the_owner_gives_up(cache):
+    token = cache.try_acquire_lease("EURUSD", ttl=30)
+    since = cache.version("EURUSD")
+    threading.Timer(0.1, cache.release_lease, args=("EURUSD", token)).start()  # owner shed, no result
+
+    start = time.monotonic()
+    assert cache.wait_for_update("EURUSD", since, timeout=30, follow_lease=True) is None
+    assert time.monotonic() - start < 5
+    assert not cache.lease_held("EURUSD")
+
+
+@pytest.mark.unit
+def test_unknown_backend_raises():
+    with pytest.raises(ValueError):
+        build_recommendation_cache("redis")
+    assert isinstance(build_recommendation_cache("memory"), MemoryRecommendationCache)
+
+
+@pytest.mark.unit
+def test_api_deduplicates_concurrent_runs(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+    import api
+
+    calls = []
+
+    def slow_pipeline(pair):
+        calls.append(pair)
+        time.sleep(0.3)
+        return _rec(pair)
+
+    monkeypatch.setattr(api, "LATEST_RECOMMENDATIONS", SQLiteRecommendationCache(str(tmp_path / "api.sqlite")))
+    monkeypatch.setattr(api, "safe_run_pipeline_once", slow_pipeline)
+    client = TestClient(api.app)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client.get("/api/run", params={"pair": "EURUSD"})))
+        for _ in range(3)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["EURUSD"]
+    assert [r.status_code for r in results] == [200, 200, 200]
+    assert client.get("/api/recommendations").json()[0]["pair"] == "EURUSD"
+
+
+@pytest.mark.unit
+def test_base_cache_is_abstract():
+    from src.cache import RecommendationCache
+
+    with pytest.raises(TypeError):
+        RecommendationCache()
+
+
+@pytest.mark.unit
+def test_api_follower_takes_the_lease_when_the_owner_gives_up(monkeypatch):
+    from fastapi.testclient import TestClient
+    import api
+
+    cache = MemoryRecommendationCache()
+    held = []
+
+    def pipeline(pair):
+        held.append(cache.lease_held(pair))
+        return _rec(pair)
+
+    monkeypatch.setattr(api, "LATEST_RECOMMENDATIONS", cache)
+    monkeypatch.setattr(api, "safe_run_pipeline_once", pipeline)
+    token = cache.try_acquire_lease("EURUSD", ttl=30)  # another worker's run, which will fail
+    threading.Timer(0.1, cache.release_lease, args=("EURUSD", token)).start()
+
+    response = TestClient(api.app).get("/api/run", params={"pair": "EURUSD"})
+    assert response.status_code == 200
+    assert held == [True]  # ran under its own lease, not unguarded
+    assert not cache.lease_held("EURUSD")
+
+
+@pytest.mark.unit
+def test_count_does_not_decode_rows(cache, monkeypatch):
+    cache.set("EURUSD", _rec("EURUSD"))
+    cache.set("GBPUSD", _rec("GBPUSD"))
+    monkeypatch.setattr(cache, "snapshot", lambda: pytest.fail("count() must not build a snapshot"))
+    if isinstance(cache, SQLiteRecommendationCache):
+        monkeypatch.setattr(cache, "_decode", lambda *a: pytest.fail("count() must not decode rows"))
+    assert cache.count() == len(cache) == 2
@@ -0,0 +1,171 @@
+# tests/unit/test_scheduler.py
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.agents import strategy_agent
+from src.scheduler import CronSchedule, Scheduler, _acquire_instance_lock, parse_schedules
+from src.tools import news_tool, yfinance_tool
+
+T0 = datetime(2026, 10, 19, 10, 7, 30, tzinfo=timezone.utc)  # a Monday
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("expr, expected", [
+    ("*/15 * * * *", datetime(2026, 10, 19, 10, 15)),
+    ("0 * * * *", datetime(2026, 10, 19, 11, 0)),
+    ("30 9 * * 1-5", datetime(2026, 10, 20, 9, 30)),
+    ("0 12 * * 7", datetime(2026, 10, 25, 12, 0)),       # 7 = Sunday
+    ("0 0 1 * *", datetime(2026, 11, 1, 0, 0)),
+    ("0 0 29 2 *", datetime(2028, 2, 29, 0, 0)),
+    ("0 0 13 * 5", datetime(2026, 10, 23, 0, 0)),        # day-of-month OR day-of-week
+    ("@daily", datetime(2026, 10, 20, 0, 0)),
+])
+def test_cron_next_after(expr, expected):
+    assert CronSchedule(expr).next_after(T0) == expected.replace(tzinfo=timezone.utc)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *", "0 0 31 2 *"])
+def test_cron_rejects_invalid(expr):
+    with pytest.raises(ValueError):
+        CronSchedule(expr).next_after(T0)
+
+
+@pytest.mark.unit
+def test_parse_schedules_with_default():
+    schedules = dict(parse_schedules("eurusd,GBPUSD=*/5 * * * *;USDJPY=@hourly", ["EURUSD", "AUDUSD"], "0 0 * * *"))
+    assert schedules["EURUSD"].expr == schedules["GBPUSD"].expr == "*/5 * * * *"
+    assert schedules["USDJPY"].expr == "@hourly"
+    assert schedules["AUDUSD"].expr == "0 0 * * *"
+    with pytest.raises(ValueError):
+        parse_schedules("XAUUSD=* * * * *", [])
+
+
+class _BlockingRun:
+    """run_fn stand-in that blocks until released, recording calls."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def __call__(self, pair, dry_run_email=True):
+        self.calls.append(pair)
+        self.release.wait(5)
+        return {"status": "success"}
+
+
+@pytest.mark.unit
+def test_overlapping_slots_are_skipped_and_metrics_recorded(tmp_path):
+    run = _BlockingRun()
+    status_path = tmp_path / "status.json"
+    scheduler = Scheduler([("EURUSD", CronSchedule("* * * * *"))], run_fn=run, status_path=str(status_path))
+    base = datetime.now(timezone.utc) - timedelta(minutes=5)
+    scheduler.start(now=base)
+
+    assert scheduler.tick(now=base) == []                                   # nothing due yet
+    assert scheduler.tick(now=base + timedelta(seconds=61)) == ["EURUSD"]   # next minute's slot
+    assert scheduler.tick(now=base + timedelta(seconds=121)) == []          # following slot overlaps
+    run.release.set()
+    scheduler.shutdown(timeout=5)
+
+    snap = json.loads(status_path.read_text())["pairs"]["EURUSD"]
+    assert snap["runs"] == 1
+    assert snap["overlaps_skipped"] == 1
+    assert snap["last_status"] == "success"
+    assert snap["last_drift_s"] > 60           # the slot was ~4 minutes before the actual start
+    assert run.calls == ["EURUSD"]
+
+
+@pytest.mark.unit
+def test_missed_slots_are_coalesced():
+    scheduler = Scheduler([("EURUSD", CronSchedule("* * * * *"))], run_fn=lambda p, dry_run_email: {"status": "success"},
+                          status_path=None)
+    scheduler.start(now=T0)
+    assert scheduler.tick(now=T0 + timedelta(minutes=10)) == ["EURUSD"]
+    assert scheduler.seconds_until_next(now=T0 + timedelta(minutes=10)) == pytest.approx(30)
+    scheduler.shutdown(timeout=5)
+
+
+@pytest.mark.unit
+def test_shutdown_waits_for_in_flight_runs():
+    finished = threading.Event()
+
+    def slow(pair, dry_run_email=True):
+        time.sleep(0.2)
+        finished.set()
+        return {"status": "success"}
+
+    scheduler = Scheduler([("EURUSD", CronSchedule("* * * * *"))], run_fn=slow, status_path=None)
+    scheduler.start(now=T0)
+    scheduler.tick(now=T0 + timedelta(minutes=1))
+    scheduler.shutdown(timeout=5)
+    assert finished.is_set()
+    assert scheduler.tick(now=T0 + timedelta(minutes=5)) == []   # stopped: nothing dispatched
+
+
+@pytest.mark.unit
+def test_run_forever_stops_on_signal_request():
+    scheduler = Scheduler([("EURUSD", CronSchedule("0 0 1 1 *"))], run_fn=lambda p, dry_run_email: {}, status_path=None)
+    thread = threading.Thread(target=scheduler.run_forever, daemon=True)
+    thread.start()
+    time.sleep(0.05)
+    scheduler.stop()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+
+
+@pytest.mark.unit
+def test_single_instance_lock(tmp_path):
+    path = str(tmp_path / "scheduler.lock")
+    handle = _acquire_instance_lock(path)
+    try:
+        with pytest.raises(RuntimeError):
+            _acquire_instance_lock(path)
+    finally:
+        handle.close()
+    _acquire_instance_lock(path).close()
+
+
+@pytest.mark.unit
+def test_feed_cache_reuses_parsed_feed(monkeypatch):
+    import feedparser
+
+    calls = []
+
+    class _Feed:
+        bozo = False
+        entries = [{"title": "x"}]
+
+    monkeypatch.setattr(feedparser, "parse", lambda url: calls.append(url) or _Feed())
+    monkeypatch.setattr(news_tool, "_feeds", {})
+    monkeypatch.setattr(news_tool, "FEED_CACHE_TTL", 60.0)
+    assert news_tool._parse_feed("http://feed") is news_tool._parse_feed("http://feed")
+    assert calls == ["http://feed"]
+
+    monkeypatch.setattr(news_tool, "FEED_CACHE_TTL", 0.0)
+    news_tool._parse_feed("http://feed")
+    assert len(calls) == 2
+
+
+@pytest.mark.unit
+def test_candle_cache(monkeypatch):
+    calls = []
+    monkeypatch.setattr(yfinance_tool, "_fetch_forex_candles", lambda p, i, d: calls.append(p) or ["c"])
+    monkeypatch.setattr(yfinance_tool, "_candles", {})
+    monkeypatch.setattr(yfinance_tool, "CANDLE_CACHE_TTL", 60.0)
+    assert yfinance_tool.fetch_forex_candles("EURUSD", days=3) == ["c"]
+    assert yfinance_tool.fetch_forex_candles("EURUSD=X", days=3) == ["c"]
+    assert calls == ["EURUSD"]
+
+
+@pytest.mark.unit
+def test_headline_sentiment_is_memoized():
+    strategy_agent._headline_sentiment.cache_clear()
+    strategy_agent._headline_sentiment("Euro rallies on strong data")
+    strategy_agent._headline_sentiment("Euro rallies on strong data")
+    info = strategy_agent._headline_sentiment.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
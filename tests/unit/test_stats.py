@@ -0,0 +1,42 @@
+# tests/unit/test_stats.py
+import pytest
+
+from src.observability.stats import ApiStats, RollingLatency
+
+
+@pytest.mark.unit
+def test_rolling_latency_percentiles_over_window():
+    window = RollingLatency(size=100)
+    for ms in range(1, 201):  # only the last 100 samples (101..200 ms) are kept
+        window.add(ms / 1000)
+    p = window.percentiles()
+    assert p["window"] == 100
+    assert p["p50_ms"] == 151.0
+    assert p["p95_ms"] == 196.0
+    assert window.percentiles() is p  # cached until the next sample
+
+
+@pytest.mark.unit
+def test_api_stats_counts_errors_and_runs():
+    stats = ApiStats()
+    stats.record_request("/api/run", 200, 0.1)
+    stats.record_request("/api/run", 500, 0.2)
+    stats.record_request("/api/run", 400, 0.01)
+    stats.record_run("EURUSD", 0.1)
+    stats.record_run("EURUSD", 0.2, success=False)
+
+    snap = stats.snapshot()
+    run = snap["endpoints"]["/api/run"]
+    assert (snap["requests"], snap["errors"]) == (3, 1)
+    assert (run["errors"], run["client_errors"]) == (1, 1)
+    assert run["error_rate"] == pytest.approx(1 / 3, abs=1e-4)
+    assert snap["pairs"]["EURUSD"]["runs"] == 2
+    assert snap["pairs"]["EURUSD"]["failures"] == 1
+    assert snap["pairs"]["EURUSD"]["last_run_age_s"] is not None
+
+
+@pytest.mark.unit
+def test_empty_stats_snapshot():
+    snap = ApiStats().snapshot()
+    assert snap["requests"] == 0 and snap["error_rate"] == 0.0
+    assert snap["endpoints"] == {} and snap["pairs"] == {}
@@ -0,0 +1,188 @@
+# tests/unit/test_streaming.py
+import json
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.cache import MemoryRecommendationCache
+from src.indicators import INDICATORS
+from src.streaming import (
+    FileTailSource,
+    SocketSource,
+    StreamingEngine,
+    TickAggregator,
+    open_source,
+    parse_event,
+)
+from src.schemas import Candle, Recommendation
+from src.tools.stub_servers import start_in_thread
+
+T0 = datetime(2026, 10, 1, 12, tzinfo=timezone.utc)
+
+
+def _bar(pair, i, close, minutes=60):
+    return {"pair": pair, "ts": (T0 + timedelta(minutes=minutes * i)).isoformat(), "open": close,
+            "high": close + 0.0005, "low": close - 0.0005, "close": close}
+
+
+def _tick(pair, seconds, price):
+    return {"pair": pair, "ts": (T0 + timedelta(seconds=seconds)).isoformat(), "price": price}
+
+
+def _line(event):
+    return json.dumps(event) + "\n"
+
+
+@pytest.fixture
+def engine():
+    INDICATORS.reset()
+    cache = MemoryRecommendationCache()
+    yield StreamingEngine(cache, interval="1m", news=False)
+    INDICATORS.reset()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.mark.unit
+def test_tick_aggregator_builds_ohlc_and_closes_on_next_bucket():
+    agg = TickAggregator(60)
+    t = T0
+    assert agg.add("EURUSD", t, 1.10) is None
+    assert agg.add("EURUSD", t + timedelta(seconds=10), 1.12) is None
+    assert agg.add("EURUSD", t + timedelta(seconds=20), 1.09) is None
+    assert agg.add("EURUSD", t + timedelta(seconds=50), 1.11, volume=2) is None
+
+    bar = agg.add("EURUSD", t + timedelta(seconds=61), 1.115)
+    assert bar.ts == T0
+    assert (bar.open, bar.high, bar.low, bar.close, bar.volume) == (1.10, 1.12, 1.09, 1.11, 2)
+
+    # late tick for the closed bucket is dropped
+    assert agg.add("EURUSD", t + timedelta(seconds=59), 2.0) is None
+    assert agg.late_ticks == 1
+
+
+@pytest.mark.unit
+def test_quiet_pair_closes_on_stream_clock():
+    agg = TickAggregator(60, grace_s=2)
+    agg.add("EURUSD", T0, 1.10)
+    agg.add("GBPUSD", T0 + timedelta(seconds=30), 1.30)
+    assert agg.close_due() == []           # stream clock is T0+30s, not wall time
+
+    agg.add("GBPUSD", T0 + timedelta(seconds=65), 1.31)   # closes GBPUSD, moves the clock
+    closed = agg.close_due()
+    assert [p for p, _ in closed] == ["EURUSD"]
+
+
+@pytest.mark.unit
+def test_engine_evaluates_only_on_bar_close(engine):
+    assert engine.handle(parse_event(_line(_bar("EURUSD", 0, 1.1000)))) is None   # warming up
+    assert engine.cache.get("EURUSD") is None
+    rec = engine.handle(parse_event(_line(_bar("EURUSD", 1, 1.1010))))
+    assert rec.stance == "BUY"
+    assert engine.cache.get("EURUSD") is rec
+
+    # duplicate / out-of-order bar is ignored
+    assert engine.handle(parse_event(_line(_bar("EURUSD", 1, 1.0)))) is None
+    assert engine.stats["rejected"] == 1
+
+    # ticks: nothing until the minute rolls over
+    version = engine.cache.version("GBPUSD")
+    assert engine.handle(parse_event(_line(_tick("GBPUSD", 5, 1.30)))) is None
+    assert engine.handle(parse_event(_line(_tick("GBPUSD", 30, 1.29)))) is None
+    assert engine.cache.version("GBPUSD") == version
+    assert engine.handle(parse_event(_line(_tick("GBPUSD", 61, 1.29)))) is None     # first bar: warming up
+    rec = engine.handle(parse_event(_line(_tick("GBPUSD", 121, 1.30))))
+    assert rec is not None and engine.cache.get("GBPUSD") is rec
+    assert engine.stats["evaluations"] == 2
+    assert engine.stats["warming_up"] == 2
+
+
+@pytest.mark.unit
+def test_first_bar_does_not_replace_cached_recommendation(engine):
+    good = Recommendation(pair="EURUSD", stance="BUY", confidence=0.8)
+    engine.cache.set("EURUSD", good)
+    engine.handle(parse_event(_line(_bar("EURUSD", 0, 1.1000))))
+    assert engine.cache.get("EURUSD") is good
+
+
+@pytest.mark.unit
+def test_seeded_history_evaluates_from_the_first_bar(monkeypatch):
+    from src.tools import yfinance_tool
+
+    history = [Candle(ts=T0 - timedelta(minutes=m), open=1.1, high=1.1, low=1.1, close=1.1) for m in (2, 1)]
+    monkeypatch.setattr(yfinance_tool, "fetch_forex_candles", lambda pair, interval, days: history)
+    seeded = StreamingEngine(MemoryRecommendationCache(), interval="1m", news=False, seed=True)
+    rec = seeded.handle(parse_event(_line(_bar("EURUSD", 0, 1.1010, minutes=1))))
+    assert rec.stance == "BUY" and seeded.cache.get("EURUSD") is rec
+
+
+@pytest.mark.unit
+def test_engine_rejects_unknown_pairs_and_garbage(engine):
+    assert engine.handle(parse_event(_line({"pair": "XAUUSD", "ts": T0.isoformat(), "close": 1.0}))) is None
+    assert parse_event("not json") is None
+    assert parse_event("") is None
+    assert engine.stats["rejected"] == 1
+
+
+@pytest.mark.unit
+def test_file_tail_source_streams_into_cache(engine, tmp_path):
+    path = tmp_path / "bars.jsonl"
+    path.write_text(_line(_bar("EURUSD", 0, 1.1000)), encoding="utf-8")
+
+    source = FileTailSource(str(path), from_start=True, poll_interval=0.01)
+    thread = threading.Thread(target=engine.run, args=(source,), daemon=True)
+    thread.start()
+    try:
+        assert _wait_for(lambda: engine.stats["bars"] == 1)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(_line(_bar("EURUSD", 1, 1.0990)))
+        assert _wait_for(lambda: engine.stats["bars"] == 2)
+        assert engine.cache.get("EURUSD").stance == "SELL"
+    finally:
+        engine.stop()
+        thread.join(timeout=2)
+    assert not thread.is_alive()
+
+
+class _FeedHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for event in self.server.events:
+            self.wfile.write(_line(event).encode("utf-8"))
+        self.wfile.flush()
+
+
+@pytest.mark.unit
+def test_socket_source_streams_into_cache(engine):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _FeedHandler)
+    server.events = [_bar("USDJPY", 0, 150.0), _bar("USDJPY", 1, 150.2)]
+    start_in_thread(server)
+    source = SocketSource("127.0.0.1", server.server_address[1], reconnect_delay=0.05, poll_interval=0.01)
+    thread = threading.Thread(target=engine.run, args=(source,), daemon=True)
+    thread.start()
+    try:
+        assert _wait_for(lambda: engine.cache.get("USDJPY") is not None and engine.stats["bars"] == 2)
+        assert engine.cache.get("USDJPY").stance == "BUY"
+    finally:
+        engine.stop()
+        thread.join(timeout=2)
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.unit
+def test_open_source_specs(tmp_path):
+    assert isinstance(open_source(f"file:{tmp_path}/x.jsonl"), FileTailSource)
+    src = open_source("tcp://127.0.0.1:9009")
+    assert (src.host, src.port) == ("127.0.0.1", 9009)
+    with pytest.raises(ValueError):
+        open_source("kafka://broker")
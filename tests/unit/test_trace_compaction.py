@@ -0,0 +1,139 @@
+# tests/unit/test_trace_compaction.py
+import gzip
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.evaluation.eval_pipeline import load_traces
+from src.trace_compaction import compact_traces, iter_segment_tool_entries
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+NOW = datetime(2024, 6, 20, 12, 0, tzinfo=timezone.utc)
+OLD = (NOW - timedelta(days=3)).timestamp()
+
+
+def _write_trace(trace_dir, run_id, pair, started, mtime=OLD, **extra):
+    trace = {"run_id": run_id, "pair": pair, "started_at": started.isoformat(), "status": "success",
+             "steps": [], "recommendation": {"pair": pair, "stance": "BUY", "confidence": 0.7}, **extra}
+    path = os.path.join(trace_dir, f"{run_id}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(trace, f, indent=2)
+    os.utime(path, (mtime, mtime))
+    return trace
+
+
+def _write_tool_log(trace_dir, day, entries, mtime=OLD):
+    path = os.path.join(trace_dir, f"{day:%Y%m%d}_traces.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        f.write('{"torn": ')  # half-written last line
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture(params=["jsonl.gz", "parquet"])
+def fmt(request):
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+    return request.param
+
+
+@pytest.mark.unit
+def test_compaction_partitions_and_eval_reads_segments(tmp_path, fmt):
+    trace_dir = str(tmp_path)
+    day1, day2 = NOW - timedelta(days=3), NOW - timedelta(days=2)
+    _write_trace(trace_dir, "a", "EURUSD", day1)
+    _write_trace(trace_dir, "b", "EURUSD", day1 + timedelta(hours=1))
+    _write_trace(trace_dir, "c", "GBPUSD", day2)
+    _write_trace(trace_dir, "fresh", "EURUSD", NOW, mtime=NOW.timestamp())  # too recent to compact
+    _write_tool_log(trace_dir, day1, [{"timestamp": day1.isoformat(), "tool": "fetch", "success": True}])
+    _write_tool_log(trace_dir, NOW, [{"tool": "today"}], mtime=NOW.timestamp())
+
+    stats = compact_traces(trace_dir, older_than_hours=24, retention_days=30, fmt=fmt, now=NOW)
+
+    assert stats["runs_compacted"] == 3 and stats["tool_logs_compacted"] == 1
+    assert stats["segments_written"] == 3  # EURUSD day1, GBPUSD day2, tools day1
+    assert sorted(os.listdir(trace_dir)) == ["20240620_traces.jsonl", "fresh.json", "segments"]
+    assert os.listdir(tmp_path / "segments" / "runs" / "day=2024-06-17" / "pair=EURUSD")[0].endswith(fmt)
+
+    traces = load_traces(trace_dir)
+    assert sorted(t["run_id"] for t in traces) == ["a", "b", "c", "fresh"]
+    assert traces[0]["recommendation"]["stance"] == "BUY"
+    assert sorted(t["run_id"] for t in load_traces(trace_dir, pairs=["gbpusd"])) == ["c"]
+    assert sorted(t["run_id"] for t in load_traces(trace_dir, since=day2)) == ["c", "fresh"]
+    assert [e["tool"] for e in iter_segment_tool_entries(trace_dir)] == ["fetch"]
+
+
+@pytest.mark.unit
+def test_retention_drops_old_partitions_and_expired_files(tmp_path):
+    trace_dir = str(tmp_path)
+    _write_trace(trace_dir, "old", "EURUSD", NOW - timedelta(days=10))
+    compact_traces(trace_dir, older_than_hours=24, retention_days=0, fmt="jsonl.gz", now=NOW)
+    _write_trace(trace_dir, "ancient", "EURUSD", NOW - timedelta(days=40))
+
+    dry = compact_traces(trace_dir, retention_days=7, fmt="jsonl.gz", now=NOW, dry_run=True)
+    assert dry["partitions_deleted"] == 1 and dry["expired_files"] == 1
+    assert os.path.exists(tmp_path / "ancient.json")
+
+    stats = compact_traces(trace_dir, retention_days=7, fmt="jsonl.gz", now=NOW)
+    assert stats["partitions_deleted"] == 1 and stats["expired_files"] == 1
+    assert load_traces(trace_dir) == []
+
+
+@pytest.mark.unit
+def test_interrupted_compaction_does_not_duplicate_runs(tmp_path):
+    trace_dir = str(tmp_path)
+    trace = _write_trace(trace_dir, "dup", "EURUSD", NOW - timedelta(days=2))
+    compact_traces(trace_dir, retention_days=0, fmt="jsonl.gz", now=NOW)
+    # crash before the loose file was removed: same run in a file and a segment
+    _write_trace(trace_dir, "dup", "EURUSD", NOW - timedelta(days=2))
+
+    traces = load_traces(trace_dir)
+    assert [t["run_id"] for t in traces] == ["dup"]
+    segment = next((tmp_path / "segments" / "runs").rglob("*.jsonl.gz"))
+    with gzip.open(segment, "rt") as f:
+        assert json.loads(f.readline()) == trace
+
+
+@pytest.mark.unit
+def test_compaction_holds_one_day_pair_group_at_a_time(tmp_path, monkeypatch):
+    from src import trace_compaction
+
+    trace_dir = str(tmp_path)
+    for i in range(3):
+        for pair in ("EURUSD", "GBPUSD"):
+            _write_trace(trace_dir, f"{pair}-{i}", pair, NOW - timedelta(days=3, hours=i))
+
+    groups = []
+    real_write = trace_compaction._write_segment
+    monkeypatch.setattr(trace_compaction, "_write_segment",
+                        lambda d, rows, *a: groups.append(len(rows)) or real_write(d, rows, *a))
+    assert all(isinstance(p, str) for paths in trace_compaction._loose_run_traces(trace_dir, NOW.timestamp()).values()
+               for p in paths)
+
+    stats = compact_traces(trace_dir, older_than_hours=24, retention_days=30, fmt="jsonl.gz", now=NOW)
+    assert stats["runs_compacted"] == 6 and groups == [3, 3]
+
+
+@pytest.mark.unit
+def test_eval_defaults_to_the_directory_graph_writes(monkeypatch):
+    import importlib
+
+    from src import graph
+    from src.evaluation import eval_pipeline
+
+    monkeypatch.delenv("TRACE_DIR", raising=False)
+    trace_dir = importlib.reload(eval_pipeline).TRACE_DIR
+    assert os.path.abspath(trace_dir) == os.path.abspath(graph.DEFAULT_TRACE_DIR)
+
+
+@pytest.mark.unit
+def test_eval_import_does_not_load_the_pipeline():
+    code = "import sys, src.evaluation.eval_pipeline; print('src.graph' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
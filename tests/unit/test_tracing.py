@@ -0,0 +1,91 @@
+# tests/unit/test_tracing.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src import graph
+from src.evaluation.eval_pipeline import compute_step_durations, summarize_traces
+from src.observability.tracing import current_span, span, start_trace, traced
+from src.pipeline_state import PipelineState
+from src.schemas import Candle
+from src.tools import mcp, strategy_tools
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.unit
+def test_spans_nest_and_export_relative_times():
+    @traced()
+    def leaf():
+        assert current_span().path == "outer/inner/leaf"
+
+    with start_trace() as recorder:
+        with span("outer", pair="EURUSD"):
+            with span("inner") as inner:
+                leaf()
+                inner.set_attribute("items", 3)
+        with pytest.raises(ValueError):
+            with span("broken"):
+                raise ValueError("bad input")
+
+    spans = {s["path"]: s for s in recorder.export()}
+    assert list(spans) == ["outer", "outer/inner", "outer/inner/leaf", "broken"]
+    assert spans["outer/inner"]["parent_id"] == spans["outer"]["span_id"]
+    assert spans["outer"]["parent_id"] is None
+    assert spans["outer"]["attrs"] == {"pair": "EURUSD"} and spans["outer/inner"]["attrs"] == {"items": 3}
+    assert spans["outer"]["duration_ms"] >= spans["outer/inner"]["duration_ms"] >= spans["outer/inner/leaf"]["duration_ms"]
+    assert spans["outer/inner"]["start_ms"] >= spans["outer"]["start_ms"] >= 0
+    assert spans["broken"]["status"] == "error" and "ValueError" in spans["broken"]["error"]
+    assert current_span() is None
+
+
+@pytest.mark.unit
+def test_spans_outside_a_trace_are_not_recorded():
+    with start_trace() as recorder:
+        pass
+    with span("orphan") as s:
+        pass
+    assert s.duration_ms >= 0
+    assert recorder.export() == []
+
+
+@pytest.mark.unit
+def test_pipeline_trace_carries_nested_spans(monkeypatch, tmp_path):
+    candles = [Candle(ts=T0 + timedelta(hours=i), open=1.1, high=1.1, low=1.1, close=1.1 + i / 1000)
+               for i in range(30)]
+
+    @mcp.mcp_tool(name="fake_news")
+    def fake_news(currency):
+        return [{"title": "Euro rallies", "url": "https://example.com/1", "source": "test",
+                 "timestamp": T0.isoformat()}]
+
+    monkeypatch.setattr(mcp, "TRACE_DIR", str(tmp_path / "tools"))
+    monkeypatch.setattr(strategy_tools, "fetch_forex_candles", lambda pair, days=3: candles)
+    monkeypatch.setattr(strategy_tools, "fetch_forex_news", fake_news)
+    monkeypatch.setattr(graph, "send_strategy_email",
+                        lambda subject, body, dry_run=True: {"status": "success", "data": {"status": "dryrun"}})
+    monkeypatch.setattr(graph, "PIPELINE_STATE", PipelineState(None))
+    monkeypatch.setattr(graph, "TRACE_DIR", str(tmp_path))
+
+    trace = graph.run_pipeline_once("EURUSD")
+
+    assert trace["status"] == "success"
+    paths = [s["path"] for s in trace["spans"]]
+    assert paths == [
+        "gather_inputs", "gather_inputs/market_data", "gather_inputs/news", "gather_inputs/news/tool:fake_news",
+        "fingerprint", "strategy", "strategy/indicators", "strategy/strategy_rule", "email",
+    ]
+    by_path = {s["path"]: s for s in trace["spans"]}
+    assert by_path["gather_inputs/news/tool:fake_news"]["attrs"] == {"status": "success"}
+    assert by_path["gather_inputs/market_data"]["attrs"] == {"candles": 30}
+
+    durations = compute_step_durations(trace)
+    assert durations["strategy"] >= durations["strategy/indicators"]
+    pairs, _ = summarize_traces([trace])
+    assert "strategy/strategy_rule" in pairs["EURUSD"]["timings"]
+
+
+@pytest.mark.unit
+def test_step_durations_fall_back_to_timestamps_without_spans():
+    trace = {"steps": [{"step": "a", "ts": T0.isoformat()}, {"step": "b", "ts": (T0 + timedelta(seconds=2)).isoformat()}]}
+    assert compute_step_durations(trace) == {"a": 2.0}